@@ -0,0 +1,180 @@
+"""
+Benchmark the clustering backends against each other on synthetic scenes.
+
+Example:
+    python -m benchmarks.compare_backends --sizes 1e5 1e6 --voxel-size 0.01 --eps 0.05
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import open3d as o3d
+
+from benchmarks.synthetic_scenes import SCENES, make_scene
+from src.open3d_pc.clustering_backends import (
+    CLUSTERING_BACKENDS,
+    get_clustering_backend,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def adjusted_rand_index(labels: np.ndarray, reference: np.ndarray) -> float:
+    """
+    Measure how well two labellings of the same points agree, from 1 for the same
+    partition to about 0 for unrelated ones. Noise counts as one more label.
+
+    Args:
+        labels (np.ndarray): Labels of each point.
+        reference (np.ndarray): Reference labels of each point.
+
+    Returns:
+        float: The adjusted Rand index.
+    """
+
+    def pairs(counts: np.ndarray) -> float:
+        return float((counts * (counts - 1) / 2).sum())
+
+    _, labels = np.unique(labels, return_inverse=True)
+    _, reference = np.unique(reference, return_inverse=True)
+    _, joint = np.unique(labels * (reference.max() + 1) + reference, return_counts=True)
+
+    index = pairs(joint)
+    label_pairs = pairs(np.bincount(labels))
+    reference_pairs = pairs(np.bincount(reference))
+    expected = label_pairs * reference_pairs / max(pairs(np.array([len(labels)])), 1)
+    maximum = (label_pairs + reference_pairs) / 2
+    if maximum == expected:
+        return 1.0
+
+    return (index - expected) / (maximum - expected)
+
+
+def compare_backends(
+    points: np.ndarray,
+    eps: float,
+    min_points: int,
+    backends: list[str],
+    reference: str = "open3d",
+    repeat: int = 1,
+) -> dict:
+    """
+    Cluster the same points with every backend and compare them with a reference
+    backend.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points.
+        eps (float): `clusterer.eps` passed to every backend.
+        min_points (int): `clusterer.min_points` passed to every backend.
+        backends (list[str]): Names of the backends to compare.
+        reference (str): Backend whose labels the others are compared with.
+            Defaults to "open3d".
+        repeat (int): Number of runs per backend, of which the fastest is kept.
+            Defaults to 1.
+
+    Returns:
+        dict: Per backend, the fastest "wall_time", "n_clusters",
+            "noise_fraction" and the "agreement" with the reference as the adjusted
+            Rand index.
+    """
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+    results, labels = {}, {}
+    for name in dict.fromkeys([reference, *backends]):
+        backend = get_clustering_backend(name)
+        wall_time = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            labels[name] = backend(pcd, eps, min_points)
+            wall_time = min(wall_time, time.perf_counter() - start)
+        results[name] = {
+            "wall_time": wall_time,
+            "n_clusters": int(labels[name].max()) + 1 if len(points) else 0,
+            "noise_fraction": float((labels[name] < 0).mean()) if len(points) else 0.0,
+            "agreement": adjusted_rand_index(labels[name], labels[reference]),
+        }
+
+    return {name: results[name] for name in backends}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scenes",
+        nargs="+",
+        default=list(SCENES),
+        choices=list(SCENES),
+        help="Scenes to benchmark.",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=lambda value: int(float(value)),
+        default=[10**5],
+        help="Numbers of generated points, e.g. 1e5 1e6.",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=list(CLUSTERING_BACKENDS),
+        choices=list(CLUSTERING_BACKENDS),
+        help="Backends to compare.",
+    )
+    parser.add_argument(
+        "--voxel-size",
+        type=float,
+        help="Downsample the scenes with this voxel size before clustering.",
+    )
+    parser.add_argument("--eps", type=float, default=0.108)
+    parser.add_argument("--min-points", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Run the backend comparison from the command line.
+
+    Returns:
+        int: Exit code.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    args = parse_args(argv)
+
+    results = {}
+    for scene in args.scenes:
+        for n_points in args.sizes:
+            points = make_scene(scene, n_points, seed=args.seed)
+            if args.voxel_size:
+                pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+                points = np.asarray(pcd.voxel_down_sample(args.voxel_size).points)
+            case = compare_backends(
+                points, args.eps, args.min_points, args.backends, repeat=args.repeat
+            )
+            results[f"{scene}-{n_points}"] = case
+            for name, metrics in case.items():
+                logger.info(
+                    f"{scene} with {len(points)} points, {name}: "
+                    f"{metrics['wall_time']:.3f}s, {metrics['n_clusters']} clusters, "
+                    f"{metrics['noise_fraction']:.1%} noise, "
+                    f"agreement {metrics['agreement']:.3f}."
+                )
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Wrote backend comparison to {args.output}.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
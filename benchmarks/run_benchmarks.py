@@ -0,0 +1,352 @@
+"""
+Benchmark the point cloud pipeline on synthetic scenes and compare the results with a
+baseline.
+
+Example:
+    python -m benchmarks.run_benchmarks --sizes 1e4 1e5 1e6 --output baseline.json
+    python -m benchmarks.run_benchmarks --baseline baseline.json --threshold 0.2
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import open3d as o3d
+from omegaconf import OmegaConf
+
+from benchmarks.synthetic_scenes import SCENES, make_scene
+from src.open3d_pc.pipeline_profiler import _peak_rss
+from src.open3d_pc.point_cloud_pipeline import PointCloudPipeline
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = Path(__file__).resolve().parents[1] / "conf" / "config.yaml"
+DEFAULT_SIZES = (10**4, 10**5, 10**6)
+
+
+def write_scene(
+    scene: str,
+    n_points: int,
+    data_dir: str | Path,
+    file_format: str = "npy",
+    seed: int = 0,
+) -> Path:
+    """
+    Generate a synthetic scene and write it to disk, reusing a previously written file
+    of the same scene, size, format and seed.
+
+    Args:
+        scene (str): Scene name, see `benchmarks.synthetic_scenes.SCENES`.
+        n_points (int): Number of points.
+        data_dir (str | Path): Directory holding the generated files.
+        file_format (str): Either "npy" or "ply". Defaults to "npy".
+        seed (int): Random seed. Defaults to 0.
+
+    Returns:
+        Path: Path to the generated file.
+
+    Raises:
+        ValueError: If the file format is not supported.
+    """
+    if file_format not in ("npy", "ply"):
+        raise ValueError(f"Unsupported benchmark file format {file_format}")
+
+    path = Path(data_dir) / f"{scene}-{n_points}-{seed}.{file_format}"
+    if path.exists():
+        return path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    points = make_scene(scene, n_points, seed=seed)
+    if file_format == "npy":
+        np.save(path, points)
+    else:
+        pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+        o3d.io.write_point_cloud(str(path), pcd)
+
+    return path
+
+
+def run_case(
+    scene: str,
+    n_points: int,
+    cfg: dict,
+    data_dir: str | Path,
+    file_format: str = "npy",
+    repeat: int = 1,
+    seed: int = 0,
+) -> dict:
+    """
+    Run the pipeline on one synthetic scene and collect the metrics of every stage.
+
+    With several repeats, the fastest wall and CPU time of each stage is kept, which
+    is less sensitive to noise from other processes than the mean.
+
+    Args:
+        scene (str): Scene name.
+        n_points (int): Number of points.
+        cfg (dict): Pipeline configuration, as accepted by
+            `PointCloudPipeline.from_config`. Visualisation and caching are disabled.
+        data_dir (str | Path): Directory holding the generated files.
+        file_format (str): Either "npy" or "ply". Defaults to "npy".
+        repeat (int): Number of pipeline runs. Defaults to 1.
+        seed (int): Random seed. Defaults to 0.
+
+    Returns:
+        dict: Metrics of the case, with per-stage metrics under "stages", the fastest
+            total wall time and the peak resident set size of the process in bytes.
+    """
+    path = write_scene(scene, n_points, data_dir, file_format=file_format, seed=seed)
+    cfg = dict(cfg)
+    cfg["cluster_output"] = dict(cfg.get("cluster_output") or {}, visualize=False)
+    cfg["cache"] = dict(cfg.get("cache") or {}, enabled=False)
+
+    stages = {}
+    total_wall_time = float("inf")
+    for _ in range(repeat):
+        pipeline = PointCloudPipeline.from_config(cfg)
+        _, _, report = pipeline.run(path=path, return_report=True)
+        total_wall_time = min(total_wall_time, report["total_wall_time"])
+        for metrics in report["stages"]:
+            best = stages.setdefault(metrics["name"], dict(metrics))
+            best["wall_time"] = min(best["wall_time"], metrics["wall_time"])
+            best["cpu_time"] = min(best["cpu_time"], metrics["cpu_time"])
+    for metrics in stages.values():
+        del metrics["name"], metrics["start"]
+
+    return {
+        "scene": scene,
+        "n_points": n_points,
+        "stages": stages,
+        "total_wall_time": total_wall_time,
+        "peak_rss": _peak_rss(),
+    }
+
+
+def run_benchmarks(
+    scenes: list[str],
+    sizes: list[int],
+    cfg: dict,
+    data_dir: str | Path,
+    file_format: str = "npy",
+    repeat: int = 1,
+    seed: int = 0,
+) -> dict:
+    """
+    Run every combination of scene and size, each in a fresh process so that the peak
+    memory of one case does not leak into the next.
+
+    Args:
+        scenes (list[str]): Scene names.
+        sizes (list[int]): Numbers of points.
+        cfg (dict): Pipeline configuration.
+        data_dir (str | Path): Directory holding the generated files.
+        file_format (str): Either "npy" or "ply". Defaults to "npy".
+        repeat (int): Number of pipeline runs per case. Defaults to 1.
+        seed (int): Random seed. Defaults to 0.
+
+    Returns:
+        dict: Results with environment metadata under "metadata" and the metrics of
+            every case under "cases", keyed on "<scene>-<n_points>".
+    """
+    results = {
+        "metadata": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": multiprocessing.cpu_count(),
+            "numpy": np.__version__,
+            "open3d": o3d.__version__,
+            "config": cfg,
+        },
+        "cases": {},
+    }
+    context = multiprocessing.get_context("spawn")
+    for scene in scenes:
+        for n_points in sizes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                case = executor.submit(
+                    run_case,
+                    scene,
+                    n_points,
+                    cfg,
+                    data_dir,
+                    file_format,
+                    repeat,
+                    seed,
+                ).result()
+            results["cases"][f"{scene}-{n_points}"] = case
+            logger.info(
+                f"{scene} with {n_points} points: "
+                f"{case['total_wall_time']:.3f}s, "
+                f"peak RSS {(case['peak_rss'] or 0) / 2**20:.1f} MiB."
+            )
+
+    return results
+
+
+def compare_results(
+    results: dict,
+    baseline: dict,
+    threshold: float = 0.2,
+    min_time: float = 0.05,
+) -> list[str]:
+    """
+    Compare benchmark results against a baseline.
+
+    A wall time regresses if it is more than `threshold` slower than the baseline.
+    Times below `min_time` in the baseline are too noisy to compare and are skipped.
+    The peak memory regresses if it grows by more than `threshold`. Cases missing
+    from either side are ignored.
+
+    Args:
+        results (dict): Results from `run_benchmarks`.
+        baseline (dict): Results of a previous run.
+        threshold (float): Allowed relative slowdown. Defaults to 0.2.
+        min_time (float): Minimum baseline time in seconds for a comparison.
+            Defaults to 0.05.
+
+    Returns:
+        list[str]: Description of every regression, empty if there are none.
+    """
+    regressions = []
+
+    def check(label: str, current, previous, floor: float = 0.0) -> None:
+        if current is None or previous is None or previous < floor or previous <= 0:
+            return
+        change = current / previous - 1
+        if change > threshold:
+            regressions.append(
+                f"{label}: {previous:.4g} -> {current:.4g} (+{change:.0%})"
+            )
+
+    for key, case in results["cases"].items():
+        previous = baseline.get("cases", {}).get(key)
+        if previous is None:
+            continue
+        check(
+            f"{key} total wall time",
+            case["total_wall_time"],
+            previous["total_wall_time"],
+            min_time,
+        )
+        check(f"{key} peak RSS", case.get("peak_rss"), previous.get("peak_rss"))
+        for name, metrics in case["stages"].items():
+            if name in previous["stages"]:
+                check(
+                    f"{key} {name} wall time",
+                    metrics["wall_time"],
+                    previous["stages"][name]["wall_time"],
+                    min_time,
+                )
+
+    return regressions
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scenes",
+        nargs="+",
+        default=list(SCENES),
+        choices=list(SCENES),
+        help="Scenes to benchmark.",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=lambda value: int(float(value)),
+        default=list(DEFAULT_SIZES),
+        help="Numbers of points, e.g. 1e4 1e6 1e8.",
+    )
+    parser.add_argument(
+        "--config",
+        default=str(DEFAULT_CONFIG),
+        help="Pipeline configuration file.",
+    )
+    parser.add_argument(
+        "--set",
+        nargs="*",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Configuration overrides, e.g. clusterer.tile_size=2.0.",
+    )
+    parser.add_argument("--format", choices=["npy", "ply"], default="npy")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--data-dir",
+        help="Directory for the generated scenes, reused across runs. Defaults to "
+        "a temporary directory.",
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against this results file.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative slowdown before a run fails.",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.05,
+        help="Baseline times below this many seconds are not compared.",
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Run the benchmarks from the command line.
+
+    Returns:
+        int: Exit code, 1 if a regression against the baseline was found.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    args = parse_args(argv)
+    cfg = OmegaConf.merge(OmegaConf.load(args.config), OmegaConf.from_dotlist(args.set))
+    cfg = OmegaConf.to_container(cfg, resolve=True)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = run_benchmarks(
+            args.scenes,
+            args.sizes,
+            cfg,
+            data_dir=args.data_dir or tmp_dir,
+            file_format=args.format,
+            repeat=args.repeat,
+            seed=args.seed,
+        )
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Wrote benchmark results to {args.output}.")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(
+            results, baseline, threshold=args.threshold, min_time=args.min_time
+        )
+        for regression in regressions:
+            logger.error(f"Regression: {regression}")
+        if regressions:
+            return 1
+        logger.info("No regressions against the baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
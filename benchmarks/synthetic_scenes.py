@@ -0,0 +1,121 @@
+import numpy as np
+
+
+def make_planes(n_points: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Generate a room-like scene of a floor and two walls with slight noise.
+
+    Args:
+        n_points (int): Number of points to generate.
+        rng (np.random.Generator): Random number generator.
+
+    Returns:
+        np.ndarray: (n_points, 3) array of points in a 10 m x 10 m x 3 m box.
+    """
+    plane = rng.integers(0, 3, size=n_points)
+    u = rng.uniform(0, 10, size=n_points)
+    v = rng.uniform(0, 3, size=n_points)
+    noise = rng.normal(0, 0.005, size=n_points)
+
+    points = np.empty((n_points, 3))
+    floor, wall_x, wall_y = plane == 0, plane == 1, plane == 2
+    points[floor] = np.column_stack(
+        [u[floor], rng.uniform(0, 10, size=floor.sum()), noise[floor]]
+    )
+    points[wall_x] = np.column_stack([u[wall_x], noise[wall_x], v[wall_x]])
+    points[wall_y] = np.column_stack([noise[wall_y], u[wall_y], v[wall_y]])
+
+    return points
+
+
+def make_blobs(
+    n_points: int,
+    rng: np.random.Generator,
+    n_blobs: int = 50,
+) -> np.ndarray:
+    """
+    Generate well-separated Gaussian blobs with 5% uniform background noise.
+
+    Args:
+        n_points (int): Number of points to generate.
+        rng (np.random.Generator): Random number generator.
+        n_blobs (int): Number of blobs. Defaults to 50.
+
+    Returns:
+        np.ndarray: (n_points, 3) array of points in a 10 m cube.
+    """
+    n_noise = n_points // 20
+    centers = rng.uniform(1, 9, size=(n_blobs, 3))
+    assignment = rng.integers(0, n_blobs, size=n_points - n_noise)
+    blobs = centers[assignment] + rng.normal(0, 0.15, size=(len(assignment), 3))
+    noise = rng.uniform(0, 10, size=(n_noise, 3))
+
+    return np.vstack([blobs, noise])
+
+
+def make_lidar_sweep(n_points: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Generate a LiDAR-like sweep: rings of returns from a ground plane, with a few
+    box-shaped obstacles and range noise. Point density falls off with range, as in
+    real scans.
+
+    Args:
+        n_points (int): Number of points to generate.
+        rng (np.random.Generator): Random number generator.
+
+    Returns:
+        np.ndarray: (n_points, 3) array of points around a sensor at 2 m height.
+    """
+    n_rings = 32
+    ring = rng.integers(0, n_rings, size=n_points)
+    azimuth = rng.uniform(0, 2 * np.pi, size=n_points)
+    elevation = np.deg2rad(np.linspace(-25, -1, n_rings))[ring]
+    # Range at which each beam hits the ground from 2 m height.
+    distance = np.minimum(2.0 / np.tan(-elevation), 60.0)
+
+    obstacles = rng.uniform(-30, 30, size=(20, 2))
+    for center in obstacles:
+        bearing = np.arctan2(center[1], center[0])
+        hit = (np.abs(np.angle(np.exp(1j * (azimuth - bearing)))) < 0.05) & (
+            distance > np.linalg.norm(center)
+        )
+        distance[hit] = np.linalg.norm(center)
+
+    distance = distance + rng.normal(0, 0.02, size=n_points)
+    points = np.column_stack(
+        [
+            distance * np.cos(azimuth),
+            distance * np.sin(azimuth),
+            2.0 + distance * np.tan(elevation),
+        ]
+    )
+
+    return points
+
+
+SCENES = {
+    "planes": make_planes,
+    "blobs": make_blobs,
+    "lidar": make_lidar_sweep,
+}
+
+
+def make_scene(name: str, n_points: int, seed: int = 0) -> np.ndarray:
+    """
+    Generate a reproducible synthetic scene.
+
+    Args:
+        name (str): Scene name, one of "planes", "blobs", or "lidar".
+        n_points (int): Number of points to generate.
+        seed (int): Random seed. Defaults to 0.
+
+    Returns:
+        np.ndarray: (n_points, 3) array of points.
+
+    Raises:
+        ValueError: If the scene name is unknown.
+    """
+    if name not in SCENES:
+        raise ValueError(f"Unknown scene {name}, expected one of {list(SCENES)}")
+
+    return SCENES[name](n_points, np.random.default_rng(seed))
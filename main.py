@@ -1,24 +1,71 @@
 import logging
+import sys
 
-import hydra
-from omegaconf import DictConfig
-
+from src.open3d_pc.config import load_config
 from src.open3d_pc.logging_config import setup_logging
-from src.open3d_pc.point_cloud_pipeline import PointCloudPipeline
 
 logger = logging.getLogger(__name__)
 
 
-@hydra.main(version_base=None, config_path="conf", config_name="config")
-def main(cfg: DictConfig):
+def run(cfg):
     """
     Example entry point to run the point cloud processing pipeline with configuration.
+
+    If `batch.input` is set, every point cloud file in that directory or glob is
+    processed across a pool of worker processes instead of running a single file, or
+    one after another with background loading and writing if `batch.prefetch` is set.
+    If `service.enabled` is set, a long-running HTTP service with warm workers is
+    started instead.
+
+    Args:
+        cfg (DictConfig | dict): Full pipeline configuration.
     """
     setup_logging()
 
+    # Imported here so that the command line is parsed before paying for Open3D.
+    if cfg.get("service") and cfg["service"].get("enabled"):
+        from src.open3d_pc.point_cloud_service import PointCloudService
+
+        PointCloudService.from_config(cfg).serve_forever()
+        return
+
+    if cfg.get("batch") and cfg["batch"].get("input"):
+        if cfg["batch"].get("prefetch"):
+            from src.open3d_pc.point_cloud_prefetch import PointCloudPrefetchExecutor
+
+            batch = PointCloudPrefetchExecutor.from_config(cfg)
+        else:
+            from src.open3d_pc.point_cloud_batch import PointCloudBatchProcessor
+
+            batch = PointCloudBatchProcessor.from_config(cfg)
+        pattern = cfg["batch"].get("pattern", "*")
+        for _ in batch.run(cfg["batch"]["input"], pattern=pattern):
+            pass
+        return
+
+    from src.open3d_pc.point_cloud_pipeline import PointCloudPipeline
+
     pipeline = PointCloudPipeline.from_config(cfg)
     pcd, labels = pipeline.run()
 
 
+def main():
+    """
+    Parse the command line and run the pipeline.
+
+    Plain `key=value` overrides are applied to `conf/config.yaml` directly. Hydra is
+    only imported when the command line needs it, e.g. for `--multirun`, `--cfg`,
+    `+key=value` or `hydra.*` overrides.
+    """
+    cfg = load_config(sys.argv[1:])
+    if cfg is not None:
+        run(cfg)
+        return
+
+    import hydra
+
+    hydra.main(version_base=None, config_path="conf", config_name="config")(run)()
+
+
 if __name__ == "__main__":
     main()
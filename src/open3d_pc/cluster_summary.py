@@ -0,0 +1,112 @@
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from src.open3d_pc.geometry import PointCloud, get_array
+
+logger = logging.getLogger(__name__)
+
+# One record per cluster. Normals only need float32, positions keep float64 so that
+# clouds far from the origin do not lose precision.
+CLUSTER_SUMMARY_DTYPE = np.dtype(
+    [
+        ("label", "<i4"),
+        ("n_points", "<i4"),
+        ("centroid", "<f8", (3,)),
+        ("min_bound", "<f8", (3,)),
+        ("max_bound", "<f8", (3,)),
+        ("mean_normal", "<f4", (3,)),
+    ]
+)
+
+
+def summarize_clusters(pcd: PointCloud, labels: np.ndarray) -> np.ndarray:
+    """
+    Compute the size, centroid, axis-aligned bounds and mean normal of every cluster
+    in one pass.
+
+    The clustered points are sorted by label once, so every cluster is a contiguous
+    segment reduced with `np.ufunc.reduceat`. The cost is O(N log N) regardless of
+    the number of clusters, instead of one `select_by_index` per cluster.
+
+    Args:
+        pcd (PointCloud): The clustered point cloud.
+        labels (np.ndarray): Cluster labels for each point, with -1 for noise.
+
+    Returns:
+        np.ndarray: Structured array of `CLUSTER_SUMMARY_DTYPE` with one record per
+            non-empty cluster, sorted by label. The mean normal is the normalised
+            sum of the cluster's normals, or zero if the point cloud has no normals
+            or they cancel out.
+    """
+    clustered = np.flatnonzero(labels >= 0)
+    order = clustered[np.argsort(labels[clustered], kind="stable")]
+    sorted_labels = labels[order]
+    starts = np.flatnonzero(np.diff(sorted_labels, prepend=-1))
+    summary = np.zeros(len(starts), dtype=CLUSTER_SUMMARY_DTYPE)
+    if len(starts) == 0:
+        return summary
+
+    counts = np.diff(starts, append=len(order))
+    points = get_array(pcd)[order]
+    summary["label"] = sorted_labels[starts]
+    summary["n_points"] = counts
+    summary["centroid"] = (
+        np.add.reduceat(points, starts, dtype=np.float64) / counts[:, None]
+    )
+    summary["min_bound"] = np.minimum.reduceat(points, starts)
+    summary["max_bound"] = np.maximum.reduceat(points, starts)
+
+    normals = get_array(pcd, "normals")
+    if normals is not None:
+        sums = np.add.reduceat(normals[order], starts, dtype=np.float64)
+        lengths = np.linalg.norm(sums, axis=1, keepdims=True)
+        summary["mean_normal"] = np.divide(
+            sums, lengths, out=np.zeros_like(sums), where=lengths > 0
+        )
+
+    return summary
+
+
+def log_summary(summary: np.ndarray, labels: np.ndarray, top: int = 5) -> None:
+    """
+    Log the number and size distribution of the clusters, and the largest ones.
+
+    Args:
+        summary (np.ndarray): Cluster summary from `summarize_clusters`.
+        labels (np.ndarray): Cluster labels for each point, with -1 for noise.
+        top (int): Number of largest clusters to log. Defaults to 5.
+    """
+    n_noise = int((labels < 0).sum())
+    if len(summary) == 0:
+        logger.info(f"No clusters, {n_noise} noise points.")
+        return
+
+    sizes = summary["n_points"]
+    logger.info(
+        f"{len(summary)} clusters with {sizes.min()} to {sizes.max()} points "
+        f"(median {np.median(sizes):.0f}), {n_noise} noise points."
+    )
+    for record in summary[np.argsort(sizes, kind="stable")[::-1][:top]]:
+        extent = record["max_bound"] - record["min_bound"]
+        logger.info(
+            f"Cluster {record['label']}: {record['n_points']} points, centroid "
+            f"{np.round(record['centroid'], 3).tolist()}, extent "
+            f"{np.round(extent, 3).tolist()}."
+        )
+
+
+def write_summary(path: str | Path, summary: np.ndarray) -> None:
+    """
+    Write a cluster summary to a `.npy` file, which `np.load` reads back as the same
+    structured array.
+
+    Args:
+        path (str | Path): Output file path.
+        summary (np.ndarray): Cluster summary from `summarize_clusters`.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(path, summary)
+    logger.info(f"Saved summary of {len(summary)} clusters to {path}.")
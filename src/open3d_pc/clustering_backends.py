@@ -0,0 +1,284 @@
+import logging
+from collections.abc import Callable, Iterator
+
+import numpy as np
+
+from src.open3d_pc.geometry import PointCloud, get_array, is_tensor
+from src.open3d_pc.spatial import (
+    NEIGHBOR_OFFSETS,
+    connected_components,
+    hash_grid,
+    relabel_consecutive,
+)
+
+logger = logging.getLogger(__name__)
+
+# A backend takes a point cloud, `eps` and `min_points` and returns an (N,) integer
+# array of cluster labels, 0..k-1 for the k clusters and -1 for noise.
+ClusteringBackend = Callable[[PointCloud, float, int], np.ndarray]
+
+CLUSTERING_BACKENDS: dict[str, ClusteringBackend] = {}
+
+# Number of candidate pairs compared at once by `grid_dbscan`, which bounds its
+# memory to about 50 MB regardless of the size of the cloud.
+_GRID_CHUNK_PAIRS = 2**20
+
+
+def register_clustering_backend(
+    name: str,
+) -> Callable[[ClusteringBackend], ClusteringBackend]:
+    """
+    Register a clustering backend under a name, so that it can be selected with
+    `clusterer.backend`. Used as a decorator.
+
+    Args:
+        name (str): Name of the backend.
+
+    Returns:
+        Callable: Decorator registering the backend and returning it unchanged.
+
+    Raises:
+        ValueError: If a backend is already registered under the name.
+    """
+
+    def register(backend: ClusteringBackend) -> ClusteringBackend:
+        if name in CLUSTERING_BACKENDS:
+            raise ValueError(f"Clustering backend {name} is already registered")
+        CLUSTERING_BACKENDS[name] = backend
+        return backend
+
+    return register
+
+
+def get_clustering_backend(name: str) -> ClusteringBackend:
+    """
+    Look up a registered clustering backend.
+
+    Args:
+        name (str): Name of the backend.
+
+    Returns:
+        ClusteringBackend: The backend.
+
+    Raises:
+        ValueError: If no backend is registered under the name.
+    """
+    if name not in CLUSTERING_BACKENDS:
+        raise ValueError(
+            f"Unknown clustering backend {name}, expected one of "
+            f"{tuple(CLUSTERING_BACKENDS)}"
+        )
+
+    return CLUSTERING_BACKENDS[name]
+
+
+@register_clustering_backend("open3d")
+def open3d_dbscan(pcd: PointCloud, eps: float, min_points: int) -> np.ndarray:
+    """
+    Cluster with Open3D's DBSCAN, on legacy and tensor point clouds alike.
+
+    Args:
+        pcd (PointCloud): Point cloud to cluster.
+        eps (float): Neighbourhood radius.
+        min_points (int): Minimum number of neighbours of a core point, including
+            the point itself.
+
+    Returns:
+        np.ndarray: Cluster labels for each point, with -1 for noise.
+    """
+    if is_tensor(pcd):
+        return pcd.cluster_dbscan(eps, min_points).numpy()
+
+    return np.array(pcd.cluster_dbscan(eps=eps, min_points=min_points))
+
+
+@register_clustering_backend("grid")
+def grid_dbscan(pcd: PointCloud, eps: float, min_points: int) -> np.ndarray:
+    """
+    Cluster with DBSCAN, finding neighbours through a hash grid of `eps`-sized
+    cells instead of a KD-tree.
+
+    The neighbours of a point lie in its cell and the 26 around it, so the points
+    of these cells are compared in chunks of pairs, each pair once. A first pass
+    counts the neighbours of every point, and a second one connects the core
+    points and gives every border point the cluster of its nearest core
+    neighbour. No neighbour lists are kept, so memory stays bounded by the chunk
+    size. Core points get exactly the same clusters as Open3D's DBSCAN.
+
+    Args:
+        pcd (PointCloud): Point cloud to cluster.
+        eps (float): Neighbourhood radius.
+        min_points (int): Minimum number of neighbours of a core point, including
+            the point itself.
+
+    Returns:
+        np.ndarray: Cluster labels for each point, with -1 for noise.
+    """
+    points = np.asarray(get_array(pcd), dtype=np.float64)
+    if len(points) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    order, starts, sizes, neighbors = hash_grid(points, eps)
+    points = points[order]
+    n_points = len(points)
+
+    # Every point is its own neighbour.
+    counts = np.ones(n_points, dtype=np.int64)
+    for rows, cols, _ in _grid_pairs(points, starts, sizes, neighbors, eps):
+        counts += np.bincount(rows, minlength=n_points)
+        counts += np.bincount(cols, minlength=n_points)
+    core = counts >= min_points
+
+    roots = np.arange(n_points)
+    nearest = np.full(n_points, -1)
+    nearest_sq_distance = np.full(n_points, np.inf)
+    for rows, cols, sq_distances in _grid_pairs(points, starts, sizes, neighbors, eps):
+        edges = core[rows] & core[cols]
+        roots = connected_components(n_points, rows[edges], cols[edges], parent=roots)
+        _update_nearest_core(
+            nearest, nearest_sq_distance, core, rows, cols, sq_distances
+        )
+
+    sorted_labels = np.where(core, roots, -1)
+    has_core_neighbor = nearest >= 0
+    sorted_labels[has_core_neighbor] = roots[nearest[has_core_neighbor]]
+    labels = np.empty(n_points, dtype=np.int64)
+    labels[order] = sorted_labels
+    logger.debug(f"Grid DBSCAN found {int(core.sum())} core points.")
+
+    return relabel_consecutive(labels)
+
+
+@register_clustering_backend("voxel")
+def voxel_components(pcd: PointCloud, eps: float, min_points: int) -> np.ndarray:
+    """
+    Segment the cloud into connected components of occupied voxels.
+
+    Points are binned into voxels with an edge length of `eps`. Voxels holding at
+    least `min_points` points are occupied, and occupied voxels sharing a face,
+    edge or corner belong to the same cluster. Points in the other voxels are
+    noise. No distances are computed, which makes this a fast coarse segmentation
+    rather than DBSCAN: points of adjacent voxels can be up to `2 * sqrt(3) * eps`
+    apart, and thin structures whose voxels hold too few points are dropped.
+
+    Args:
+        pcd (PointCloud): Point cloud to cluster.
+        eps (float): Edge length of the voxels.
+        min_points (int): Minimum number of points of an occupied voxel.
+
+    Returns:
+        np.ndarray: Cluster labels for each point, with -1 for noise.
+    """
+    points = np.asarray(get_array(pcd), dtype=np.float64)
+    if len(points) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    order, _, sizes, neighbors = hash_grid(points, eps)
+    occupied = sizes >= min_points
+    rows = np.repeat(np.arange(len(sizes)), len(NEIGHBOR_OFFSETS))
+    cols = neighbors.ravel()
+    edges = (cols >= 0) & occupied[rows]
+    edges[edges] = occupied[cols[edges]]
+    roots = connected_components(len(sizes), rows[edges], cols[edges])
+
+    cell_labels = np.where(occupied, roots, -1)
+    labels = np.empty(len(points), dtype=np.int64)
+    labels[order] = np.repeat(cell_labels, sizes)
+    logger.debug(f"{int(occupied.sum())} of {len(sizes)} voxels are occupied.")
+
+    return relabel_consecutive(labels)
+
+
+def _update_nearest_core(
+    nearest: np.ndarray,
+    nearest_sq_distance: np.ndarray,
+    core: np.ndarray,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    sq_distances: np.ndarray,
+) -> None:
+    """
+    Update the nearest core neighbour of every non-core point with a chunk of
+    neighbour pairs, in place.
+
+    Args:
+        nearest (np.ndarray): Nearest core neighbour of each point so far, or -1.
+        nearest_sq_distance (np.ndarray): Squared distance to it, or infinity.
+        core (np.ndarray): Core flags of all points.
+        rows (np.ndarray): First point of every pair.
+        cols (np.ndarray): Second point of every pair.
+        sq_distances (np.ndarray): Squared distance of every pair.
+    """
+    forward = ~core[rows] & core[cols]
+    backward = core[rows] & ~core[cols]
+    border = np.concatenate([rows[forward], cols[backward]])
+    neighbor = np.concatenate([cols[forward], rows[backward]])
+    sq_distances = np.concatenate([sq_distances[forward], sq_distances[backward]])
+
+    by_distance = np.lexsort((sq_distances, border))
+    first = by_distance[np.diff(border[by_distance], prepend=-1) != 0]
+    closer = sq_distances[first] < nearest_sq_distance[border[first]]
+    first = first[closer]
+    nearest[border[first]] = neighbor[first]
+    nearest_sq_distance[border[first]] = sq_distances[first]
+
+
+def _grid_pairs(
+    points: np.ndarray,
+    starts: np.ndarray,
+    sizes: np.ndarray,
+    neighbors: np.ndarray,
+    eps: float,
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Find all pairs of distinct points within `eps` of each other, each pair once,
+    in chunks of consecutive points.
+
+    Points are sorted by cell, so every point only needs to be compared with the
+    later points of its own cell and with the points of the 13 neighbouring cells
+    that come after it.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points sorted by cell.
+        starts (np.ndarray): Start of each cell in the points.
+        sizes (np.ndarray): Number of points of each cell.
+        neighbors (np.ndarray): (M, 27) neighbouring cells of each cell, or -1.
+        eps (float): Neighbourhood radius.
+
+    Yields:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: The smaller and larger index of
+            every pair, and their squared distance.
+    """
+    # The neighbour offsets are in lexicographic order, so the cell itself is in
+    # the middle column and the later cells follow it.
+    neighbors = neighbors[:, len(NEIGHBOR_OFFSETS) // 2 :]
+    neighbor_sizes = np.where(neighbors >= 0, sizes[neighbors], 0)
+    neighbor_starts = starts[neighbors]
+    cell = np.repeat(np.arange(len(sizes)), sizes)
+    candidates = np.cumsum(neighbor_sizes.sum(axis=1)[cell])
+    bounds = np.searchsorted(
+        candidates,
+        np.arange(_GRID_CHUNK_PAIRS, candidates[-1], _GRID_CHUNK_PAIRS),
+        side="right",
+    )
+    bounds = np.unique(np.concatenate([[0], bounds, [len(points)]]))
+    # Gathering one contiguous coordinate at a time is faster than gathering rows.
+    axes = np.ascontiguousarray(points.T)
+
+    for start, stop in zip(bounds[:-1], bounds[1:], strict=True):
+        chunk_sizes = neighbor_sizes[cell[start:stop]].ravel()
+        rows = np.repeat(np.arange(start, stop), neighbors.shape[1])
+        rows = np.repeat(rows, chunk_sizes)
+        # Consecutive runs of each neighbouring cell's point indices.
+        run_offsets = np.cumsum(chunk_sizes) - chunk_sizes
+        cols = np.repeat(
+            neighbor_starts[cell[start:stop]].ravel() - run_offsets, chunk_sizes
+        ) + np.arange(len(rows))
+        later = rows < cols
+        rows, cols = rows[later], cols[later]
+        sq_distances = np.zeros(len(rows))
+        for axis in axes:
+            sq_distances += (axis[rows] - axis[cols]) ** 2
+        # As in Open3D, points exactly `eps` apart are not neighbours.
+        within = sq_distances < eps**2
+        yield rows[within], cols[within], sq_distances[within]
@@ -0,0 +1,118 @@
+import copy
+import re
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from omegaconf import DictConfig
+
+CONFIG_PATH = Path(__file__).resolve().parents[2] / "conf" / "config.yaml"
+
+# A plain `key.subkey=value` override. Hydra's prefixes (+, ++, ~) and package
+# overrides (@) do not match.
+_OVERRIDE = re.compile(r"([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)=(.*)", re.DOTALL)
+# Characters of Hydra's override grammar beyond primitive values: lists, dicts,
+# sweeps, function calls, interpolations and escapes.
+_HYDRA_SYNTAX = re.compile(r"[\[\]{}(),$\\\s]")
+
+
+def load_config(
+    overrides: list[str] | tuple[str, ...] = (),
+    config_path: str | Path = CONFIG_PATH,
+) -> dict | None:
+    """
+    Load the pipeline configuration and apply command-line overrides without
+    importing Hydra.
+
+    Only plain `key.subkey=value` overrides of existing keys with primitive values
+    (booleans, numbers, null and strings) are handled, and values are parsed the same
+    way Hydra parses them. Anything else, such as command-line flags, `+`/`~`
+    prefixes, `hydra.*` keys, sweeps or interpolations, returns None so that the
+    caller can hand the command line over to Hydra.
+
+    Args:
+        overrides (list[str] | tuple[str, ...]): Command-line overrides.
+        config_path (str | Path): Path to the YAML configuration file. Defaults to
+            `conf/config.yaml`.
+
+    Returns:
+        dict | None: The configuration with the overrides applied, or None if the
+            overrides need Hydra.
+    """
+    cfg = copy.deepcopy(_read_yaml(str(config_path)))
+    for override in overrides:
+        match = _OVERRIDE.fullmatch(override)
+        if match is None:
+            return None
+        key, value = match.groups()
+        if key.split(".")[0] == "hydra" or _HYDRA_SYNTAX.search(value):
+            return None
+
+        *parents, leaf = key.split(".")
+        node = cfg
+        for parent in parents:
+            node = node.get(parent) if isinstance(node, dict) else None
+        if not isinstance(node, dict) or leaf not in node:
+            return None
+        if isinstance(node[leaf], dict):
+            return None
+        node[leaf] = _parse_value(value)
+
+    return cfg
+
+
+def to_dict(cfg: "DictConfig | dict") -> dict:
+    """
+    Convert a configuration to a plain nested dictionary.
+
+    Args:
+        cfg (DictConfig | dict): Hydra DictConfig or configuration dictionary.
+
+    Returns:
+        dict: The configuration with interpolations resolved, or `cfg` itself if
+            it is already a dictionary.
+    """
+    if isinstance(cfg, dict):
+        return cfg
+
+    # Only Hydra's DictConfig needs OmegaConf, so it is imported lazily.
+    from omegaconf import OmegaConf
+
+    return OmegaConf.to_container(cfg, resolve=True)
+
+
+@cache
+def _read_yaml(path: str) -> dict:
+    # yaml is already imported by Open3D, so importing it here is free at run time
+    # but keeps it out of the import path of this module.
+    import yaml
+
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _parse_value(text: str) -> bool | int | float | str | None:
+    """
+    Parse a primitive override value following Hydra's grammar.
+
+    Args:
+        text (str): Value of an override.
+
+    Returns:
+        bool | int | float | str | None: The parsed value.
+    """
+    lowered = text.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered == "null":
+        return None
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+
+    return text
@@ -0,0 +1,149 @@
+import numpy as np
+import open3d as o3d
+
+# Either a legacy point cloud with float64 storage, or a tensor point cloud, e.g.
+# with float32 storage in float32 mode.
+PointCloud = o3d.geometry.PointCloud | o3d.t.geometry.PointCloud
+
+# Names of the legacy attributes in the point map of a tensor point cloud.
+_TENSOR_ATTRIBUTES = {"points": "positions", "normals": "normals", "colors": "colors"}
+
+
+def is_tensor(pcd: PointCloud) -> bool:
+    """
+    Check whether a point cloud is an Open3D tensor point cloud.
+
+    Args:
+        pcd (PointCloud): Legacy or tensor point cloud.
+
+    Returns:
+        bool: True for a tensor point cloud.
+    """
+    return isinstance(pcd, o3d.t.geometry.PointCloud)
+
+
+def has_array(pcd: PointCloud, name: str) -> bool:
+    """
+    Check whether a point cloud holds an attribute.
+
+    Args:
+        pcd (PointCloud): Legacy or tensor point cloud.
+        name (str): "points", "normals" or "colors".
+
+    Returns:
+        bool: True if the attribute is present and not empty.
+    """
+    if is_tensor(pcd):
+        return _TENSOR_ATTRIBUTES[name] in pcd.point
+
+    return len(getattr(pcd, name)) > 0
+
+
+def point_count(pcd: PointCloud) -> int:
+    """
+    Count the points of a point cloud.
+
+    Args:
+        pcd (PointCloud): Legacy or tensor point cloud.
+
+    Returns:
+        int: Number of points.
+    """
+    if is_tensor(pcd):
+        return len(pcd.point.positions) if has_array(pcd, "points") else 0
+
+    return len(pcd.points)
+
+
+def get_array(pcd: PointCloud, name: str = "points") -> np.ndarray | None:
+    """
+    Get an attribute of a point cloud as a NumPy array sharing its memory, so that
+    no copy is made for either kind of point cloud.
+
+    Args:
+        pcd (PointCloud): Legacy or tensor point cloud.
+        name (str): "points", "normals" or "colors". Defaults to "points".
+
+    Returns:
+        np.ndarray | None: (N, 3) array in the point cloud's dtype, float64 for
+            legacy point clouds, or None if the attribute is not present. Empty
+            point clouds have an empty points array.
+    """
+    if not has_array(pcd, name):
+        if name != "points":
+            return None
+        # Empty tensor point clouds default to float32, as Open3D's do.
+        return np.zeros((0, 3), dtype=np.float32 if is_tensor(pcd) else np.float64)
+    if is_tensor(pcd):
+        return pcd.point[_TENSOR_ATTRIBUTES[name]].numpy()
+
+    return np.asarray(getattr(pcd, name))
+
+
+def set_array(pcd: PointCloud, name: str, values: np.ndarray) -> None:
+    """
+    Set an attribute of a point cloud from a copy of an array, converted to the
+    point cloud's dtype: float64 for legacy point clouds, and the dtype of the
+    positions (float32 if there are none) for tensor point clouds.
+
+    Args:
+        pcd (PointCloud): Legacy or tensor point cloud, modified in place.
+        name (str): "points", "normals" or "colors".
+        values (np.ndarray): (N, 3) array of values, e.g. a read-only view of a
+            memory-mapped file.
+    """
+    if is_tensor(pcd):
+        dtype = np.float32
+        if has_array(pcd, "points"):
+            dtype = pcd.point.positions.numpy().dtype
+        # The copy is owned by the tensor, which shares its memory.
+        values = np.array(values, dtype=dtype)
+        pcd.point[_TENSOR_ATTRIBUTES[name]] = o3d.core.Tensor.from_numpy(values)
+    else:
+        # Open3D only wraps writeable float64 arrays, copying them.
+        values = np.require(values, dtype=np.float64, requirements=["C", "W"])
+        setattr(pcd, name, o3d.utility.Vector3dVector(values))
+
+
+def make_pointcloud(
+    points: np.ndarray,
+    normals: np.ndarray | None = None,
+    colors: np.ndarray | None = None,
+    float32: bool = False,
+) -> PointCloud:
+    """
+    Build a point cloud from arrays.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points.
+        normals (np.ndarray | None): Optional (N, 3) array of normals.
+        colors (np.ndarray | None): Optional (N, 3) array of colours in [0, 1].
+        float32 (bool): Whether to build a tensor point cloud with float32 storage
+            instead of a legacy point cloud with float64 storage. Defaults to False.
+
+    Returns:
+        PointCloud: The point cloud.
+    """
+    pcd = o3d.t.geometry.PointCloud() if float32 else o3d.geometry.PointCloud()
+    set_array(pcd, "points", points)
+    if normals is not None:
+        set_array(pcd, "normals", normals)
+    if colors is not None:
+        set_array(pcd, "colors", colors)
+
+    return pcd
+
+
+def to_legacy(pcd: PointCloud) -> o3d.geometry.PointCloud:
+    """
+    Convert a point cloud to a legacy point cloud, copying it to float64 if it is a
+    tensor point cloud. Only needed by Open3D functions without tensor support, such
+    as the visualiser.
+
+    Args:
+        pcd (PointCloud): Legacy or tensor point cloud.
+
+    Returns:
+        o3d.geometry.PointCloud: The legacy point cloud.
+    """
+    return pcd.to_legacy() if is_tensor(pcd) else pcd
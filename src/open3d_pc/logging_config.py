@@ -2,19 +2,30 @@ import logging
 import logging.config
 from pathlib import Path
 
-import yaml
-
 logger = logging.getLogger(__name__)
 
+_configured = False
+
 
-def setup_logging(cfg_path="conf/logging.yaml", default_level=logging.INFO):
+def setup_logging(
+    cfg_path="conf/logging.yaml", default_level=logging.INFO, force=False
+):
     """
     Set up basic logging configuration from YAML file.
+
+    Logging is configured once per process; later calls are no-ops unless `force` is
+    set, so long-lived workers can call this per job without re-reading the file.
     """
+    global _configured
+    if _configured and not force:
+        return
+
     logs_dir = Path("logs")
     logs_dir.mkdir(exist_ok=True)
 
     try:
+        import yaml
+
         with open(cfg_path, "rt", encoding="utf-8") as _f:
             log_config = yaml.safe_load(_f)
         logging.config.dictConfig(log_config)
@@ -27,3 +38,5 @@ def setup_logging(cfg_path="conf/logging.yaml", default_level=logging.INFO):
             datefmt="%Y-%m-%d %H:%M:%S",
         )
         logger.info("Basic config is being used.")
+
+    _configured = True
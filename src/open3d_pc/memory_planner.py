@@ -0,0 +1,383 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from src.open3d_pc.geometry import PointCloud, get_array, has_array, is_tensor
+from src.open3d_pc.point_cloud_clusterer import PointCloudClusterer
+from src.open3d_pc.point_cloud_loader import (
+    ARRAY_EXTENSIONS,
+    TEXT_EXTENSIONS,
+    PointCloudLoader,
+)
+from src.open3d_pc.point_cloud_preprocessor import PointCloudPreprocessor
+from src.open3d_pc.spatial import radius_search
+
+logger = logging.getLogger(__name__)
+
+# Approximate peak memory of each stage, measured with Open3D 0.19 on float64 clouds
+# (see the "Memory Planning" section of the README). Loading holds the attributes
+# twice while Open3D's vectors grow, and voxel downsampling at worst keeps every
+# point in its voxel map.
+_LOAD_FACTOR = 2
+_DOWNSAMPLE_BYTES = 200
+_NORMALS_BYTES = 80
+# Open3D's DBSCAN keeps the neighbour list of every point.
+_DBSCAN_BYTES = 48
+_DBSCAN_BYTES_PER_NEIGHBOR = 5
+# Radius searches return int64 indices and float64 distances, which the neighbour
+# graph, the tiled DBSCAN and the incremental stages then sort and narrow.
+_SEARCH_BYTES = 16
+_SEARCH_BYTES_PER_NEIGHBOR = 40
+
+# Points queried and searched to estimate the mean number of neighbours.
+_NEIGHBOR_QUERIES = 1000
+_NEIGHBOR_SAMPLE = 50_000
+
+# Smallest chunk streamed when a file does not fit the budget.
+_MIN_CHUNK_SIZE = 10_000
+
+
+@dataclass
+class MemoryPlan:
+    """
+    Memory estimates and strategy chosen by `MemoryPlanner` for one input.
+
+    Attributes:
+        max_memory (int): Memory budget in bytes.
+        n_points (int | None): Number of points in the input, from its header.
+        load_bytes (int | None): Estimated peak of loading and downsampling the
+            whole input at once.
+        chunk_size (int | None): Number of points per chunk if the input is streamed
+            because it does not fit, otherwise None.
+        n_processed_points (int | None): Number of points after downsampling.
+        processed_bytes (int | None): Size of the downsampled cloud with normals.
+        neighbors (float | None): Estimated mean number of neighbours of a point
+            within the neighbour graph radius, if the graph was requested.
+        share_neighbor_graph (bool): Whether the neighbour graph is built.
+        normal_tile_size (float | None): Tile size chosen for normal estimation.
+        cluster_tile_size (float | None): Tile size chosen for DBSCAN.
+        decisions (list[str]): Human-readable description of every decision.
+    """
+
+    max_memory: int
+    n_points: int | None = None
+    load_bytes: int | None = None
+    chunk_size: int | None = None
+    n_processed_points: int | None = None
+    processed_bytes: int | None = None
+    neighbors: float | None = None
+    share_neighbor_graph: bool = True
+    normal_tile_size: float | None = None
+    cluster_tile_size: float | None = None
+    decisions: list[str] = field(default_factory=list)
+    _overrides: list[tuple[Any, str, Any]] = field(default_factory=list, repr=False)
+
+    def decide(self, message: str, warning: bool = False) -> None:
+        """
+        Record and log a decision.
+
+        Args:
+            message (str): Description of the decision.
+            warning (bool): Whether to log it as a warning, e.g. when the budget
+                cannot be met. Defaults to False.
+        """
+        self.decisions.append(message)
+        if warning:
+            logger.warning(message)
+        else:
+            logger.info(message)
+
+    def override(self, obj: Any, name: str, value: Any) -> None:
+        """
+        Set an attribute of a pipeline component for the current run only.
+
+        Args:
+            obj (Any): Component to change, e.g. the preprocessor.
+            name (str): Attribute name.
+            value (Any): Value used for this run.
+        """
+        self._overrides.append((obj, name, getattr(obj, name)))
+        setattr(obj, name, value)
+
+    def restore(self) -> None:
+        """
+        Restore the attributes changed with `override`, in reverse order.
+        """
+        while self._overrides:
+            obj, name, value = self._overrides.pop()
+            setattr(obj, name, value)
+
+    def to_dict(self) -> dict:
+        return {
+            key: value for key, value in vars(self).items() if not key.startswith("_")
+        }
+
+
+class MemoryPlanner:
+    """
+    Chooses how a pipeline run processes an input so that it stays within a memory
+    budget.
+
+    Before loading, the number of points is read from the file's header, and the
+    input is streamed in chunks if loading and downsampling it at once could exceed
+    the budget. After downsampling, the footprint of the neighbour graph, normal
+    estimation and DBSCAN is estimated from the number of points and a sampled mean
+    neighbour count. Stages that would exceed the budget left by the downsampled
+    cloud drop the shared neighbour graph or switch to tiled processing, with tiles
+    sized to fit.
+
+    The estimates are approximations of Open3D's and this project's allocations,
+    not guarantees; they err on the side of switching strategies early.
+
+    Attributes:
+        max_memory (int): Memory budget of a pipeline run in bytes.
+        preprocessor (PointCloudPreprocessor): The pipeline's preprocessor.
+        clusterer (PointCloudClusterer): The pipeline's clusterer.
+    """
+
+    def __init__(
+        self,
+        max_memory: int,
+        preprocessor: PointCloudPreprocessor,
+        clusterer: PointCloudClusterer,
+    ):
+        """
+        Initialise the MemoryPlanner.
+
+        Args:
+            max_memory (int): Memory budget of a pipeline run in bytes.
+            preprocessor (PointCloudPreprocessor): The pipeline's preprocessor.
+            clusterer (PointCloudClusterer): The pipeline's clusterer.
+
+        Raises:
+            ValueError: If max_memory is not positive.
+        """
+        if max_memory <= 0:
+            raise ValueError(f"max_memory must be positive, got {max_memory}")
+
+        self.max_memory = max_memory
+        self.preprocessor = preprocessor
+        self.clusterer = clusterer
+
+    def plan_load(self, loader: PointCloudLoader) -> MemoryPlan:
+        """
+        Decide whether to load an input at once or stream it in chunks.
+
+        Streaming needs a format that can be read in chunks, i.e. an ASCII
+        `.xyz`/`.pts` file, a NumPy file or a binary little-endian PLY, and no
+        `target_points` or `memory_budget`, which need the whole cloud. Only the
+        coordinates are streamed, so normals and colours stored in the file are
+        dropped.
+
+        Args:
+            loader (PointCloudLoader): Loader configured with the input file.
+
+        Returns:
+            MemoryPlan: Plan holding the load estimates and chunk size.
+        """
+        plan = MemoryPlan(max_memory=self.max_memory)
+        if loader.chunk_size:
+            plan.decide(f"Streaming in configured chunks of {loader.chunk_size}.")
+            return plan
+
+        plan.n_points, attributes = loader.inspect()
+        itemsize = 4 if loader.float32 else 8
+        load_bytes = _LOAD_FACTOR * 3 * itemsize * len(attributes)
+        plan.load_bytes = plan.n_points * (load_bytes + _DOWNSAMPLE_BYTES)
+        if plan.load_bytes <= self.max_memory:
+            return plan
+
+        estimate = (
+            f"Loading {plan.n_points} points at once needs about "
+            f"{_mb(plan.load_bytes)}, over max_memory of {_mb(self.max_memory)}"
+        )
+        if self.preprocessor.has_target():
+            plan.decide(
+                f"{estimate}, but target_points and memory_budget need the whole "
+                "cloud.",
+                warning=True,
+            )
+        elif not _is_streamable(loader):
+            plan.decide(f"{estimate}, but {loader.path} cannot be streamed.", True)
+        else:
+            # A quarter of the budget for each chunk, the rest for the voxels.
+            chunk_bytes = 4 * (3 * 8 + _DOWNSAMPLE_BYTES)
+            plan.chunk_size = max(self.max_memory // chunk_bytes, _MIN_CHUNK_SIZE)
+            plan.decide(f"{estimate}: streaming in chunks of {plan.chunk_size}.")
+
+        return plan
+
+    def plan_processing(
+        self,
+        plan: MemoryPlan,
+        pcd: PointCloud,
+        neighbor_radius: float | None,
+    ) -> float | None:
+        """
+        Decide how to run the stages after downsampling: whether to build the
+        shared neighbour graph, and whether to tile normal estimation and DBSCAN.
+        Tile sizes are set on the preprocessor and clusterer for this run only,
+        until `plan.restore()` is called.
+
+        Args:
+            plan (MemoryPlan): Plan of the run, updated in place.
+            pcd (PointCloud): The downsampled point cloud.
+            neighbor_radius (float | None): Radius of the shared neighbour graph, or
+                None if it is not requested.
+
+        Returns:
+            float | None: The neighbour graph radius to use, or None to skip it.
+        """
+        points = get_array(pcd)
+        itemsize = 4 if is_tensor(pcd) else 8
+        n_attributes = 3 if has_array(pcd, "colors") else 2
+        plan.n_processed_points = len(points)
+        plan.processed_bytes = len(points) * 3 * itemsize * n_attributes
+        available = self.max_memory - plan.processed_bytes
+        if available <= 0:
+            plan.decide(
+                f"The downsampled cloud alone takes {_mb(plan.processed_bytes)}, "
+                f"over max_memory of {_mb(self.max_memory)}. Set "
+                "preprocessor.memory_budget to choose a coarser voxel size.",
+                warning=True,
+            )
+            available = 0
+        if len(points) == 0:
+            return neighbor_radius
+
+        if neighbor_radius is not None:
+            radius = max(neighbor_radius, self.preprocessor.normal_radius)
+            if self.preprocessor.outlier_removal == "radius":
+                radius = max(radius, self.preprocessor.effective_outlier_radius())
+            plan.neighbors = estimate_neighbors(points, radius)
+            graph_bytes = _search_bytes(len(points), plan.neighbors)
+            if graph_bytes <= available:
+                return neighbor_radius
+            plan.share_neighbor_graph = False
+            plan.decide(
+                f"Neighbour graph of {len(points)} points needs about "
+                f"{_mb(graph_bytes)}, over the {_mb(available)} left: not sharing it."
+            )
+
+        self._plan_normals(plan, points, available)
+        self._plan_dbscan(plan, points, available)
+
+        return None
+
+    def _plan_normals(
+        self,
+        plan: MemoryPlan,
+        points: np.ndarray,
+        available: int,
+    ) -> None:
+        """
+        Tile normal estimation if estimating the normals at once does not fit.
+        """
+        normals_bytes = len(points) * _NORMALS_BYTES
+        if normals_bytes <= available or self.preprocessor.normal_tile_size:
+            return
+
+        tile_points = available / (_NORMALS_BYTES * self.preprocessor.n_jobs)
+        plan.normal_tile_size = _tile_size(
+            points, tile_points, self.preprocessor.normal_radius
+        )
+        plan.override(self.preprocessor, "normal_tile_size", plan.normal_tile_size)
+        plan.decide(
+            f"Normal estimation needs about {_mb(normals_bytes)}, over the "
+            f"{_mb(available)} left: tiling it with tile size "
+            f"{plan.normal_tile_size:.6g}."
+        )
+
+    def _plan_dbscan(
+        self,
+        plan: MemoryPlan,
+        points: np.ndarray,
+        available: int,
+    ) -> None:
+        """
+        Tile DBSCAN if clustering the whole cloud at once does not fit. Only the
+        "open3d" backend is tiled; the grid backend bounds its own memory.
+        """
+        if self.clusterer.tile_size or self.clusterer.backend != "open3d":
+            return
+
+        neighbors = estimate_neighbors(points, self.clusterer.eps)
+        per_point = _DBSCAN_BYTES + _DBSCAN_BYTES_PER_NEIGHBOR * neighbors
+        dbscan_bytes = int(len(points) * per_point)
+        if dbscan_bytes <= available:
+            return
+
+        tile_points = available / (_search_bytes(1, neighbors) * self.clusterer.n_jobs)
+        plan.cluster_tile_size = _tile_size(points, tile_points, self.clusterer.eps)
+        plan.override(self.clusterer, "tile_size", plan.cluster_tile_size)
+        plan.decide(
+            f"DBSCAN needs about {_mb(dbscan_bytes)}, over the {_mb(available)} "
+            f"left: tiling it with tile size {plan.cluster_tile_size:.6g}."
+        )
+
+
+def estimate_neighbors(points: np.ndarray, radius: float, seed: int = 0) -> float:
+    """
+    Estimate the mean number of points within `radius` of a point, including the
+    point itself, from a random sample instead of searching the whole cloud.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points.
+        radius (float): Search radius.
+        seed (int): Seed of the sample. Defaults to 0.
+
+    Returns:
+        float: The estimated mean neighbour count.
+    """
+    if len(points) == 0:
+        return 0.0
+
+    rng = np.random.default_rng(seed)
+    sample = points
+    if len(points) > _NEIGHBOR_SAMPLE:
+        sample = points[rng.choice(len(points), _NEIGHBOR_SAMPLE, replace=False)]
+    queries = sample[: min(_NEIGHBOR_QUERIES, len(sample))]
+    offsets, _, _ = radius_search(np.ascontiguousarray(sample), queries, radius)
+    others = (offsets[-1] - len(queries)) / len(queries)
+
+    # Every other neighbour in the sample stands for N / sample size in the cloud.
+    return 1.0 + others * len(points) / len(sample)
+
+
+def _search_bytes(n_points: int, neighbors: float) -> int:
+    """
+    Estimate the peak memory of a radius search over `n_points` points.
+    """
+    return int(n_points * (_SEARCH_BYTES + _SEARCH_BYTES_PER_NEIGHBOR * neighbors))
+
+
+def _tile_size(points: np.ndarray, tile_points: float, halo: float) -> float:
+    """
+    Choose the edge length of tiles holding about `tile_points` points each.
+
+    Points are assumed to lie on surfaces, so the number of points in a tile grows
+    with the square of its edge length; volumetric clouds then get smaller tiles
+    than needed. Tiles are at least four halos wide, since narrower tiles would
+    mostly hold halo points.
+    """
+    extent = float((points.max(axis=0) - points.min(axis=0)).max())
+    fraction = min(max(tile_points, 1.0) / len(points), 1.0)
+
+    return max(extent * np.sqrt(fraction), 4 * halo)
+
+
+def _is_streamable(loader: PointCloudLoader) -> bool:
+    """
+    Check whether `PointCloudLoader.iter_chunks` can stream a file in `mmap` mode
+    without reading it whole.
+    """
+    path = loader.path.lower()
+    return path.endswith(TEXT_EXTENSIONS + ARRAY_EXTENSIONS) or (
+        loader.is_mappable_ply()
+    )
+
+
+def _mb(n_bytes: float) -> str:
+    return f"{n_bytes / 1e6:.3g} MB"
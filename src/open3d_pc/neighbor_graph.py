@@ -0,0 +1,189 @@
+import logging
+
+import numpy as np
+
+from src.open3d_pc.geometry import PointCloud, get_array
+from src.open3d_pc.spatial import radius_search
+
+logger = logging.getLogger(__name__)
+
+
+class NeighborGraph:
+    """
+    Fixed-radius neighbour graph of a point cloud, built once and shared between
+    stages that search the same points, such as normal estimation and clustering.
+
+    The graph is stored in compressed sparse row form: the neighbours of point `i`
+    are `indices[offsets[i]:offsets[i + 1]]`, sorted by distance, with the point
+    itself first. Stages needing a smaller radius or a maximum number of neighbours
+    use `restrict()` instead of searching again.
+
+    Attributes:
+        radius (float): Search radius the graph was built with.
+        offsets (np.ndarray): (N + 1,) row offsets into `indices`.
+        indices (np.ndarray): Index of every neighbour.
+        sq_distances (np.ndarray): Squared distance to every neighbour.
+    """
+
+    def __init__(
+        self,
+        offsets: np.ndarray,
+        indices: np.ndarray,
+        sq_distances: np.ndarray,
+        radius: float,
+    ):
+        self.offsets = offsets
+        self.indices = indices
+        self.sq_distances = sq_distances
+        self.radius = radius
+
+    @classmethod
+    def build(cls, points: np.ndarray, radius: float) -> "NeighborGraph":
+        """
+        Build the neighbour graph of a set of points.
+
+        Args:
+            points (np.ndarray): (N, 3) array of points.
+            radius (float): Search radius.
+
+        Returns:
+            NeighborGraph: The neighbour graph.
+
+        Raises:
+            ValueError: If radius is not positive.
+        """
+        if radius <= 0:
+            raise ValueError(f"radius must be positive, got {radius}")
+
+        offsets, indices, sq_distances = radius_search(
+            points, points, radius, sort=True
+        )
+        if len(points) <= np.iinfo(np.int32).max:
+            # Halves the size of the graph, which is kept across stages.
+            indices = indices.astype(np.int32)
+        logger.debug(
+            f"Built neighbour graph of {len(points)} points with {len(indices)} "
+            f"edges at radius {radius}."
+        )
+
+        return cls(offsets, indices, sq_distances, radius)
+
+    @classmethod
+    def from_pointcloud(
+        cls,
+        pcd: PointCloud,
+        radius: float,
+    ) -> "NeighborGraph":
+        """
+        Build the neighbour graph of a point cloud.
+
+        Args:
+            pcd (PointCloud): Input point cloud.
+            radius (float): Search radius.
+
+        Returns:
+            NeighborGraph: The neighbour graph.
+        """
+        return cls.build(get_array(pcd), radius)
+
+    @property
+    def n_points(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices)
+
+    def counts(self) -> np.ndarray:
+        """
+        Get the number of neighbours of every point, including the point itself.
+
+        Returns:
+            np.ndarray: (N,) array of neighbour counts.
+        """
+        return np.diff(self.offsets)
+
+    def rows(self) -> np.ndarray:
+        """
+        Get the source point of every edge.
+
+        Returns:
+            np.ndarray: Array of the same length as `indices`.
+        """
+        return np.repeat(np.arange(self.n_points), self.counts())
+
+    def restrict(self, radius: float, max_nn: int | None = None) -> "NeighborGraph":
+        """
+        Keep only the neighbours within a smaller radius, and at most the `max_nn`
+        nearest of them, which matches a hybrid KD-tree search.
+
+        Args:
+            radius (float): Search radius, at most the graph's radius.
+            max_nn (int | None): Maximum number of neighbours per point. If None,
+                the number of neighbours is not limited.
+
+        Returns:
+            NeighborGraph: The restricted graph, or this graph if nothing is removed.
+
+        Raises:
+            ValueError: If radius exceeds the graph's radius.
+        """
+        self.check_radius(radius)
+        rows = self.rows()
+        keep = self.sq_distances <= radius**2
+        if max_nn is not None:
+            # Neighbours are sorted by distance, so the rank within a row is the rank
+            # among the neighbours within the radius.
+            keep &= np.arange(self.n_edges) - self.offsets[rows] < max_nn
+        if keep.all():
+            return self
+
+        offsets = np.zeros(self.n_points + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows[keep], minlength=self.n_points), out=offsets[1:])
+
+        return NeighborGraph(
+            offsets, self.indices[keep], self.sq_distances[keep], radius
+        )
+
+    def subset(self, keep: np.ndarray) -> "NeighborGraph":
+        """
+        Keep only a subset of the points, e.g. after removing outliers, dropping the
+        edges to the removed points and renumbering the remaining ones.
+
+        Args:
+            keep (np.ndarray): (N,) boolean mask of the points to keep.
+
+        Returns:
+            NeighborGraph: The graph of the kept points.
+        """
+        new_index = np.cumsum(keep) - 1
+        rows = self.rows()
+        edges = keep[rows] & keep[self.indices]
+        offsets = np.zeros(int(keep.sum()) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(new_index[rows[edges]], minlength=len(offsets) - 1),
+            out=offsets[1:],
+        )
+
+        return NeighborGraph(
+            offsets,
+            new_index[self.indices[edges]].astype(self.indices.dtype),
+            self.sq_distances[edges],
+            self.radius,
+        )
+
+    def check_radius(self, radius: float) -> None:
+        """
+        Check that the graph holds every neighbour within a radius.
+
+        Args:
+            radius (float): Radius required by the caller.
+
+        Raises:
+            ValueError: If radius exceeds the graph's radius.
+        """
+        if radius > self.radius:
+            raise ValueError(
+                f"Neighbour graph radius {self.radius} is smaller than the required "
+                f"radius {radius}"
+            )
@@ -0,0 +1,227 @@
+import json
+import logging
+import os
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageMetrics:
+    """
+    Metrics recorded for a single pipeline stage.
+
+    Attributes:
+        name (str): Name of the stage, e.g. "load" or "dbscan".
+        start (float): Start time in seconds, relative to the profiler's creation.
+        wall_time (float): Wall time spent in the stage in seconds.
+        cpu_time (float): CPU time of the process (all threads) in seconds.
+        peak_rss_delta (int | None): Increase of the process's peak resident set size
+            during the stage in bytes, or None if it cannot be measured.
+        points_in (int | None): Number of points entering the stage.
+        points_out (int | None): Number of points leaving the stage.
+    """
+
+    name: str
+    start: float = 0.0
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    peak_rss_delta: int | None = None
+    points_in: int | None = None
+    points_out: int | None = None
+
+
+class ProfilerHook:
+    """
+    Base class for forwarding pipeline metrics to an external collector. Subclasses
+    override the callbacks they need.
+    """
+
+    def on_stage_end(self, metrics: StageMetrics) -> None:
+        """
+        Called after each stage completes.
+
+        Args:
+            metrics (StageMetrics): Metrics of the completed stage.
+        """
+
+    def on_report(self, report: dict) -> None:
+        """
+        Called once with the full report when a pipeline run completes.
+
+        Args:
+            report (dict): Report returned by `PipelineProfiler.report()`.
+        """
+
+
+class LoggingHook(ProfilerHook):
+    """
+    Logs the metrics of every stage at INFO level.
+    """
+
+    def on_stage_end(self, metrics: StageMetrics) -> None:
+        rss = (
+            f"{metrics.peak_rss_delta / 2**20:.1f} MiB"
+            if metrics.peak_rss_delta is not None
+            else "n/a"
+        )
+        logger.info(
+            f"Stage {metrics.name}: wall {metrics.wall_time:.3f}s, "
+            f"cpu {metrics.cpu_time:.3f}s, peak RSS +{rss}, "
+            f"points {metrics.points_in} -> {metrics.points_out}."
+        )
+
+
+class PipelineProfiler:
+    """
+    Records wall time, CPU time, peak memory and point counts of pipeline stages.
+
+    Stages are recorded with the `stage()` context manager. The caller sets
+    `points_out` on the yielded metrics once the stage's output is known.
+
+    Attributes:
+        hooks (list[ProfilerHook]): Hooks notified of every completed stage and of
+            the final report.
+        stages (list[StageMetrics]): Metrics of the completed stages, in order.
+    """
+
+    def __init__(self, hooks: list[ProfilerHook] | None = None):
+        self.hooks = list(hooks or [])
+        self.stages = []
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, points_in: int | None = None) -> Iterator[StageMetrics]:
+        """
+        Record the metrics of a stage.
+
+        Args:
+            name (str): Name of the stage.
+            points_in (int | None): Number of points entering the stage.
+
+        Yields:
+            StageMetrics: Metrics of the stage, filled in when the stage exits.
+        """
+        metrics = StageMetrics(name=name, points_in=points_in)
+        rss_before = _peak_rss()
+        cpu_before = time.process_time()
+        wall_before = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            metrics.start = wall_before - self._origin
+            metrics.wall_time = time.perf_counter() - wall_before
+            metrics.cpu_time = time.process_time() - cpu_before
+            if rss_before is not None:
+                metrics.peak_rss_delta = _peak_rss() - rss_before
+            self.stages.append(metrics)
+            for hook in self.hooks:
+                hook.on_stage_end(metrics)
+
+    def merge(self, other: "PipelineProfiler") -> None:
+        """
+        Add the stages recorded by another profiler, e.g. on a background thread,
+        and pass them to every hook. Their start times are rebased onto this
+        profiler's origin, so stages recorded before it was created start before 0.
+
+        Args:
+            other (PipelineProfiler): Profiler whose stages are added.
+        """
+        offset = other._origin - self._origin
+        for metrics in other.stages:
+            metrics.start += offset
+            self.stages.append(metrics)
+            for hook in self.hooks:
+                hook.on_stage_end(metrics)
+
+    def report(self) -> dict:
+        """
+        Build the report of all recorded stages.
+
+        Returns:
+            dict: JSON-serialisable report with the metrics of every stage and the
+                total wall and CPU time.
+        """
+        return {
+            "stages": [asdict(metrics) for metrics in self.stages],
+            "total_wall_time": sum(metrics.wall_time for metrics in self.stages),
+            "total_cpu_time": sum(metrics.cpu_time for metrics in self.stages),
+        }
+
+    def finish(self) -> dict:
+        """
+        Build the report and pass it to every hook.
+
+        Returns:
+            dict: The report returned by `report()`.
+        """
+        report = self.report()
+        for hook in self.hooks:
+            hook.on_report(report)
+
+        return report
+
+    def write_json(self, path: str | Path) -> None:
+        """
+        Write the report as a JSON file.
+
+        Args:
+            path (str | Path): Output file path.
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def write_chrome_trace(self, path: str | Path) -> None:
+        """
+        Write the stages in the Chrome trace event format, which can be opened in
+        chrome://tracing or Perfetto.
+
+        Args:
+            path (str | Path): Output file path.
+        """
+        events = [
+            {
+                "name": metrics.name,
+                "ph": "X",
+                "ts": metrics.start * 1e6,
+                "dur": metrics.wall_time * 1e6,
+                "pid": os.getpid(),
+                "tid": 0,
+                "args": {
+                    "cpu_time": metrics.cpu_time,
+                    "peak_rss_delta": metrics.peak_rss_delta,
+                    "points_in": metrics.points_in,
+                    "points_out": metrics.points_out,
+                },
+            }
+            for metrics in self.stages
+        ]
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def _peak_rss() -> int | None:
+    """
+    Get the peak resident set size of the current process in bytes.
+
+    Returns:
+        int | None: Peak RSS in bytes, or None if it cannot be measured.
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
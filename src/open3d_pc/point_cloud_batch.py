@@ -0,0 +1,516 @@
+import glob
+import logging
+import multiprocessing
+import os
+import time
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from src.open3d_pc.config import to_dict
+from src.open3d_pc.geometry import PointCloud, make_pointcloud, point_count
+from src.open3d_pc.point_cloud_loader import SUPPORTED_EXTENSIONS
+from src.open3d_pc.point_cloud_pipeline import LoadedInput, PointCloudPipeline
+
+if TYPE_CHECKING:
+    from omegaconf import DictConfig
+
+logger = logging.getLogger(__name__)
+
+# Pipeline built once per worker process by `_init_worker`.
+_worker_pipeline: PointCloudPipeline | None = None
+_worker_output_dir: Path | None = None
+
+
+@dataclass
+class BatchFileResult:
+    """
+    Result of processing a single file in a batch.
+
+    Attributes:
+        path (str): Path of the processed point cloud file.
+        labels (np.ndarray | None): Cluster labels, or None if processing failed.
+        n_points (int): Number of points in the loaded point cloud.
+        n_processed_points (int): Number of points after preprocessing.
+        n_clusters (int): Number of clusters found.
+        elapsed (float): Wall time spent on the file in seconds.
+        error (str | None): Error message if processing failed, otherwise None.
+    """
+
+    path: str
+    labels: np.ndarray | None = None
+    n_points: int = 0
+    n_processed_points: int = 0
+    n_clusters: int = 0
+    elapsed: float = 0.0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchSummary:
+    """
+    Aggregate statistics of a batch run.
+
+    Attributes:
+        n_files (int): Number of files submitted.
+        n_failed (int): Number of files that failed to process.
+        n_points (int): Total number of loaded points over all successful files.
+        elapsed (float): Wall time of the whole batch in seconds.
+        failed (list[str]): Paths of the files that failed.
+    """
+
+    n_files: int = 0
+    n_failed: int = 0
+    n_points: int = 0
+    elapsed: float = 0.0
+    failed: list[str] = field(default_factory=list)
+
+    def add(self, result: BatchFileResult) -> None:
+        """
+        Count the result of a single file.
+
+        Args:
+            result (BatchFileResult): Result of the processed file.
+        """
+        if result.ok:
+            self.n_points += result.n_points
+        else:
+            self.n_failed += 1
+            self.failed.append(result.path)
+
+    @property
+    def files_per_second(self) -> float:
+        return self.n_files / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def points_per_second(self) -> float:
+        return self.n_points / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _init_worker(pipeline_cfg: dict) -> None:
+    """
+    Build the pipeline once per worker process. Visualisation is always disabled in
+    workers, and clusters are saved to a per-file subdirectory of `output_dir`.
+    """
+    global _worker_pipeline, _worker_output_dir
+
+    _worker_pipeline = PointCloudPipeline.from_config(pipeline_cfg)
+    _worker_pipeline.cluster_output_cfg["visualize"] = False
+    _worker_output_dir = Path(
+        _worker_pipeline.cluster_output_cfg.get("output_dir", "output_clusters")
+    )
+
+
+def output_subdirs(paths: Iterable[str]) -> dict[str, Path]:
+    """
+    Name the cluster directory of every file after its path relative to the
+    deepest directory holding all files, without the extension. Files that would
+    still share a directory, such as "scan.ply" and "scan.xyz", keep their
+    extension in it, e.g. "scan_ply".
+
+    Args:
+        paths (Iterable[str]): Paths of the files.
+
+    Returns:
+        dict[str, Path]: Relative cluster directory of every path.
+    """
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        return {}
+
+    resolved = [Path(path).resolve() for path in paths]
+    root = Path(os.path.commonpath([path.parent for path in resolved]))
+    names = [path.relative_to(root).with_suffix("") for path in resolved]
+    counts = Counter(names)
+
+    return {
+        path: name
+        if counts[name] == 1
+        else name.with_name(f"{name.name}_{full.suffix.lstrip('.')}")
+        for path, full, name in zip(paths, resolved, names, strict=True)
+    }
+
+
+def _process_file(path: str, output_subdir: Path | None = None) -> BatchFileResult:
+    """
+    Run the worker's pipeline on a single file, capturing any error in the result.
+    Clusters are saved to `output_subdir` of the output directory, or to a
+    directory named after the file's stem if it is None.
+    """
+    start = time.perf_counter()
+    try:
+        _worker_pipeline.cluster_output_cfg["output_dir"] = str(
+            _worker_output_dir / (output_subdir or Path(path).stem)
+        )
+        processed_pcd, labels = _worker_pipeline.run(path)
+    except Exception as e:
+        return BatchFileResult(
+            path=path,
+            elapsed=time.perf_counter() - start,
+            error=f"{type(e).__name__}: {e}",
+        )
+
+    return _worker_result(path, processed_pcd, labels, start)
+
+
+def _process_points(points: np.ndarray, name: str = "<points>") -> BatchFileResult:
+    """
+    Run the worker's pipeline on an in-memory (N, 3) array of points, capturing any
+    error in the result. Clusters are never saved, as there is no file to name their
+    directory after.
+    """
+    start = time.perf_counter()
+    save_clusters = _worker_pipeline.cluster_output_cfg.get("save_clusters", False)
+    _worker_pipeline.cluster_output_cfg["save_clusters"] = False
+    try:
+        loaded = LoadedInput(
+            path=name,
+            pcd=make_pointcloud(points, float32=_worker_pipeline.loader.float32),
+            n_points=len(points),
+        )
+        processed_pcd, labels = _worker_pipeline.run(loaded=loaded)
+    except Exception as e:
+        return BatchFileResult(
+            path=name,
+            elapsed=time.perf_counter() - start,
+            error=f"{type(e).__name__}: {e}",
+        )
+    finally:
+        _worker_pipeline.cluster_output_cfg["save_clusters"] = save_clusters
+
+    return _worker_result(name, processed_pcd, labels, start)
+
+
+def _worker_result(
+    path: str,
+    processed_pcd: PointCloud,
+    labels: np.ndarray,
+    start: float,
+) -> BatchFileResult:
+    """
+    Build the result of a successful run of the worker's pipeline.
+    """
+    return BatchFileResult(
+        path=path,
+        labels=labels,
+        n_points=_worker_pipeline.loader.n_points,
+        n_processed_points=point_count(processed_pcd),
+        n_clusters=int(labels.max()) + 1 if len(labels) else 0,
+        elapsed=time.perf_counter() - start,
+    )
+
+
+class PointCloudBatchProcessor:
+    """
+    Processes many point cloud files in parallel across a pool of worker processes.
+
+    Each worker builds its own PointCloudPipeline once from the pipeline config and
+    reuses it for every file it is given. Results are streamed back per file as they
+    complete, and failures are isolated to the file that caused them, including
+    worker crashes, after which the pool is restarted.
+
+    Attributes:
+        pipeline_cfg (dict): Nested pipeline configuration with "loader",
+            "preprocessor", "clusterer", and "cluster_output" sections.
+        num_workers (int | None): Number of worker processes. Defaults to the number
+            of CPUs.
+        start_method (str): Multiprocessing start method for the workers. Defaults to
+            "spawn", which is safe to use with Open3D's thread pools.
+        max_pending (int): Maximum number of files submitted to the pool at once.
+        summary (BatchSummary): Aggregate statistics of the latest run.
+    """
+
+    def __init__(
+        self,
+        pipeline_cfg: dict,
+        num_workers: int | None = None,
+        start_method: str = "spawn",
+        max_pending: int | None = None,
+    ):
+        self.pipeline_cfg = pipeline_cfg
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.start_method = start_method
+        self.max_pending = max_pending or 2 * self.num_workers
+        self.summary = BatchSummary()
+
+    @classmethod
+    def from_config(cls, cfg: "DictConfig | dict") -> "PointCloudBatchProcessor":
+        """
+        Alternative constructor to create a PointCloudBatchProcessor from a DictConfig
+        or a nested config dictionary with a "batch" section.
+
+        Args:
+            cfg (DictConfig | dict): Full pipeline configuration.
+
+        Returns:
+            PointCloudBatchProcessor: Instance configured from the "batch" section.
+        """
+        cfg = to_dict(cfg)
+
+        batch_cfg = cfg.get("batch") or {}
+        return cls(
+            pipeline_cfg={key: value for key, value in cfg.items() if key != "batch"},
+            num_workers=batch_cfg.get("num_workers"),
+            start_method=batch_cfg.get("start_method", "spawn"),
+            max_pending=batch_cfg.get("max_pending"),
+        )
+
+    @staticmethod
+    def collect_files(source: str | Path, pattern: str = "*") -> list[str]:
+        """
+        Collect supported point cloud files from a directory or a glob expression.
+
+        Args:
+            source (str | Path): Directory to search, or a glob expression such as
+                "scans/**/*.ply".
+            pattern (str): Glob pattern applied inside `source` when it is a
+                directory. Defaults to "*".
+
+        Returns:
+            list[str]: Sorted paths of the supported point cloud files.
+
+        Raises:
+            FileNotFoundError: If no supported files are found.
+        """
+        source = Path(source)
+        if source.is_dir():
+            candidates = source.glob(pattern)
+        else:
+            candidates = map(Path, glob.glob(str(source), recursive=True))
+
+        files = sorted(
+            str(path)
+            for path in candidates
+            if path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS
+        )
+        if not files:
+            raise FileNotFoundError(f"No point cloud files found in {source}")
+
+        return files
+
+    def run(
+        self,
+        inputs: str | Path | Iterable[str | Path],
+        pattern: str = "*",
+    ) -> Iterator[BatchFileResult]:
+        """
+        Process files across the worker pool, yielding results as they complete.
+
+        Args:
+            inputs (str | Path | Iterable[str | Path]): Directory, glob expression, or
+                explicit list of file paths.
+            pattern (str): Glob pattern used when `inputs` is a directory. Defaults
+                to "*".
+
+        Yields:
+            BatchFileResult: Result for each file, in completion order.
+        """
+        if isinstance(inputs, (str, Path)):
+            paths = self.collect_files(inputs, pattern)
+        else:
+            paths = [str(path) for path in inputs]
+
+        self.summary = BatchSummary(n_files=len(paths))
+        logger.info(f"Processing {len(paths)} files with {self.num_workers} workers.")
+        start = time.perf_counter()
+
+        for result in self._run_pool(paths):
+            self._record(result)
+            yield result
+
+        self.summary.elapsed = time.perf_counter() - start
+        logger.info(
+            f"Processed {self.summary.n_files} files "
+            f"({self.summary.n_failed} failed) in {self.summary.elapsed:.2f}s: "
+            f"{self.summary.files_per_second:.2f} files/s, "
+            f"{self.summary.points_per_second:.0f} points/s."
+        )
+
+    def _make_executor(self) -> ProcessPoolExecutor:
+        """
+        Start a pool of worker processes, each building its pipeline once.
+
+        Returns:
+            ProcessPoolExecutor: The worker pool.
+        """
+        return ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker,
+            initargs=(self.pipeline_cfg,),
+        )
+
+    def _run_pool(self, paths: list[str]) -> Iterator[BatchFileResult]:
+        """
+        Process files on the worker pool, replacing the pool whenever a worker dies.
+
+        A worker that dies, e.g. on a segfault in Open3D, breaks the whole pool and
+        fails every file still in flight, not only the one that killed it. The pool
+        is then replaced, and the files that were in flight are retried one at a
+        time, so a file is only reported as failed if it kills a worker on its own.
+
+        Args:
+            paths (list[str]): Paths of the files to process.
+
+        Yields:
+            BatchFileResult: Result for each file, in completion order.
+        """
+        output_names = output_subdirs(paths)
+        queue = deque(paths)
+        # Files in flight when a worker died, retried one at a time.
+        suspects = deque()
+        pending = {}
+        executor = self._make_executor()
+        try:
+            while queue or suspects or pending:
+                try:
+                    self._submit(executor, pending, queue, suspects, output_names)
+                    broken = False
+                except BrokenProcessPool:
+                    broken = True
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                crashed = []
+                for future in done:
+                    path = pending.pop(future)
+                    result = self._result(path, future)
+                    if result is None:
+                        crashed.append(path)
+                    else:
+                        yield result
+
+                if crashed or broken:
+                    executor.shutdown(wait=True)
+                    yield from self._recover(crashed, pending, suspects)
+                    executor = self._make_executor()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _recover(
+        self,
+        crashed: list[str],
+        pending: dict,
+        suspects: deque,
+    ) -> Iterator[BatchFileResult]:
+        """
+        Sort out the files in flight on a pool broken by a dying worker. Files that
+        finished before the crash keep their results. If a single file was in
+        flight, it killed the worker and fails; otherwise the files are retried one
+        at a time.
+
+        Args:
+            crashed (list[str]): Files whose futures failed with the broken pool.
+            pending (dict): Future of every other file in flight, mapped to its
+                path. Emptied on return.
+            suspects (deque): Files to retry one at a time.
+
+        Yields:
+            BatchFileResult: Results of the files that finished or failed.
+        """
+        for future, path in pending.items():
+            result = self._result(path, future)
+            if result is None:
+                crashed.append(path)
+            else:
+                yield result
+        pending.clear()
+
+        if len(crashed) == 1:
+            yield BatchFileResult(
+                path=crashed[0],
+                error="BrokenProcessPool: the worker processing the file died",
+            )
+        else:
+            suspects.extend(crashed)
+        logger.warning(
+            f"A worker died with {len(crashed)} files in flight, restarting the "
+            "worker pool."
+        )
+
+    @staticmethod
+    def _result(path: str, future: Future) -> BatchFileResult | None:
+        """
+        Get the result of a finished future.
+
+        Returns:
+            BatchFileResult | None: The file's result, or None if its worker died.
+        """
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            return None
+        except Exception as e:
+            return BatchFileResult(path=path, error=f"{type(e).__name__}: {e}")
+
+    def _submit(
+        self,
+        executor: ProcessPoolExecutor,
+        pending: dict,
+        queue: deque,
+        suspects: deque,
+        output_names: dict[str, Path],
+    ) -> None:
+        """
+        Submit files until `max_pending` files are in flight. Suspects of a worker
+        crash are submitted alone, so that a crash can be attributed to one file.
+
+        Args:
+            executor (ProcessPoolExecutor): The worker pool.
+            pending (dict): Future of every file in flight, mapped to its path.
+            queue (deque): Files not submitted yet.
+            suspects (deque): Files to retry one at a time.
+            output_names (dict[str, Path]): Cluster directory of every file.
+
+        Raises:
+            BrokenProcessPool: If a worker died. The file is put back in its queue.
+        """
+        if suspects:
+            if not pending:
+                self._submit_next(executor, pending, suspects, output_names)
+            return
+
+        while queue and len(pending) < self.max_pending:
+            self._submit_next(executor, pending, queue, output_names)
+
+    @staticmethod
+    def _submit_next(
+        executor: ProcessPoolExecutor,
+        pending: dict,
+        queue: deque,
+        output_names: dict[str, Path],
+    ) -> None:
+        """
+        Submit the next file of a queue, putting it back if the pool is broken.
+        """
+        path = queue.popleft()
+        try:
+            future = executor.submit(_process_file, path, output_names[path])
+            pending[future] = path
+        except BrokenProcessPool:
+            queue.appendleft(path)
+            raise
+
+    def _record(self, result: BatchFileResult) -> None:
+        """
+        Update the running summary with the result of a single file.
+
+        Args:
+            result (BatchFileResult): Result of the processed file.
+        """
+        self.summary.add(result)
+        if result.ok:
+            logger.info(
+                f"Processed {result.path}: {result.n_points} points, "
+                f"{result.n_clusters} clusters in {result.elapsed:.2f}s."
+            )
+        else:
+            logger.error(f"Failed to process {result.path}: {result.error}")
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.open3d_pc.geometry import PointCloud, get_array
+from src.open3d_pc.point_cloud_loader import PointCloudLoader
+
+logger = logging.getLogger(__name__)
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+class PointCloudCache:
+    """
+    Content-addressed on-disk cache of preprocessed point clouds.
+
+    Entries are keyed on the SHA-256 hash of the input file's content plus the
+    preprocessing parameters, so a changed file or changed parameters never return a
+    stale result. Entries are stored as uncompressed `.npz` files in the precision
+    of the stored point cloud, which are memory-mapped on load, and are named
+    `<file hash>-<params hash>.npz` so all entries of an input file can be
+    invalidated together.
+
+    File hashes are memoised in an index keyed on the file's path, size and
+    modification time, so unchanged files are not re-read on every run.
+
+    Attributes:
+        cache_dir (Path): Directory holding the cache entries. Defaults to
+            ".cache/point_clouds".
+        max_bytes (int | None): Maximum total size of the cache entries. The least
+            recently used entries are evicted when it is exceeded. If None, the cache
+            is unbounded. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path = ".cache/point_clouds",
+        max_bytes: int | None = None,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def make_key(self, path: str | Path, params: dict) -> str:
+        """
+        Build the cache key of an input file and a set of preprocessing parameters.
+
+        Args:
+            path (str | Path): Path to the input point cloud file.
+            params (dict): JSON-serialisable preprocessing parameters.
+
+        Returns:
+            str: The cache key.
+        """
+        params_hash = hashlib.sha256(
+            json.dumps(params, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+        return f"{self.file_hash(path)}-{params_hash[:16]}"
+
+    def file_hash(self, path: str | Path) -> str:
+        """
+        Compute the SHA-256 hash of a file's content, reusing the memoised hash if
+        the file's size and modification time are unchanged.
+
+        Args:
+            path (str | Path): Path to the file.
+
+        Returns:
+            str: Hex digest of the file's content.
+        """
+        path = Path(path).resolve()
+        stat = path.stat()
+        index = self._read_index()
+        entry = index.get(str(path))
+        if (
+            entry
+            and entry["size"] == stat.st_size
+            and entry["mtime"] == stat.st_mtime_ns
+        ):
+            return entry["hash"]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while block := f.read(_HASH_BLOCK_SIZE):
+                digest.update(block)
+
+        index[str(path)] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": digest.hexdigest(),
+        }
+        self._write_index(index)
+
+        return digest.hexdigest()
+
+    def get(self, key: str) -> tuple[PointCloud, dict] | None:
+        """
+        Look up a cached point cloud and mark it as recently used.
+
+        Args:
+            key (str): Cache key from `make_key`.
+
+        Returns:
+            tuple[PointCloud, dict] | None: The cached point cloud and
+                its metadata, or None on a cache miss.
+        """
+        entry = self._entry_path(key)
+        if not entry.exists():
+            logger.debug(f"Cache miss for {key}.")
+            return None
+
+        os.utime(entry)
+        loader = PointCloudLoader(str(entry), mmap=True)
+        # Entries of float32 point clouds are loaded back as float32 point clouds.
+        loader.float32 = loader.load_points().dtype == np.float32
+        pcd = loader.to_pointcloud()
+        with np.load(entry) as data:
+            metadata = json.loads(str(data["metadata"])) if "metadata" in data else {}
+        logger.info(f"Loaded preprocessed point cloud from cache ({key}).")
+
+        return pcd, metadata
+
+    def put(
+        self,
+        key: str,
+        pcd: PointCloud,
+        metadata: dict | None = None,
+    ) -> None:
+        """
+        Store a point cloud in the cache, evicting old entries if the cache exceeds
+        `max_bytes`.
+
+        Args:
+            key (str): Cache key from `make_key`.
+            pcd (PointCloud): Point cloud to store.
+            metadata (dict | None): Optional JSON-serialisable metadata stored with
+                the entry.
+        """
+        arrays = {
+            name: values
+            for name in ("points", "normals", "colors")
+            if (values := get_array(pcd, name)) is not None
+        }
+        arrays["metadata"] = np.array(json.dumps(metadata or {}))
+
+        # Write to a temporary file first so readers never see a partial entry.
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, self._entry_path(key))
+        logger.debug(f"Stored preprocessed point cloud in cache ({key}).")
+
+        self._evict()
+
+    def invalidate(
+        self,
+        key: str | None = None,
+        path: str | Path | None = None,
+    ) -> int:
+        """
+        Remove cache entries. With no arguments, the whole cache is cleared.
+
+        Args:
+            key (str | None): Remove the entry with this key.
+            path (str | Path | None): Remove every entry of this input file,
+                regardless of the preprocessing parameters.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        if key is not None:
+            entries = [self._entry_path(key)]
+        elif path is not None:
+            entries = list(self.cache_dir.glob(f"{self.file_hash(path)}-*.npz"))
+        else:
+            entries = list(self.cache_dir.glob("*.npz"))
+
+        removed = 0
+        for entry in entries:
+            if entry.exists():
+                entry.unlink()
+                removed += 1
+        logger.info(f"Invalidated {removed} cache entries.")
+
+        return removed
+
+    def _evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache fits in `max_bytes`.
+        """
+        if self.max_bytes is None:
+            return
+
+        entries = [(entry, entry.stat()) for entry in self.cache_dir.glob("*.npz")]
+        total = sum(stat.st_size for _, stat in entries)
+        for entry, stat in sorted(entries, key=lambda item: item[1].st_mtime_ns):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= stat.st_size
+            logger.debug(f"Evicted {entry.name} from cache.")
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npz"
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self.cache_dir / "hashes.json", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_index(self, index: dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.cache_dir / "hashes.json")
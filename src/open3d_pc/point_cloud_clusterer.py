@@ -1,56 +1,171 @@
 import logging
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 
-import matplotlib.pyplot as plt
 import numpy as np
 import open3d as o3d
 
+from src.open3d_pc.clustering_backends import get_clustering_backend
+from src.open3d_pc.geometry import (
+    PointCloud,
+    get_array,
+    point_count,
+    set_array,
+    to_legacy,
+)
+from src.open3d_pc.neighbor_graph import NeighborGraph
+from src.open3d_pc.pipeline_profiler import PipelineProfiler
+from src.open3d_pc.point_cloud_writer import PointCloudWriter
+from src.open3d_pc.spatial import (
+    connected_components,
+    hash_grid,
+    iter_tiles,
+    radius_search,
+    relabel_consecutive,
+)
+
 logger = logging.getLogger(__name__)
 
+# Default edge length of the coarse cells in coarse-to-fine mode, in units of eps.
+_COARSE_CELLS_PER_EPS = 3
+
+
+@dataclass
+class SweepResult:
+    """
+    Result of one DBSCAN setting in a parameter sweep.
+
+    Attributes:
+        eps (float): Neighbourhood radius of the setting.
+        min_points (int): Minimum number of neighbours of a core point.
+        n_clusters (int): Number of clusters found.
+        noise_fraction (float): Fraction of points labelled as noise.
+        labels (np.ndarray | None): Cluster labels for each point, or None if the
+            sweep was run without keeping labels.
+    """
+
+    eps: float
+    min_points: int
+    n_clusters: int
+    noise_fraction: float
+    labels: np.ndarray | None = None
+
 
 class PointCloudClusterer:
     """
-    Clusters a point cloud using the DBSCAN algorithm.
+    Clusters a point cloud using the DBSCAN algorithm, or another backend
+    registered in `clustering_backends`.
+
+    Both legacy point clouds and tensor point clouds, e.g. with float32 storage in
+    float32 mode, are clustered as they are, without converting between them.
 
     Attributes:
         eps (float): Maximum distance between two points to be considered neighbors.
             Defaults to 0.108.
         min_points (int): Minimum number of points required to form a cluster.
             Defaults to 20.
+        tile_size (float | None): Edge length of the tiles used for out-of-core
+            clustering. If None, the whole cloud is clustered at once. Defaults to
+            None.
+        n_jobs (int | None): Number of tiles clustered in parallel in tiled mode.
+            Defaults to the number of CPUs.
+        coarse_to_fine (bool): Whether to cluster a coarse grid first and search
+            the full-resolution neighbourhoods only around and between its
+            clusters, which is faster but approximate for objects closer than two
+            coarse cells. Ignored in tiled mode. Defaults to False.
+        coarse_cell_size (float | None): Edge length of the coarse cells, at
+            least `eps`. If None, `3 * eps` is used. Defaults to None.
+        backend (str): Name of the clustering backend: "open3d" for Open3D's
+            DBSCAN, "grid" for a grid-hashed DBSCAN in NumPy, "voxel" for connected
+            components of occupied voxels, or any other registered backend.
+            `tile_size`, `coarse_to_fine` and prebuilt neighbour graphs only apply
+            to "open3d". Defaults to "open3d".
+
+    Raises:
+        ValueError: If no backend is registered under `backend`.
     """
 
-    def __init__(self, eps: float = 0.108, min_points: int = 20):
+    def __init__(
+        self,
+        eps: float = 0.108,
+        min_points: int = 20,
+        tile_size: float | None = None,
+        n_jobs: int | None = None,
+        coarse_to_fine: bool = False,
+        coarse_cell_size: float | None = None,
+        backend: str = "open3d",
+    ):
         self.eps = eps
         self.min_points = min_points
+        self.tile_size = tile_size
+        self.n_jobs = n_jobs or os.cpu_count()
+        self.coarse_to_fine = coarse_to_fine
+        self.coarse_cell_size = coarse_cell_size
+        get_clustering_backend(backend)
+        self.backend = backend
 
     def cluster(
         self,
-        pcd: o3d.geometry.PointCloud,
+        pcd: PointCloud,
         visualize: bool = False,
         save_clusters: bool = False,
         output_dir: str | Path = "clusters",
-    ) -> tuple[np.ndarray, o3d.geometry.PointCloud]:
+        profiler: PipelineProfiler | None = None,
+        neighbor_graph: NeighborGraph | None = None,
+        export_mode: str = "per_cluster",
+        io_threads: int | None = None,
+    ) -> tuple[np.ndarray, PointCloud]:
         """
-        Cluster the point cloud using DBSCAN. Optionally visualise the clusters or save
-        the clusters to files.
+        Cluster the point cloud using the configured backend. Optionally visualise the
+        clusters or save the clusters to files.
+
+        With the "open3d" backend, if `tile_size` is set, the cloud is clustered tile
+        by tile and the labels are stitched across tile borders, which bounds the
+        memory used by the neighbour search to the size of a tile. Otherwise, if
+        `coarse_to_fine` is set, the clusters of a coarse grid are refined at full
+        resolution only around and between them. If a prebuilt neighbour graph is
+        given, DBSCAN runs on it directly without searching the cloud again. Other
+        backends find their own neighbours and ignore these options.
 
         Args:
-            pcd (o3d.geometry.PointCloud): Input point cloud to cluster.
+            pcd (PointCloud): Input point cloud to cluster.
             visualize (bool): Whether to colour and display the clusters. Defaults to
                 False.
             save_clusters (bool): Whether to save each cluster to disk. Defaults to
                 False.
             output_dir (str | Path): Directory to save the clusters if `save_clusters`
                 is True. Defaults to "clusters".
+            profiler (PipelineProfiler | None): Profiler recording the "dbscan",
+                "visualize", and "save_clusters" stages. Defaults to None.
+            neighbor_graph (NeighborGraph | None): Prebuilt neighbour graph of the
+                point cloud with a radius of at least `eps`. Defaults to None.
+            export_mode (str): How clusters are saved: "per_cluster" writes one PLY
+                file per cluster, "labelled" writes a single PLY file with a label
+                property, and "columnar" writes a chunked column store. Defaults
+                to "per_cluster".
+            io_threads (int | None): Number of threads writing cluster files.
+                Defaults to None.
 
         Returns:
-            tuple[np.ndarray, o3d.geometry.PointCloud]: A tuple containing:
+            tuple[np.ndarray, PointCloud]: A tuple containing:
                 - labels (np.ndarray): Cluster labels for each point in the point cloud.
-                - pcd (o3d.geometry.PointCloud): The point cloud with optional cluster
-                  colours applied.
+                - pcd (PointCloud): The point cloud with optional cluster colours
+                  applied.
+
+        Raises:
+            ValueError: If the neighbour graph does not match the point cloud or has a
+                radius smaller than `eps`, or if `coarse_cell_size` is smaller than
+                `eps`.
         """
-        labels = pcd.cluster_dbscan(eps=self.eps, min_points=self.min_points)
-        labels = np.array(labels)
+        profiler = profiler or PipelineProfiler()
+        with profiler.stage("dbscan", points_in=point_count(pcd)) as metrics:
+            labels = self._cluster_labels(pcd, neighbor_graph)
+            metrics.points_out = int((labels >= 0).sum())
 
         if not (labels >= 0).any():
             logger.info(
@@ -62,17 +177,502 @@ class PointCloudClusterer:
         logger.info(f"Clustered point cloud into {labels.max() + 1} clusters.")
 
         if visualize:
-            self._colorize_clusters(pcd, labels, n_clusters)
-            o3d.visualization.draw_geometries([pcd])
+            with profiler.stage("visualize", points_in=point_count(pcd)):
+                self._colorize_clusters(pcd, labels, n_clusters)
+                o3d.visualization.draw_geometries([to_legacy(pcd)])
 
         if save_clusters:
-            self._save_clusters(pcd, labels, n_clusters, output_dir)
+            with profiler.stage("save_clusters", points_in=point_count(pcd)):
+                self._save_clusters(pcd, labels, output_dir, export_mode, io_threads)
 
         return labels, pcd
 
+    def sweep(
+        self,
+        pcd: PointCloud,
+        params: Iterable[tuple[float, int]],
+        neighbor_graph: NeighborGraph | None = None,
+        keep_labels: bool = True,
+    ) -> list[SweepResult]:
+        """
+        Run DBSCAN for many `(eps, min_points)` settings at the cost of about one
+        neighbour search.
+
+        The neighbour graph is built once at the largest `eps` (or a prebuilt graph
+        is used) and filtered down to every smaller `eps` in turn, from the largest to
+        the smallest, so each filter only scans the previous, smaller graph. All
+        `min_points` values of one `eps` share the same filtered graph and build
+        their clusters incrementally from each other.
+
+        Args:
+            pcd (PointCloud): Input point cloud to cluster.
+            params (Iterable[tuple[float, int]]): `(eps, min_points)` settings.
+            neighbor_graph (NeighborGraph | None): Prebuilt neighbour graph of the
+                point cloud with a radius of at least the largest `eps`. Defaults to
+                None.
+            keep_labels (bool): Whether to return the labels of every setting, which
+                takes one integer per point and setting. If False, only the summaries
+                are returned. Defaults to True.
+
+        Returns:
+            list[SweepResult]: One result per setting, in the order of `params`.
+
+        Raises:
+            ValueError: If no settings are given, a setting is invalid, or the
+                neighbour graph does not match the point cloud.
+        """
+        params = [(float(eps), int(min_points)) for eps, min_points in params]
+        if not params:
+            raise ValueError("params must contain at least one (eps, min_points) pair")
+        for eps, min_points in params:
+            if eps <= 0 or min_points < 1:
+                raise ValueError(
+                    f"Invalid DBSCAN setting eps={eps}, min_points={min_points}"
+                )
+
+        max_eps = max(eps for eps, _ in params)
+        if neighbor_graph is None:
+            neighbor_graph = NeighborGraph.from_pointcloud(pcd, max_eps)
+        elif neighbor_graph.n_points != point_count(pcd):
+            raise ValueError(
+                f"Neighbour graph has {neighbor_graph.n_points} points, but the "
+                f"point cloud has {point_count(pcd)}"
+            )
+
+        results = {}
+        graph = neighbor_graph
+        for eps in sorted({eps for eps, _ in params}, reverse=True):
+            graph = graph.restrict(eps)
+            for min_points, labels in self._dbscan_graph(
+                graph, [m for e, m in params if e == eps]
+            ):
+                n_noise = int((labels < 0).sum())
+                results[eps, min_points] = SweepResult(
+                    eps=eps,
+                    min_points=min_points,
+                    n_clusters=int(labels.max()) + 1 if len(labels) else 0,
+                    noise_fraction=n_noise / len(labels) if len(labels) else 0.0,
+                    labels=labels if keep_labels else None,
+                )
+                logger.debug(
+                    f"eps={eps}, min_points={min_points}: "
+                    f"{results[eps, min_points].n_clusters} clusters, "
+                    f"{results[eps, min_points].noise_fraction:.1%} noise."
+                )
+        logger.info(f"Swept {len(results)} DBSCAN settings on one neighbour graph.")
+
+        return [results[setting] for setting in params]
+
+    def _cluster_labels(
+        self,
+        pcd: PointCloud,
+        neighbor_graph: NeighborGraph | None = None,
+    ) -> np.ndarray:
+        """
+        Cluster the point cloud with the configured backend, choosing between the
+        graph, tiled, coarse-to-fine and whole-cloud runs of the "open3d" backend.
+
+        Args:
+            pcd (PointCloud): Input point cloud to cluster.
+            neighbor_graph (NeighborGraph | None): Prebuilt neighbour graph of the
+                point cloud. Defaults to None.
+
+        Returns:
+            np.ndarray: Cluster labels for each point, with -1 for noise.
+
+        Raises:
+            ValueError: If the neighbour graph does not match the point cloud.
+        """
+        backend = get_clustering_backend(self.backend)
+        if self.backend != "open3d":
+            return backend(pcd, self.eps, self.min_points)
+
+        if neighbor_graph is not None:
+            if neighbor_graph.n_points != point_count(pcd):
+                raise ValueError(
+                    f"Neighbour graph has {neighbor_graph.n_points} points, but "
+                    f"the point cloud has {point_count(pcd)}"
+                )
+            return self._cluster_graph(neighbor_graph)
+        if self.tile_size is not None:
+            return self._cluster_tiled(get_array(pcd))
+        if self.coarse_to_fine:
+            return self._cluster_coarse_to_fine(get_array(pcd))
+
+        return backend(pcd, self.eps, self.min_points)
+
+    def _cluster_graph(self, graph: NeighborGraph) -> np.ndarray:
+        """
+        Run DBSCAN on a prebuilt neighbour graph.
+
+        Args:
+            graph (NeighborGraph): Neighbour graph with a radius of at least `eps`.
+
+        Returns:
+            np.ndarray: Cluster labels for each point, with -1 for noise.
+        """
+        _, labels = next(
+            self._dbscan_graph(graph.restrict(self.eps), [self.min_points])
+        )
+
+        return labels
+
+    @staticmethod
+    def _dbscan_graph(
+        graph: NeighborGraph,
+        min_points: Iterable[int],
+    ) -> Iterator[tuple[int, np.ndarray]]:
+        """
+        Run DBSCAN on a neighbour graph already restricted to `eps`, for one or more
+        `min_points` values. Core points are connected through their core neighbours,
+        and every border point joins the cluster of its nearest core neighbour.
+
+        The core points of a larger `min_points` are a subset of those of a smaller
+        one, so the values are processed from the largest to the smallest and each
+        one only adds its new core edges to the previous components.
+
+        Args:
+            graph (NeighborGraph): Neighbour graph restricted to `eps`.
+            min_points (Iterable[int]): Minimum numbers of neighbours of a core point.
+
+        Yields:
+            tuple[int, np.ndarray]: Each `min_points` value, from the largest to the
+                smallest, with the cluster labels for each point.
+        """
+        rows = graph.rows()
+        counts = graph.counts()
+        # The graph is symmetric, so each undirected edge is needed only once. An
+        # edge joins two core points if the smaller neighbour count of its endpoints
+        # reaches min_points.
+        upper = rows < graph.indices
+        src, dst = rows[upper], graph.indices[upper]
+        strength = np.minimum(counts[src], counts[dst])
+
+        # Only points with fewer neighbours than the largest min_points can be
+        # border points, so only their edges are searched for core neighbours.
+        min_points = sorted(set(min_points), reverse=True)
+        candidates = counts[rows] < min_points[0]
+        candidate_rows = rows[candidates]
+        candidate_neighbors = graph.indices[candidates]
+        neighbor_counts = counts[candidate_neighbors]
+
+        roots = None
+        previous = np.inf
+        for value in min_points:
+            added = (strength >= value) & (strength < previous)
+            roots = connected_components(
+                graph.n_points, src[added], dst[added], parent=roots
+            )
+            previous = value
+
+            core = counts >= value
+            labels = np.where(core, roots, -1)
+            # Neighbours are sorted by distance, so the first core neighbour of each
+            # border point is the nearest one.
+            border_edges = ~core[candidate_rows] & (neighbor_counts >= value)
+            border_rows = candidate_rows[border_edges]
+            first = np.flatnonzero(np.diff(border_rows, prepend=-1) != 0)
+            labels[border_rows[first]] = roots[candidate_neighbors[border_edges][first]]
+
+            yield value, relabel_consecutive(labels)
+
+    def _cluster_tiled(self, points: np.ndarray) -> np.ndarray:
+        """
+        Run DBSCAN tile by tile and merge the labels across tile borders.
+
+        Each tile is extended by an `eps`-wide halo, so the neighbourhood of every
+        point owned by a tile is complete. A first pass over the tiles marks the core
+        points. A second pass connects the core points of each tile and records the
+        components of the halo core points, which are then merged with the components
+        of the tiles owning them using union-find. Core points therefore get exactly
+        the same clusters as a global DBSCAN run. Border points reachable from several
+        clusters may be assigned to any of them, as in any DBSCAN implementation.
+
+        Args:
+            points (np.ndarray): (N, 3) array of points to cluster.
+
+        Returns:
+            np.ndarray: Cluster labels for each point, with -1 for noise.
+        """
+        n_points = len(points)
+        core = np.zeros(n_points, dtype=bool)
+        for owned, is_core in self._map_tiles(
+            partial(self._tile_core_points, points), points
+        ):
+            core[owned] = is_core
+
+        component = np.full(n_points, -1, dtype=np.int64)
+        halo_points, halo_components = [], []
+        n_components = 0
+        for owned, local, halo, halo_local, n_local in self._map_tiles(
+            partial(self._tile_components, points, core), points
+        ):
+            component[owned] = np.where(local >= 0, local + n_components, -1)
+            halo_points.append(halo)
+            halo_components.append(halo_local + n_components)
+            n_components += n_local
+
+        halo_points = np.concatenate(halo_points or [np.zeros(0, dtype=np.int64)])
+        halo_components = np.concatenate(
+            halo_components or [np.zeros(0, dtype=np.int64)]
+        )
+        roots = connected_components(
+            n_components, halo_components, component[halo_points]
+        )
+        labels = np.full(n_points, -1, dtype=np.int64)
+        clustered = component >= 0
+        labels[clustered] = roots[component[clustered]]
+        logger.debug(f"Merged {n_components} tile components across tile borders.")
+
+        return relabel_consecutive(labels)
+
+    def _cluster_coarse_to_fine(self, points: np.ndarray) -> np.ndarray:
+        """
+        Cluster a coarse grid of cells several `eps` wide first and search the
+        neighbourhoods at full resolution only around and between its clusters.
+
+        A cell is dense if its points nearest to and farthest from its centroid are
+        both core points, which takes two searches per cell. Adjacent dense cells
+        form the coarse clusters unless their points' bounding boxes are at least
+        `eps` apart, and every point of a dense cell takes its coarse cluster's
+        label without a search. No point of a cell can be a core point if the cell
+        and its 26 neighbours hold fewer than `min_points` points, so such cells are
+        not searched. If no cell around them can hold a core point either, their
+        points are noise.
+
+        The points of the remaining sparse cells, at the edges of and between the
+        coarse clusters, are refined: their neighbours are searched at full
+        resolution, and coarse clusters that come within `eps` of each other
+        through refined core points are merged.
+
+        Objects that do not share a cell and whose cells' bounding boxes stay `eps`
+        apart get their own clusters, as with DBSCAN; this always holds for objects
+        more than two cell diagonals apart. Objects closer than that may share a
+        coarse cluster, and sparse points inside dense cells take the cell's
+        cluster even where DBSCAN would call them noise.
+
+        Args:
+            points (np.ndarray): (N, 3) array of points to cluster.
+
+        Returns:
+            np.ndarray: Cluster labels for each point, with -1 for noise.
+
+        Raises:
+            ValueError: If `coarse_cell_size` is smaller than `eps`.
+        """
+        cell_size = self.coarse_cell_size or _COARSE_CELLS_PER_EPS * self.eps
+        if cell_size < self.eps:
+            raise ValueError(
+                f"coarse_cell_size must be at least eps ({self.eps}), got {cell_size}"
+            )
+        if len(points) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        order, starts, sizes, neighbors = hash_grid(points, cell_size)
+        cell = np.empty(len(points), dtype=np.int64)
+        cell[order] = np.repeat(np.arange(len(sizes)), sizes)
+        around = np.where(neighbors >= 0, sizes[neighbors], 0).sum(axis=1)
+        possible = around >= self.min_points
+
+        probes, lower, upper = _describe_cells(points, order, starts, sizes)
+        probes = probes[:, possible]
+        offsets, _, _ = radius_search(points, points[probes.ravel()], self.eps)
+        dense = np.zeros(len(sizes), dtype=bool)
+        dense[possible] = (
+            (np.diff(offsets) >= self.min_points).reshape(probes.shape).all(axis=0)
+        )
+
+        # Adjacent dense cells are joined unless their points' bounding boxes are
+        # at least eps apart, which rules out any neighbours between them.
+        rows = np.repeat(np.arange(len(sizes)), neighbors.shape[1])
+        cols = neighbors.ravel()
+        edges = cols >= 0
+        edges[edges] = dense[rows[edges]] & dense[cols[edges]]
+        rows, cols = rows[edges], cols[edges]
+        gaps = np.maximum(lower[cols] - upper[rows], lower[rows] - upper[cols])
+        touching = (np.maximum(gaps, 0) ** 2).sum(axis=1) < self.eps**2
+        components = connected_components(len(sizes), rows[touching], cols[touching])
+        del rows, cols, edges, gaps, touching
+
+        # Cells with no possible core point around them hold only noise.
+        near_core = np.where(neighbors >= 0, possible[neighbors], False).any(axis=1)
+        refine = np.flatnonzero((~dense & near_core)[cell])
+        logger.debug(
+            f"Coarse level of {len(sizes)} cells, {dense.sum()} of them dense, "
+            f"refining {len(refine)} of {len(points)} points."
+        )
+
+        return relabel_consecutive(
+            self._refine_clusters(points, cell, dense, components, refine)
+        )
+
+    def _refine_clusters(
+        self,
+        points: np.ndarray,
+        cell: np.ndarray,
+        dense: np.ndarray,
+        components: np.ndarray,
+        refine: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Search the neighbours of the refined points at full resolution and merge
+        the coarse clusters through them.
+
+        Every dense cell is a node of the merged graph standing for its points,
+        which count as core points. Every refined point is a node of its own.
+        Points of sparse cells that are not refined are noise.
+
+        Args:
+            points (np.ndarray): (N, 3) array of all points.
+            cell (np.ndarray): Cell of each point.
+            dense (np.ndarray): Whether each cell is dense.
+            components (np.ndarray): Coarse cluster of each cell.
+            refine (np.ndarray): Sorted indices of the points to refine, all in
+                sparse cells.
+
+        Returns:
+            np.ndarray: Cluster labels for each point, with -1 for noise.
+        """
+        n_cells = len(components)
+        offsets, neighbors, sq_distances = radius_search(
+            points, points[refine], self.eps
+        )
+        counts = np.diff(offsets)
+        refined_core = counts >= self.min_points
+
+        node = cell.copy()
+        node[refine] = n_cells + np.arange(len(refine))
+        core = dense[cell]
+        core[refine] = refined_core
+
+        rows = np.repeat(np.arange(len(refine)), counts)
+        core_edges = refined_core[rows] & core[neighbors]
+        roots = connected_components(
+            n_cells + len(refine),
+            n_cells + rows[core_edges],
+            node[neighbors[core_edges]],
+            parent=np.concatenate([components, np.arange(len(refine)) + n_cells]),
+        )
+
+        labels = np.where(core, roots[node], -1)
+        # Border points join the cluster of their nearest core neighbour.
+        border_edges = ~refined_core[rows] & core[neighbors]
+        border_rows = rows[border_edges]
+        order = np.lexsort((sq_distances[border_edges], border_rows))
+        border_rows = border_rows[order]
+        nearest = neighbors[border_edges][order]
+        first = np.flatnonzero(np.diff(border_rows, prepend=-1) != 0)
+        labels[refine[border_rows[first]]] = roots[node[nearest[first]]]
+
+        return labels
+
+    def _map_tiles(
+        self,
+        func: Callable[[np.ndarray, np.ndarray], tuple],
+        points: np.ndarray,
+    ) -> Iterator[tuple]:
+        """
+        Apply a function to every tile on a thread pool, yielding results in tile
+        order. At most `2 * n_jobs` tiles are in flight, so only a few extended tiles
+        are held in memory at a time.
+
+        Args:
+            func (Callable): Function called with the owned and extended point
+                indices of each tile.
+            points (np.ndarray): (N, 3) array of points to tile.
+
+        Yields:
+            tuple: The result of `func` for each tile.
+        """
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as executor:
+            pending = deque()
+            for owned, extended in iter_tiles(points, self.tile_size, self.eps):
+                pending.append(executor.submit(func, owned, extended))
+                if len(pending) >= 2 * self.n_jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _tile_core_points(
+        self,
+        points: np.ndarray,
+        owned: np.ndarray,
+        extended: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find which points owned by a tile are DBSCAN core points.
+
+        Args:
+            points (np.ndarray): (N, 3) array of all points.
+            owned (np.ndarray): Indices of the points owned by the tile.
+            extended (np.ndarray): Indices of the owned and halo points.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The owned indices and their core flags.
+        """
+        offsets, _, _ = radius_search(points[extended], points[owned], self.eps)
+
+        return owned, np.diff(offsets) >= self.min_points
+
+    def _tile_components(
+        self,
+        points: np.ndarray,
+        core: np.ndarray,
+        owned: np.ndarray,
+        extended: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+        """
+        Connect the core points of a tile and assign its owned points to components.
+
+        Components are numbered by the position of their root in the tile's core
+        points, so the caller can offset them into a global numbering.
+
+        Args:
+            points (np.ndarray): (N, 3) array of all points.
+            core (np.ndarray): Core flags of all points.
+            owned (np.ndarray): Indices of the points owned by the tile.
+            extended (np.ndarray): Indices of the owned and halo points.
+
+        Returns:
+            tuple: A tuple containing:
+                - owned (np.ndarray): Indices of the points owned by the tile.
+                - local (np.ndarray): Component of each owned point, or -1 for noise.
+                - halo (np.ndarray): Indices of the core points in the halo.
+                - halo_local (np.ndarray): Component of each halo core point.
+                - n_local (int): Size of the tile's component numbering.
+        """
+        extended_core = extended[core[extended]]
+        offsets, neighbors, _ = radius_search(
+            points[extended_core], points[owned], self.eps
+        )
+        counts = np.diff(offsets)
+        rows = np.repeat(np.arange(len(owned)), counts)
+
+        owned_core = core[owned]
+        position = np.searchsorted(extended_core, owned)
+        edges = owned_core[rows]
+        roots = connected_components(
+            len(extended_core), position[rows[edges]], neighbors[edges]
+        )
+
+        local = np.full(len(owned), -1, dtype=np.int64)
+        local[owned_core] = roots[position[owned_core]]
+        border = ~owned_core & (counts > 0)
+        local[border] = roots[neighbors[offsets[:-1][border]]]
+
+        in_halo = ~np.isin(extended_core, owned, assume_unique=True)
+
+        return (
+            owned,
+            local,
+            extended_core[in_halo],
+            roots[in_halo],
+            len(extended_core),
+        )
+
     def _colorize_clusters(
         self,
-        pcd: o3d.geometry.PointCloud,
+        pcd: PointCloud,
         labels: np.ndarray,
         n_clusters: int,
     ) -> None:
@@ -80,47 +680,86 @@ class PointCloudClusterer:
         Apply unique colours to each cluster in the point cloud for visualisation.
 
         Args:
-            pcd (o3d.geometry.PointCloud): The point cloud to modify.
+            pcd (PointCloud): The point cloud to modify.
             labels (np.ndarray): Array of cluster labels for each point.
             n_clusters (int): Number of clusters found in the point cloud.
 
         Returns:
             None
         """
+        # matplotlib is only needed for visualisation, so it is imported lazily.
+        from matplotlib import colormaps
+
         valid_mask = labels >= 0
         valid_labels = labels[valid_mask]
 
-        colors = np.zeros((len(labels), 3))
+        # Colours are stored in the point cloud's dtype, float32 in float32 mode.
+        colors = np.zeros((len(labels), 3), dtype=get_array(pcd).dtype)
         hue_values = np.linspace(0, 1, n_clusters + 1)[:-1]
-        cluster_colors = plt.cm.hsv(hue_values)[:, :3]
+        cluster_colors = colormaps["hsv"](hue_values)[:, :3]
 
         colors[valid_mask] = cluster_colors[valid_labels]
-        pcd.colors = o3d.utility.Vector3dVector(colors)
+        set_array(pcd, "colors", colors)
 
     def _save_clusters(
         self,
-        pcd: o3d.geometry.PointCloud,
+        pcd: PointCloud,
         labels: np.ndarray,
-        n_clusters: int,
         output_dir: str | Path,
+        export_mode: str = "per_cluster",
+        io_threads: int | None = None,
     ) -> None:
         """
-        Save each cluster from the point cloud as separate PLY files.
+        Save the clusters from the point cloud, either as separate PLY files, as
+        one labelled PLY file, or as a column store.
 
         Args:
-            pcd (o3d.geometry.PointCloud): The point cloud containing the clusters.
+            pcd (PointCloud): The point cloud containing the clusters.
             labels (np.ndarray): Array of cluster labels for each point.
-            n_clusters (int): Number of clusters found in the point cloud.
             output_dir (str | Path): Directory to save the cluster files.
+            export_mode (str): "per_cluster", "labelled" or "columnar". Defaults
+                to "per_cluster".
+            io_threads (int | None): Number of threads writing cluster files.
+                Defaults to None.
         """
-        output_dir = Path(output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
+        writer = PointCloudWriter(export_mode=export_mode, io_threads=io_threads)
+        writer.write(pcd, labels, output_dir)
 
-        for cluster_id in range(n_clusters):
-            indices = np.where(labels == cluster_id)[0]
-            cluster_pcd = pcd.select_by_index(indices)
-            cluster_path = output_dir / f"cluster_{cluster_id}.ply"
-            o3d.io.write_point_cloud(str(cluster_path), cluster_pcd)
-        logger.info(
-            f"Saved {n_clusters} clusters to {output_dir}."
+
+def _describe_cells(
+    points: np.ndarray,
+    order: np.ndarray,
+    starts: np.ndarray,
+    sizes: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pick the points nearest to and farthest from the centroid of each cell of a
+    `hash_grid`, and find the bounding box of each cell's points.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points.
+        order (np.ndarray): (N,) permutation sorting the points by cell.
+        starts (np.ndarray): (M,) start of each cell in the sorted points.
+        sizes (np.ndarray): (M,) number of points of each cell.
+
+    Returns:
+        tuple: A tuple containing:
+            - probes (np.ndarray): (2, M) nearest and farthest point of each cell.
+            - lower (np.ndarray): (M, 3) lower corner of each cell's bounding box.
+            - upper (np.ndarray): (M, 3) upper corner of each cell's bounding box.
+    """
+    sorted_points = points[order]
+    sorted_cell = np.repeat(np.arange(len(sizes)), sizes)
+    centroids = np.add.reduceat(sorted_points, starts) / sizes[:, None]
+    sq_distances = ((sorted_points - centroids[sorted_cell]) ** 2).sum(axis=1)
+    probes = []
+    for extreme in (np.minimum, np.maximum):
+        candidates = np.flatnonzero(
+            sq_distances == extreme.reduceat(sq_distances, starts)[sorted_cell]
         )
+        first = candidates[np.diff(sorted_cell[candidates], prepend=-1) != 0]
+        probes.append(order[first])
+    lower = np.minimum.reduceat(sorted_points, starts)
+    upper = np.maximum.reduceat(sorted_points, starts)
+
+    return np.stack(probes), lower, upper
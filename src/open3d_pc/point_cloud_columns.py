@@ -0,0 +1,383 @@
+import json
+import logging
+import os
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+
+from src.open3d_pc.geometry import PointCloud, get_array, make_pointcloud
+from src.open3d_pc.point_cloud_loader import _memmap_npz_member
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("points", "normals", "colors", "labels")
+
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+# Storage dtypes of the columns. Points are stored relative to the store's origin,
+# so float32 keeps sub-millimetre precision within kilometres of it. Labels are
+# stored as int16 in chunks whose labels fit, and int32 otherwise.
+_COLUMN_DTYPES = {"points": "<f4", "normals": "<f2", "colors": "u1"}
+
+
+class PointCloudColumnStore:
+    """
+    Chunked columnar store of labelled point clouds, kept in a directory of
+    uncompressed `.npz` chunks and a JSON manifest.
+
+    Each chunk holds one array per column in a compact dtype: float32 coordinates
+    relative to the store's origin, float16 normals, uint8 colours and int16 or
+    int32 labels. Chunks are appended while streaming without touching the existing
+    ones, and the manifest, which records the point count and label range of every
+    chunk, is replaced atomically after each append.
+
+    Reads only map the requested columns of the chunks whose label range overlaps
+    the requested one, so a single column or a few clusters of a large scene are
+    read without parsing the rest of it.
+
+    Attributes:
+        path (Path): Directory of the store.
+        chunk_size (int): Maximum number of points per chunk. Defaults to 2**20.
+        columns (list[str]): Columns stored in every chunk, fixed by the first
+            append. Always includes "points".
+        origin (np.ndarray | None): Offset subtracted from the coordinates before
+            storing them, fixed by the first append.
+        chunks (list[dict]): Manifest entries of the chunks, with their "file",
+            "n_points", "label_min" and "label_max".
+    """
+
+    def __init__(self, path: str | Path, chunk_size: int = 1 << 20, mode: str = "a"):
+        """
+        Open a store, creating it if it does not exist.
+
+        Args:
+            path (str | Path): Directory of the store.
+            chunk_size (int): Maximum number of points per chunk. Defaults to 2**20.
+            mode (str): "a" to append to an existing store, or "w" to replace it.
+                Defaults to "a".
+
+        Raises:
+            ValueError: If chunk_size is not positive, mode is unknown, or the
+                manifest has an unsupported version.
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        if mode not in ("a", "w"):
+            raise ValueError(f"Unknown mode {mode}, expected 'a' or 'w'")
+
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.columns = []
+        self.origin = None
+        self.chunks = []
+
+        manifest_path = self.path / MANIFEST_NAME
+        if not manifest_path.exists():
+            return
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported column store version {manifest.get('version')} in "
+                f"{self.path}"
+            )
+        if mode == "w":
+            # Only the files of the previous store are removed, nothing else in the
+            # directory.
+            for chunk in manifest["chunks"]:
+                (self.path / chunk["file"]).unlink(missing_ok=True)
+            manifest_path.unlink()
+            return
+
+        self.columns = manifest["columns"]
+        self.origin = np.array(manifest["origin"])
+        self.chunks = manifest["chunks"]
+
+    @property
+    def n_points(self) -> int:
+        return sum(chunk["n_points"] for chunk in self.chunks)
+
+    def append(
+        self,
+        points: np.ndarray,
+        normals: np.ndarray | None = None,
+        colors: np.ndarray | None = None,
+        labels: np.ndarray | None = None,
+    ) -> None:
+        """
+        Append points to the store, split into chunks of at most `chunk_size`.
+
+        Args:
+            points (np.ndarray): (N, 3) array of point coordinates.
+            normals (np.ndarray | None): Optional (N, 3) array of normals.
+            colors (np.ndarray | None): Optional (N, 3) array of colours, either in
+                [0, 1] or as uint8.
+            labels (np.ndarray | None): Optional (N,) array of cluster labels, with
+                -1 for noise.
+
+        Raises:
+            ValueError: If the arrays do not have one row per point, or the columns
+                differ from those already in the store.
+        """
+        arrays = {
+            name: values
+            for name, values in zip(
+                COLUMNS, (points, normals, colors, labels), strict=True
+            )
+            if values is not None
+        }
+        for name, values in arrays.items():
+            if len(values) != len(points):
+                raise ValueError(
+                    f"Expected {len(points)} {name}, got {len(values)} in {self.path}"
+                )
+        if self.chunks and list(arrays) != self.columns:
+            raise ValueError(
+                f"Cannot append columns {list(arrays)} to a store with columns "
+                f"{self.columns}"
+            )
+        if len(points) == 0:
+            return
+
+        if not self.chunks:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self.columns = list(arrays)
+            self.origin = np.floor(np.asarray(points).min(axis=0))
+        for start in range(0, len(points), self.chunk_size):
+            chunk = {
+                name: values[start : start + self.chunk_size]
+                for name, values in arrays.items()
+            }
+            self.chunks.append(self._write_chunk(chunk))
+        self._write_manifest()
+        logger.debug(f"Appended {len(points)} points to {self.path}.")
+
+    def append_pointcloud(
+        self,
+        pcd: PointCloud,
+        labels: np.ndarray | None = None,
+    ) -> None:
+        """
+        Append the points, normals and colours of a point cloud to the store.
+
+        Args:
+            pcd (PointCloud): Legacy or tensor point cloud.
+            labels (np.ndarray | None): Optional cluster labels for each point.
+        """
+        self.append(
+            get_array(pcd),
+            normals=get_array(pcd, "normals"),
+            colors=get_array(pcd, "colors"),
+            labels=labels,
+        )
+
+    def iter_chunks(
+        self,
+        columns: list[str] | None = None,
+        label_range: tuple[int, int] | None = None,
+    ) -> Iterator[dict[str, np.ndarray]]:
+        """
+        Read the store chunk by chunk.
+
+        Args:
+            columns (list[str] | None): Columns to read. Defaults to None, which
+                reads all stored columns.
+            label_range (tuple[int, int] | None): Inclusive range of labels to keep.
+                Chunks whose labels lie outside it are skipped without being read.
+                Defaults to None, which keeps every point.
+
+        Yields:
+            dict[str, np.ndarray]: The columns of each chunk: float64 points,
+                float16 normals, uint8 colours and int32 labels. Without a label
+                range, normals and colours are read-only views of the file.
+
+        Raises:
+            ValueError: If a column is not stored, or a label range is given for a
+                store without labels.
+        """
+        columns = self._check_columns(columns, label_range)
+        for chunk in self.chunks:
+            if label_range is not None and (
+                chunk["label_max"] < label_range[0]
+                or chunk["label_min"] > label_range[1]
+            ):
+                continue
+
+            path = self.path / chunk["file"]
+            with zipfile.ZipFile(path) as archive:
+                arrays = {
+                    name: _memmap_npz_member(
+                        str(path), archive, archive.getinfo(f"{name}.npy")
+                    )
+                    for name in set(columns) | ({"labels"} if label_range else set())
+                }
+            if label_range is not None:
+                labels = arrays["labels"]
+                keep = (labels >= label_range[0]) & (labels <= label_range[1])
+                arrays = {name: values[keep] for name, values in arrays.items()}
+
+            yield self._decode({name: arrays[name] for name in columns})
+
+    def read(
+        self,
+        columns: list[str] | None = None,
+        label_range: tuple[int, int] | None = None,
+    ) -> dict[str, np.ndarray]:
+        """
+        Read columns of the store into memory, optionally only the points whose
+        label lies in a range.
+
+        Args:
+            columns (list[str] | None): Columns to read. Defaults to None, which
+                reads all stored columns.
+            label_range (tuple[int, int] | None): Inclusive range of labels to keep.
+                Defaults to None, which keeps every point.
+
+        Returns:
+            dict[str, np.ndarray]: The concatenated columns, in the dtypes yielded
+                by `iter_chunks`.
+        """
+        columns = self._check_columns(columns, label_range)
+        chunks = list(self.iter_chunks(columns, label_range))
+        if not chunks:
+            return {name: self._empty(name) for name in columns}
+
+        return {
+            name: np.concatenate([chunk[name] for chunk in chunks]) for name in columns
+        }
+
+    def to_pointcloud(
+        self,
+        label_range: tuple[int, int] | None = None,
+        float32: bool = False,
+    ) -> tuple[PointCloud, np.ndarray | None]:
+        """
+        Read the store back into a point cloud.
+
+        Args:
+            label_range (tuple[int, int] | None): Inclusive range of labels to keep.
+                Defaults to None, which keeps every point.
+            float32 (bool): Whether to build a float32 tensor point cloud. Defaults
+                to False.
+
+        Returns:
+            tuple: A tuple containing:
+                - pcd (PointCloud): The point cloud with its normals and colours.
+                - labels (np.ndarray | None): The labels, or None if not stored.
+        """
+        arrays = self.read(label_range=label_range)
+        colors = arrays.get("colors")
+        return (
+            make_pointcloud(
+                arrays["points"],
+                normals=arrays.get("normals"),
+                colors=colors / np.float32(255) if colors is not None else None,
+                float32=float32,
+            ),
+            arrays.get("labels"),
+        )
+
+    def _write_chunk(self, chunk: dict[str, np.ndarray]) -> dict:
+        """
+        Encode the columns of a chunk into their storage dtypes and write them to a
+        new `.npz` file.
+
+        Args:
+            chunk (dict[str, np.ndarray]): Columns of the chunk.
+
+        Returns:
+            dict: Manifest entry of the chunk.
+        """
+        encoded = {"points": np.asarray(chunk["points"]) - self.origin}
+        if "normals" in chunk:
+            encoded["normals"] = chunk["normals"]
+        if "colors" in chunk:
+            colors = np.asarray(chunk["colors"])
+            if colors.dtype != np.uint8:
+                colors = np.round(np.clip(colors, 0, 1) * 255)
+            encoded["colors"] = colors
+        encoded = {
+            name: np.ascontiguousarray(values, dtype=_COLUMN_DTYPES[name])
+            for name, values in encoded.items()
+        }
+
+        entry = {"file": f"chunk_{len(self.chunks):06d}.npz"}
+        entry["n_points"] = len(encoded["points"])
+        if "labels" in chunk:
+            labels = np.asarray(chunk["labels"])
+            entry["label_min"] = int(labels.min())
+            entry["label_max"] = int(labels.max())
+            int16 = np.iinfo(np.int16)
+            fits = int16.min <= entry["label_min"] and entry["label_max"] <= int16.max
+            encoded["labels"] = labels.astype("<i2" if fits else "<i4")
+
+        # Uncompressed, so that reads can memory-map each column.
+        np.savez(self.path / entry["file"], **encoded)
+
+        return entry
+
+    def _write_manifest(self) -> None:
+        """
+        Replace the manifest atomically, so a crash during an append leaves the
+        store as it was before the append.
+        """
+        manifest = {
+            "version": FORMAT_VERSION,
+            "columns": self.columns,
+            "origin": self.origin.tolist(),
+            "n_points": self.n_points,
+            "chunks": self.chunks,
+        }
+        tmp_path = self.path / f"{MANIFEST_NAME}.tmp"
+        tmp_path.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp_path, self.path / MANIFEST_NAME)
+
+    def _check_columns(
+        self,
+        columns: list[str] | None,
+        label_range: tuple[int, int] | None,
+    ) -> list[str]:
+        """
+        Validate the columns and label range of a read.
+
+        Returns:
+            list[str]: The columns to read.
+
+        Raises:
+            ValueError: If a column is not stored, or a label range is given for a
+                store without labels.
+        """
+        columns = list(self.columns if columns is None else columns)
+        missing = [name for name in columns if name not in self.columns]
+        if missing:
+            raise ValueError(
+                f"Columns {missing} are not stored in {self.path}, which has "
+                f"{self.columns}"
+            )
+        if label_range is not None and "labels" not in self.columns:
+            raise ValueError(f"No labels stored in {self.path}")
+
+        return columns
+
+    def _decode(self, arrays: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+        """
+        Convert stored columns to the dtypes returned by reads.
+        """
+        if "points" in arrays:
+            arrays["points"] = arrays["points"] + self.origin
+        if "labels" in arrays:
+            arrays["labels"] = arrays["labels"].astype(np.int32, copy=False)
+
+        return arrays
+
+    def _empty(self, name: str) -> np.ndarray:
+        """
+        Get an empty array of a column, in the dtype returned by reads.
+        """
+        if name == "labels":
+            return np.zeros(0, dtype=np.int32)
+        dtype = np.float64 if name == "points" else _COLUMN_DTYPES[name]
+
+        return np.zeros((0, 3), dtype=dtype)
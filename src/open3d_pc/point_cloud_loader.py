@@ -1,10 +1,39 @@
+import itertools
 import logging
 import os
+import zipfile
+from collections.abc import Iterator
 
+import numpy as np
 import open3d as o3d
 
+from src.open3d_pc.geometry import PointCloud, make_pointcloud, point_count
+
 logger = logging.getLogger(__name__)
 
+SUPPORTED_EXTENSIONS = (".pcd", ".ply", ".xyz", ".pts", ".npy", ".npz")
+ARRAY_EXTENSIONS = (".npy", ".npz")
+TEXT_EXTENSIONS = (".xyz", ".pts")
+
+PLY_DTYPES = {
+    "char": "i1",
+    "int8": "i1",
+    "uchar": "u1",
+    "uint8": "u1",
+    "short": "i2",
+    "int16": "i2",
+    "ushort": "u2",
+    "uint16": "u2",
+    "int": "i4",
+    "int32": "i4",
+    "uint": "u4",
+    "uint32": "u4",
+    "float": "f4",
+    "float32": "f4",
+    "double": "f8",
+    "float64": "f8",
+}
+
 
 class PointCloudLoader:
     """
@@ -13,22 +42,278 @@ class PointCloudLoader:
     If no path is provided, the loader defaults to the Eagle Point Cloud sample dataset
     from Open3D.
 
+    Besides the formats read by Open3D, point arrays stored as `.npy` files or as
+    `.npz` archives with a "points" array (and optional "normals" and "colors" arrays)
+    are supported. With `mmap` enabled, binary little-endian PLY bodies and NumPy
+    point arrays are memory-mapped and exposed as NumPy views without copying or
+    parsing the file.
+
+    ASCII `.xyz`/`.pts` files, and any file that can be loaded as an array, can also
+    be streamed in fixed-size chunks with `iter_chunks()`, so the full-resolution
+    cloud never has to be held in memory.
+
+    With `float32` enabled, point clouds are loaded as Open3D tensor point clouds
+    with float32 coordinates, normals and colours, which take half the memory of
+    the legacy float64 point clouds and are processed as such by the preprocessor
+    and clusterer.
+
     Attributes:
         path (str | None): Path to the point cloud file. Defaults to None.
-        pcd (o3d.geometry.PointCloud | None): The loaded point cloud object after
-            calling `load()`.
+        mmap (bool): Whether to memory-map binary PLY and NumPy files. Defaults to
+            False.
+        chunk_size (int | None): Number of points per chunk when streaming. If None,
+            the file is loaded at once. Defaults to None.
+        float32 (bool): Whether to load tensor point clouds with float32 storage
+            instead of legacy point clouds with float64 storage. Defaults to False.
+        pcd (PointCloud | None): The loaded point cloud object after calling
+            `load()`.
+        points (np.ndarray | None): (N, 3) view of the point coordinates after
+            calling `load_points()`.
+        labels (np.ndarray | None): (N,) view of the cluster labels stored in the
+            file, e.g. by a labelled cluster export, after calling `load_points()`.
+        n_points (int): Number of points loaded or streamed from the file.
     """
 
-    def __init__(self, path: str | None = None):
+    def __init__(
+        self,
+        path: str | None = None,
+        mmap: bool = False,
+        chunk_size: int | None = None,
+        float32: bool = False,
+    ):
         self.path = path
+        self.mmap = mmap
+        self.chunk_size = chunk_size
+        self.float32 = float32
         self.pcd = None
+        self.points = None
+        self.labels = None
+        self.n_points = 0
+        self._attributes = {}
 
     def load(self):
         """
         Load the point cloud from the specified path or the default dataset.
 
         Returns:
-            self.pcd (o3d.geometry.PointCloud): The loaded point cloud object.
+            self.pcd (PointCloud): The loaded point cloud object, a tensor point
+                cloud in `float32` mode.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file format is unsupported.
+        """
+        self.resolve_path()
+
+        if self.path.lower().endswith(ARRAY_EXTENSIONS) or (
+            self.mmap and self.is_mappable_ply()
+        ):
+            self.load_points()
+            self.pcd = self.to_pointcloud()
+        elif self.float32:
+            self.pcd = self._read_float32()
+        else:
+            self.pcd = o3d.io.read_point_cloud(self.path)
+        self.n_points = point_count(self.pcd)
+        logger.info(f"Loaded point cloud with {self.n_points} points.")
+
+        return self.pcd
+
+    def load_points(self) -> np.ndarray:
+        """
+        Load the point coordinates as a NumPy array without building an Open3D point
+        cloud.
+
+        In `mmap` mode the array is a read-only view into the memory-mapped file, so
+        no data is read until it is accessed. Normals and colours stored in the file
+        are kept as views as well and attached by `to_pointcloud()`.
+
+        Returns:
+            self.points (np.ndarray): (N, 3) array of point coordinates.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file format is unsupported or cannot be read as an
+                array.
+        """
+        self.resolve_path()
+
+        if self.path.lower().endswith(".npy"):
+            array = np.load(self.path, mmap_mode="r" if self.mmap else None)
+            self._attributes = {"points": array}
+        elif self.path.lower().endswith(".npz"):
+            self._attributes = self._load_npz()
+        elif self.is_mappable_ply():
+            self._attributes = self._memmap_ply()
+        else:
+            raise ValueError(
+                f"Cannot load points as an array from {self.path}, expected a "
+                "binary little-endian PLY, .npy, or .npz file."
+            )
+
+        points = self._attributes["points"]
+        if points.ndim != 2 or points.shape[1] < 3:
+            raise ValueError(
+                f"Expected an (N, 3) point array in {self.path}, got {points.shape}"
+            )
+        self.points = points[:, :3]
+        self.labels = self._attributes.get("labels")
+        self.n_points = len(self.points)
+        logger.debug(f"Mapped {len(self.points)} points from {self.path}.")
+
+        return self.points
+
+    def iter_chunks(self, chunk_size: int | None = None) -> Iterator[np.ndarray]:
+        """
+        Stream the point coordinates in chunks of at most `chunk_size` points.
+
+        ASCII `.xyz`/`.pts` files are parsed chunk by chunk, keeping only the x, y and
+        z columns. Files that can be loaded as an array are sliced, so in `mmap` mode
+        each chunk is a view into the memory-mapped file.
+
+        Args:
+            chunk_size (int | None): Override the number of points per chunk. If
+                None, uses the instance's `chunk_size`.
+
+        Yields:
+            np.ndarray: (M, 3) array of point coordinates, with M <= chunk_size.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If chunk_size is not positive or the file cannot be streamed.
+        """
+        chunk_size = self.chunk_size if chunk_size is None else chunk_size
+        if chunk_size is None or chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        self.resolve_path()
+
+        if not self.path.lower().endswith(TEXT_EXTENSIONS):
+            points = self.load_points()
+            for start in range(0, len(points), chunk_size):
+                yield points[start : start + chunk_size]
+            return
+
+        with open(self.path, encoding="utf-8") as f:
+            lines = (line for line in f if line.strip())
+            first = next(lines, None)
+            # .pts files may start with a line holding the number of points.
+            if first is not None and len(first.split()) > 1:
+                lines = itertools.chain([first], lines)
+
+            n_points = 0
+            while chunk := list(itertools.islice(lines, chunk_size)):
+                n_points += len(chunk)
+                yield np.loadtxt(chunk, usecols=(0, 1, 2), ndmin=2)
+            self.n_points = n_points
+
+    def scan_bounds(
+        self, chunk_size: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the axis-aligned bounds of the point cloud in one streaming pass.
+
+        Args:
+            chunk_size (int | None): Override the number of points per chunk. If
+                None, uses the instance's `chunk_size`.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The minimum and maximum bounds.
+
+        Raises:
+            ValueError: If the file contains no points.
+        """
+        min_bound = np.full(3, np.inf)
+        max_bound = np.full(3, -np.inf)
+        for chunk in self.iter_chunks(chunk_size):
+            min_bound = np.minimum(min_bound, chunk.min(axis=0))
+            max_bound = np.maximum(max_bound, chunk.max(axis=0))
+
+        if not np.isfinite(min_bound).all():
+            raise ValueError(f"No points found in {self.path}")
+
+        return min_bound, max_bound
+
+    def to_pointcloud(self) -> PointCloud:
+        """
+        Convert the loaded arrays into an Open3D point cloud. This is the only step
+        that copies the point data.
+
+        Returns:
+            PointCloud: Point cloud with the loaded points and, if present, normals
+                and colours, a tensor point cloud in `float32` mode.
+        """
+        if self.points is None:
+            self.load_points()
+
+        dtype = np.float32 if self.float32 else np.float64
+        colors = self._attributes.get("colors")
+        if colors is not None:
+            scale = 255 if colors.dtype == np.uint8 else 1
+            colors = np.asarray(colors, dtype=dtype) / dtype(scale)
+
+        return make_pointcloud(
+            np.asarray(self.points, dtype=dtype),
+            normals=self._attributes.get("normals"),
+            colors=colors,
+            float32=self.float32,
+        )
+
+    def inspect(self) -> tuple[int, list[str]]:
+        """
+        Read the number of points and the stored attributes from the file's header,
+        without loading it. The count of ASCII `.xyz`/`.pts` files, which have no
+        header, is estimated from the file size and the length of their first lines.
+
+        Returns:
+            tuple: A tuple containing:
+                - n_points (int): Number of points in the file.
+                - attributes (list[str]): "points" and, if present, "normals" and
+                  "colors".
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file format is unsupported or its header is invalid.
+        """
+        self.resolve_path()
+        path = self.path.lower()
+        if path.endswith(".npy"):
+            with open(self.path, "rb") as f:
+                return _read_npy_shape(f)[0], ["points"]
+        if path.endswith(".npz"):
+            with zipfile.ZipFile(self.path) as archive:
+                names = set(archive.namelist())
+                attributes = [
+                    name
+                    for name in ("points", "normals", "colors")
+                    if f"{name}.npy" in names
+                ]
+                if "points" not in attributes:
+                    raise ValueError(f"No 'points' array found in {self.path}")
+                with archive.open("points.npy") as member:
+                    return _read_npy_shape(member)[0], attributes
+        if path.endswith(".ply"):
+            return self._inspect_ply()
+        if path.endswith(".pcd"):
+            return self._inspect_pcd()
+
+        return self._estimate_text_points(), ["points"]
+
+    def release(self) -> None:
+        """
+        Drop the references to the loaded point cloud and arrays, so they can be
+        freed once they are no longer used elsewhere. `n_points` is kept.
+        """
+        self.pcd = None
+        self.points = None
+        self.labels = None
+        self._attributes = {}
+
+    def resolve_path(self) -> str:
+        """
+        Resolve the default dataset and validate the path.
+
+        Returns:
+            self.path (str): Path to the point cloud file.
 
         Raises:
             FileNotFoundError: If the file does not exist.
@@ -41,10 +326,322 @@ class PointCloudLoader:
 
         if not os.path.exists(self.path):
             raise FileNotFoundError(f"Point cloud file not found: {self.path}")
-        if not self.path.lower().endswith(('.pcd', '.ply', '.xyz', '.pts')):
+        if not self.path.lower().endswith(SUPPORTED_EXTENSIONS):
             raise ValueError(f"Unsupported file format: {self.path}")
 
-        self.pcd = o3d.io.read_point_cloud(self.path)
-        logger.info(f"Loaded point cloud with {len(self.pcd.points)} points.")
+        return self.path
 
-        return self.pcd
+    def _read_float32(self) -> o3d.t.geometry.PointCloud:
+        """
+        Read a file with Open3D's tensor reader and convert its attributes to
+        float32, with colours scaled to [0, 1] as in legacy point clouds.
+
+        Returns:
+            o3d.t.geometry.PointCloud: Point cloud with float32 attributes.
+        """
+        pcd = o3d.t.io.read_point_cloud(self.path)
+        for name in ("positions", "normals", "colors"):
+            if name not in pcd.point:
+                continue
+            values = pcd.point[name]
+            if values.dtype == o3d.core.uint8:
+                pcd.point[name] = values.to(o3d.core.float32) / 255
+            elif values.dtype != o3d.core.float32:
+                pcd.point[name] = values.to(o3d.core.float32)
+
+        return pcd
+
+    def is_mappable_ply(self) -> bool:
+        """
+        Check whether the file is a PLY whose vertices can be memory-mapped, i.e. a
+        binary little-endian PLY starting with a vertex element without list
+        properties.
+
+        Returns:
+            bool: True if the vertex data can be memory-mapped.
+        """
+        if not self.path.lower().endswith(".ply"):
+            return False
+        try:
+            self._read_ply_header()
+        except ValueError as e:
+            logger.debug(f"Falling back to Open3D reader for {self.path}: {e}")
+            return False
+
+        return True
+
+    def _inspect_ply(self) -> tuple[int, list[str]]:
+        """
+        Read the vertex count and attributes from a PLY header of any format.
+        """
+        header, _ = self._read_ply_header_tokens()
+        elements = [tokens for tokens in header if tokens[0] == "element"]
+        n_vertices = next(
+            (int(tokens[2]) for tokens in elements if tokens[1] == "vertex"), 0
+        )
+        properties = {
+            tokens[-1]
+            for tokens in header
+            if tokens[0] == "property" and tokens[1] != "list"
+        }
+
+        return n_vertices, _attributes_from_fields(properties)
+
+    def _inspect_pcd(self) -> tuple[int, list[str]]:
+        """
+        Read the point count and attributes from a PCD header.
+        """
+        n_points, fields = 0, set()
+        with open(self.path, "rb") as f:
+            for line in f:
+                tokens = line.decode("ascii", errors="replace").split()
+                if tokens[:1] == ["POINTS"]:
+                    n_points = int(tokens[1])
+                elif tokens[:1] == ["FIELDS"]:
+                    fields = set(tokens[1:])
+                elif tokens[:1] == ["DATA"]:
+                    break
+
+        fields = {"nx" if name == "normal_x" else name for name in fields}
+        if fields & {"rgb", "rgba"}:
+            fields.add("red")
+
+        return n_points, _attributes_from_fields(fields)
+
+    def _estimate_text_points(self, sample_bytes: int = 1 << 16) -> int:
+        """
+        Estimate the number of lines of a text file from the mean length of the
+        lines in its first `sample_bytes` bytes.
+        """
+        size = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            sample = f.read(sample_bytes)
+        n_lines = sum(1 for line in sample.splitlines() if line.strip())
+        if size <= len(sample):
+            return n_lines
+
+        return int(size * n_lines / len(sample))
+
+    def _read_ply_header_tokens(self) -> tuple[list[list[str]], int]:
+        """
+        Tokenise the header of a PLY file.
+
+        Returns:
+            tuple[list[list[str]], int]: The tokenised header lines, and the byte
+                offset of the data following the header.
+
+        Raises:
+            ValueError: If the file is not a PLY file or its header is incomplete.
+        """
+        with open(self.path, "rb") as f:
+            if f.readline().strip() != b"ply":
+                raise ValueError("missing PLY magic number")
+            header = []
+            for line in iter(f.readline, b""):
+                tokens = line.decode("ascii", errors="replace").split()
+                if tokens[:1] == ["end_header"]:
+                    break
+                if tokens:
+                    header.append(tokens)
+            else:
+                raise ValueError("missing end_header")
+
+            return header, f.tell()
+
+    def _read_ply_header(self) -> tuple[int, int, np.dtype]:
+        """
+        Parse the header of a binary little-endian PLY file.
+
+        Returns:
+            tuple[int, int, np.dtype]: The byte offset of the vertex data, the number
+                of vertices, and the structured dtype of a vertex.
+
+        Raises:
+            ValueError: If the vertex data cannot be memory-mapped.
+        """
+        header, offset = self._read_ply_header_tokens()
+        fmt = next((tokens[1] for tokens in header if tokens[0] == "format"), None)
+        if fmt != "binary_little_endian":
+            raise ValueError(f"format {fmt} cannot be memory-mapped")
+
+        elements = [tokens for tokens in header if tokens[0] == "element"]
+        if not elements or elements[0][1] != "vertex":
+            raise ValueError("vertex is not the first element")
+        n_vertices = int(elements[0][2])
+
+        return offset, n_vertices, _ply_vertex_dtype(header)
+
+    def _memmap_ply(self) -> dict[str, np.ndarray]:
+        """
+        Memory-map the vertex data of a binary little-endian PLY file.
+
+        Returns:
+            dict[str, np.ndarray]: Views of the "points" and, if present, "normals",
+                "colors" and "labels" of the vertices.
+        """
+        offset, n_vertices, vertex_dtype = self._read_ply_header()
+        vertices = np.memmap(
+            self.path, dtype=vertex_dtype, mode="r", offset=offset, shape=(n_vertices,)
+        )
+
+        attributes = {"points": _field_view(vertices, ("x", "y", "z"))}
+        if {"nx", "ny", "nz"} <= set(vertex_dtype.names):
+            attributes["normals"] = _field_view(vertices, ("nx", "ny", "nz"))
+        if {"red", "green", "blue"} <= set(vertex_dtype.names):
+            attributes["colors"] = _field_view(vertices, ("red", "green", "blue"))
+        if "label" in vertex_dtype.names:
+            attributes["labels"] = vertices["label"]
+
+        return attributes
+
+    def _load_npz(self) -> dict[str, np.ndarray]:
+        """
+        Load the arrays of an `.npz` archive, memory-mapping uncompressed members in
+        `mmap` mode.
+
+        Returns:
+            dict[str, np.ndarray]: The "points" and, if present, "normals" and
+                "colors" arrays.
+
+        Raises:
+            ValueError: If the archive has no "points" array.
+        """
+        attributes = {}
+        with zipfile.ZipFile(self.path) as archive:
+            for name in ("points", "normals", "colors"):
+                try:
+                    info = archive.getinfo(f"{name}.npy")
+                except KeyError:
+                    continue
+                if self.mmap and info.compress_type == zipfile.ZIP_STORED:
+                    attributes[name] = _memmap_npz_member(self.path, archive, info)
+                else:
+                    with archive.open(info) as member:
+                        attributes[name] = np.lib.format.read_array(member)
+
+        if "points" not in attributes:
+            raise ValueError(f"No 'points' array found in {self.path}")
+
+        return attributes
+
+
+def _attributes_from_fields(fields: set[str]) -> list[str]:
+    """
+    Map the field names of a file header to the point cloud attributes they hold.
+    """
+    attributes = ["points"]
+    if "nx" in fields:
+        attributes.append("normals")
+    if "red" in fields:
+        attributes.append("colors")
+
+    return attributes
+
+
+def _read_npy_shape(f) -> tuple[int, ...]:
+    """
+    Read the shape of the array stored in an open `.npy` file or archive member.
+    """
+    if np.lib.format.read_magic(f) == (1, 0):
+        header = np.lib.format.read_array_header_1_0(f)
+    else:
+        header = np.lib.format.read_array_header_2_0(f)
+
+    return header[0]
+
+
+def _ply_vertex_dtype(header: list[list[str]]) -> np.dtype:
+    """
+    Build the little-endian structured dtype of the vertex element of a PLY header.
+
+    Args:
+        header (list[list[str]]): Tokenised header lines.
+
+    Returns:
+        np.dtype: Structured dtype with one field per vertex property.
+
+    Raises:
+        ValueError: If a vertex property is a list or has an unknown type.
+    """
+    fields, element = [], None
+    for tokens in header:
+        if tokens[0] == "element":
+            element = tokens[1]
+        elif tokens[0] == "property" and element == "vertex":
+            if tokens[1] not in PLY_DTYPES:
+                raise ValueError(f"unsupported vertex property {tokens[1]}")
+            fields.append((tokens[2], "<" + PLY_DTYPES[tokens[1]]))
+
+    return np.dtype(fields)
+
+
+def _field_view(array: np.ndarray, names: tuple[str, ...]) -> np.ndarray:
+    """
+    Return an (N, len(names)) view of consecutive fields of a structured array that
+    share a dtype, falling back to a copy if the fields are not laid out that way.
+
+    Args:
+        array (np.ndarray): Structured array, possibly memory-mapped.
+        names (tuple[str, ...]): Field names to view as columns.
+
+    Returns:
+        np.ndarray: Array with one column per field.
+    """
+    dtype, first = array.dtype.fields[names[0]][:2]
+    consecutive = all(
+        array.dtype.fields[name][0] == dtype
+        and array.dtype.fields[name][1] == first + i * dtype.itemsize
+        for i, name in enumerate(names)
+    )
+    if not consecutive:
+        logger.debug(f"Fields {names} are not contiguous, copying them.")
+        return np.stack([array[name] for name in names], axis=1)
+
+    return np.ndarray(
+        shape=(len(array), len(names)),
+        dtype=dtype,
+        buffer=array,
+        offset=first,
+        strides=(array.dtype.itemsize, dtype.itemsize),
+    )
+
+
+def _memmap_npz_member(
+    path: str,
+    archive: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+) -> np.ndarray:
+    """
+    Memory-map an uncompressed `.npy` member of an `.npz` archive.
+
+    Args:
+        path (str): Path of the archive.
+        archive (zipfile.ZipFile): The opened archive.
+        info (zipfile.ZipInfo): The member to map.
+
+    Returns:
+        np.ndarray: Read-only view of the member's array.
+    """
+    with archive.open(info) as member:
+        if np.lib.format.read_magic(member) == (1, 0):
+            header = np.lib.format.read_array_header_1_0(member)
+        else:
+            header = np.lib.format.read_array_header_2_0(member)
+        shape, fortran_order, dtype = header
+        header_size = member.tell()
+
+    # The member data starts after the zip local file header, whose name and extra
+    # field lengths may differ from the central directory entry.
+    with open(path, "rb") as f:
+        f.seek(info.header_offset + 26)
+        name_length, extra_length = np.frombuffer(f.read(4), dtype="<u2").tolist()
+    data_offset = info.header_offset + 30 + name_length + extra_length
+
+    return np.memmap(
+        path,
+        dtype=dtype,
+        mode="r",
+        offset=data_offset + header_size,
+        shape=shape,
+        order="F" if fortran_order else "C",
+    )
@@ -1,16 +1,65 @@
+import functools
 import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
 import numpy as np
-import open3d as o3d
-from omegaconf import DictConfig, OmegaConf
 
+from src.open3d_pc.cluster_summary import (
+    log_summary,
+    summarize_clusters,
+    write_summary,
+)
+from src.open3d_pc.config import to_dict
+from src.open3d_pc.geometry import PointCloud, point_count
+from src.open3d_pc.memory_planner import MemoryPlan, MemoryPlanner
+from src.open3d_pc.pipeline_profiler import (
+    LoggingHook,
+    PipelineProfiler,
+    ProfilerHook,
+)
+from src.open3d_pc.point_cloud_cache import PointCloudCache
 from src.open3d_pc.point_cloud_clusterer import PointCloudClusterer
 from src.open3d_pc.point_cloud_loader import PointCloudLoader
 from src.open3d_pc.point_cloud_preprocessor import PointCloudPreprocessor
 
+if TYPE_CHECKING:
+    from omegaconf import DictConfig
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class LoadedInput:
+    """
+    Result of the I/O-bound part of a pipeline run, returned by
+    `PointCloudPipeline.fetch`.
+
+    Attributes:
+        path (str): Resolved path of the input file.
+        pcd (PointCloud | None): The loaded point cloud, or None if it was found in
+            the cache or is streamed in chunks.
+        n_points (int): Number of points in the input, known once it is loaded,
+            read from the cache or streamed by `run`.
+        cache_key (str | None): Cache key of the input, or None if caching is
+            disabled.
+        cached (tuple[PointCloud, dict] | None): The cached preprocessed point cloud
+            and its metadata, or None on a cache miss.
+        profiler (PipelineProfiler | None): Profiler holding the "cache_lookup"
+            and "load" stages.
+        plan (MemoryPlan | None): Memory plan of the input, or None if the pipeline
+            has no `max_memory`.
+    """
+
+    path: str
+    pcd: PointCloud | None = None
+    n_points: int = 0
+    cache_key: str | None = None
+    cached: tuple[PointCloud, dict] | None = None
+    profiler: PipelineProfiler | None = None
+    plan: MemoryPlan | None = None
+
+
 class PointCloudPipeline:
     """
     Pipeline for loading, preprocessing, and clustering point cloud data.
@@ -31,6 +80,23 @@ class PointCloudPipeline:
             clusterer_cfg.
         cluster_output_cfg (dict): Dictionary for cluster output, including options for
             visualisation and saving clusters.
+        cache (PointCloudCache | None): Cache of preprocessed point clouds, or None if
+            caching is disabled.
+        profiling_cfg (dict): Dictionary for profiling output, including options for
+            logging the stage metrics and writing them as JSON or Chrome trace files.
+        profiler_hooks (list[ProfilerHook]): Hooks receiving the metrics of every
+            stage, e.g. to forward them to an external collector.
+        pipeline_cfg (dict): Dictionary for pipeline-wide options, such as whether
+            to share one neighbour graph between normal estimation and clustering,
+            to process the point cloud in float32 mode, or a memory budget.
+        planner (MemoryPlanner | None): Planner choosing chunked and tiled
+            processing to stay within `pipeline_cfg["max_memory"]`, or None if no
+            budget is set.
+        memory_plan (MemoryPlan | None): Memory plan of the latest run.
+        report (dict | None): Stage metrics of the latest run.
+        cluster_summary (np.ndarray | None): Per-cluster statistics of the latest
+            run, if enabled with `cluster_output_cfg["summary"]` or
+            `cluster_output_cfg["summary_path"]`.
     """
 
     def __init__(
@@ -39,6 +105,10 @@ class PointCloudPipeline:
         preprocessor_cfg: dict,
         clusterer_cfg: dict,
         cluster_output_cfg: dict,
+        cache_cfg: dict | None = None,
+        profiling_cfg: dict | None = None,
+        profiler_hooks: list[ProfilerHook] | None = None,
+        pipeline_cfg: dict | None = None,
     ):
         """
         Initialise the PointCloudPipeline with separate config dictionaries.
@@ -48,56 +118,407 @@ class PointCloudPipeline:
             preprocessor_cfg (dict): Configuration for PointCloudPreprocessor.
             clusterer_cfg (dict): Configuration for PointCloudClusterer.
             cluster_output_cfg (dict): Configuration for cluster output options, such as
-                "visualize", "save_clusters", and "output_dir".
+                "visualize", "save_clusters", "output_dir", "export_mode",
+                "io_threads", "summary", and "summary_path".
+            cache_cfg (dict | None): Configuration for the preprocessed point cloud
+                cache, such as "enabled", "dir", and "max_bytes". Defaults to None,
+                which disables caching.
+            profiling_cfg (dict | None): Configuration for profiling output, such as
+                "log", "json_path", and "trace_path". Defaults to None.
+            profiler_hooks (list[ProfilerHook] | None): Hooks receiving the metrics
+                of every stage. Defaults to None.
+            pipeline_cfg (dict | None): Pipeline-wide options, such as
+                "share_neighbor_graph", "float32" and "max_memory". Defaults to
+                None.
         """
-        self.loader = PointCloudLoader(loader_cfg.get("path"))
+        self.loader = PointCloudLoader(**loader_cfg)
         self.preprocessor = PointCloudPreprocessor(**preprocessor_cfg)
         self.clusterer = PointCloudClusterer(**clusterer_cfg)
         self.cluster_output_cfg = cluster_output_cfg
 
+        cache_cfg = cache_cfg or {}
+        self.cache = None
+        if cache_cfg.get("enabled", False):
+            self.cache = PointCloudCache(
+                cache_dir=cache_cfg.get("dir", ".cache/point_clouds"),
+                max_bytes=cache_cfg.get("max_bytes"),
+            )
+
+        self.profiling_cfg = profiling_cfg or {}
+        self.profiler_hooks = list(profiler_hooks or [])
+        if self.profiling_cfg.get("log", False):
+            self.profiler_hooks.append(LoggingHook())
+        self.pipeline_cfg = pipeline_cfg or {}
+        if self.pipeline_cfg.get("float32", False):
+            # Loading and preprocessing produce float32 tensor point clouds, which
+            # the clusterer and writer take as they are.
+            self.loader.float32 = True
+            self.preprocessor.float32 = True
+        self.planner = None
+        if self.pipeline_cfg.get("max_memory") is not None:
+            self.planner = MemoryPlanner(
+                int(self.pipeline_cfg["max_memory"]),
+                self.preprocessor,
+                self.clusterer,
+            )
+        self.memory_plan = None
+        self.report = None
+        self.cluster_summary = None
+
     @classmethod
-    def from_config(cls, cfg: DictConfig | dict) -> "PointCloudPipeline":
+    def from_config(cls, cfg: "DictConfig | dict") -> "PointCloudPipeline":
         """
         Alternative constrcutor to create a PointCloudPipeline instance from a
         DictConfig or a nested config dictionary.
 
         Args:
             cfg (DictConfig | dict): Configuration DictConfig object or dictionary
-                containing keys for "loader", "preprocessor", "clusterer", and
-                "cluster_output".
+                containing keys for "loader", "preprocessor", "clusterer",
+                "cluster_output", and optionally "cache", "profiling", and
+                "pipeline".
 
         Returns:
             PointCloudPipeline: Instance of PointCloudPipeline with configs applied.
         """
-        if isinstance(cfg, DictConfig):
-            cfg = OmegaConf.to_container(cfg, resolve=True)
+        cfg = to_dict(cfg)
 
         return cls(
             loader_cfg=cfg.get("loader", {}),
             preprocessor_cfg=cfg.get("preprocessor", {}),
             clusterer_cfg=cfg.get("clusterer", {}),
             cluster_output_cfg=cfg.get("cluster_output", {}),
+            cache_cfg=cfg.get("cache"),
+            profiling_cfg=cfg.get("profiling"),
+            pipeline_cfg=cfg.get("pipeline"),
+        )
+
+    def fetch(
+        self,
+        path: str | None = None,
+        loader_settings: dict | None = None,
+    ) -> LoadedInput:
+        """
+        Run the I/O-bound part of a pipeline run: hash the input file and read its
+        cache entry, or else load it.
+
+        The pipeline's own loader is not used, so this can run on a background
+        thread while another file is being processed, and the result passed to
+        `run`. Files loaded in chunks are only streamed by `run`.
+
+        A memory plan changes the pipeline loader's settings while `run` streams a
+        file, so a background caller should pass the settings it took beforehand.
+
+        Args:
+            path (str | None): Point cloud file to load. If None, uses the path the
+                loader was configured with.
+            loader_settings (dict | None): "mmap", "chunk_size" and "float32" to
+                load with, e.g. from `loader_settings`. If None, the pipeline
+                loader's current settings are used. Defaults to None.
+
+        Returns:
+            LoadedInput: The loaded or cached point cloud.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file format is unsupported.
+        """
+        loader = PointCloudLoader(
+            path=str(path) if path is not None else self.loader.path,
+            **(loader_settings or self.loader_settings()),
         )
+        return self._fetch(loader, PipelineProfiler())
+
+    def loader_settings(self) -> dict:
+        """
+        Get the current settings of the pipeline's loader, which `fetch` loads with.
 
-    def run(self) -> tuple[o3d.geometry.PointCloud, np.ndarray]:
+        Returns:
+            dict: The loader's "mmap", "chunk_size" and "float32".
+        """
+        return {
+            "mmap": self.loader.mmap,
+            "chunk_size": self.loader.chunk_size,
+            "float32": self.loader.float32,
+        }
+
+    def run(
+        self,
+        path: str | None = None,
+        return_report: bool = False,
+        loaded: LoadedInput | None = None,
+    ) -> tuple[PointCloud, np.ndarray] | tuple[PointCloud, np.ndarray, dict]:
         """
         Execute the full point cloud processing pipeline: load, preprocess, and cluster.
 
+        If caching is enabled and the input file was already preprocessed with the
+        same parameters, loading and preprocessing are skipped.
+
+        Unless disabled with `pipeline_cfg["share_neighbor_graph"]`, the neighbour
+        graph of the downsampled cloud is built once and used by both normal
+        estimation and clustering. It is not built in tiled clustering or tiled
+        normal estimation mode, which exist to avoid holding the neighbours of the
+        whole cloud in memory, nor in coarse-to-fine clustering mode, which exists
+        to avoid searching them, nor for clustering backends other than "open3d",
+        which find their own neighbours.
+
+        The wall time, CPU time, peak memory increase and point counts of every stage
+        are recorded in `report`, passed to the profiler hooks, and written to the
+        files configured in `profiling_cfg`.
+
+        With `pipeline_cfg["max_memory"]`, the memory planner may stream the input
+        in chunks, skip the shared neighbour graph, or tile normal estimation and
+        clustering for this run, as recorded in the report's "memory_plan".
+
+        Args:
+            path (str | None): Point cloud file to process. If None, uses the path the
+                loader was configured with.
+            return_report (bool): Whether to also return the stage metrics. Defaults
+                to False.
+            loaded (LoadedInput | None): Input loaded in advance by `fetch`, which
+                takes the place of `path`. Defaults to None.
+
         Returns:
-            tuple[o3d.geometry.PointCloud, np.ndarray]: A tuple containing:
-                - clustered_pcd (o3d.geometry.PointCloud): The processed point cloud
-                  after clustering, with optional colours applied.
+            tuple: A tuple containing:
+                - clustered_pcd (PointCloud): The processed point cloud after
+                  clustering, with optional colours applied.
                 - labels (np.ndarray): Cluster labels for each point in the point cloud.
+                - report (dict): Stage metrics, only if `return_report` is True.
         """
         logger.info("Running point cloud pipeline.")
-        pcd = self.loader.load()
-        processed_pcd = self.preprocessor.preprocess(pcd)
-        labels, clustered_pcd = self.clusterer.cluster(
-            processed_pcd,
-            visualize=self.cluster_output_cfg.get("visualize", False),
-            save_clusters=self.cluster_output_cfg.get("save_clusters", False),
-            output_dir=self.cluster_output_cfg.get("output_dir", "output_clusters"),
-        )
+        if loaded is not None:
+            path = loaded.path
+        if path is not None:
+            self.loader.path = str(path)
+
+        profiler = PipelineProfiler(self.profiler_hooks)
+        self.memory_plan = None
+        try:
+            processed_pcd = self._load_and_preprocess(profiler, loaded)
+            labels, clustered_pcd = self.clusterer.cluster(
+                processed_pcd,
+                visualize=self.cluster_output_cfg.get("visualize", False),
+                save_clusters=self.cluster_output_cfg.get("save_clusters", False),
+                output_dir=self.cluster_output_cfg.get("output_dir", "output_clusters"),
+                export_mode=self.cluster_output_cfg.get("export_mode", "per_cluster"),
+                io_threads=self.cluster_output_cfg.get("io_threads"),
+                profiler=profiler,
+                neighbor_graph=self.preprocessor.neighbor_graph,
+            )
+        finally:
+            # The plan only changes the components' settings for this run.
+            if self.memory_plan is not None:
+                self.memory_plan.restore()
+        # The graph can be much larger than the cloud, so release it right away.
+        self.preprocessor.neighbor_graph = None
+        self._summarize(clustered_pcd, labels, profiler)
+        self.report = profiler.finish()
+        if self.memory_plan is not None:
+            self.report["memory_plan"] = self.memory_plan.to_dict()
+        if self.profiling_cfg.get("json_path"):
+            profiler.write_json(self.profiling_cfg["json_path"])
+        if self.profiling_cfg.get("trace_path"):
+            profiler.write_chrome_trace(self.profiling_cfg["trace_path"])
         logger.info("Point cloud pipeline completed.")
 
+        if return_report:
+            return clustered_pcd, labels, self.report
         return clustered_pcd, labels
+
+    def _summarize(
+        self,
+        pcd: PointCloud,
+        labels: np.ndarray,
+        profiler: PipelineProfiler,
+    ) -> None:
+        """
+        Compute, log and optionally save the per-cluster statistics, if enabled.
+
+        Args:
+            pcd (PointCloud): The clustered point cloud.
+            labels (np.ndarray): Cluster labels for each point.
+            profiler (PipelineProfiler): Profiler recording the stage.
+        """
+        self.cluster_summary = None
+        summary_path = self.cluster_output_cfg.get("summary_path")
+        if not (self.cluster_output_cfg.get("summary", False) or summary_path):
+            return
+
+        with profiler.stage("cluster_summary", points_in=point_count(pcd)):
+            self.cluster_summary = summarize_clusters(pcd, labels)
+            if summary_path:
+                write_summary(summary_path, self.cluster_summary)
+        log_summary(self.cluster_summary, labels)
+
+    def _load_and_preprocess(
+        self,
+        profiler: PipelineProfiler,
+        loaded: LoadedInput | None = None,
+    ) -> PointCloud:
+        """
+        Load and preprocess the point cloud, going through the cache if enabled.
+
+        Args:
+            profiler (PipelineProfiler): Profiler recording the stages.
+            loaded (LoadedInput | None): Input loaded in advance by `fetch`. If None,
+                the input is loaded with the pipeline's loader. Defaults to None.
+
+        Returns:
+            PointCloud: The preprocessed point cloud.
+        """
+        self.preprocessor.neighbor_graph = None
+        neighbor_radius = self._shared_graph_radius()
+        if loaded is None:
+            loaded = self._fetch(self.loader, profiler)
+        elif loaded.profiler is not None:
+            profiler.merge(loaded.profiler)
+        if loaded.cached is not None:
+            processed_pcd, metadata = loaded.cached
+            loaded.n_points = metadata.get("n_points", 0)
+            self.loader.n_points = loaded.n_points
+            self.preprocessor.selected_voxel_size = metadata.get("voxel_size")
+            return processed_pcd
+
+        on_downsampled = None
+        self.memory_plan = loaded.plan
+        if self.memory_plan is not None:
+            on_downsampled = functools.partial(
+                self.planner.plan_processing, self.memory_plan
+            )
+        if loaded.pcd is None:
+            if self.memory_plan is not None and self.memory_plan.chunk_size:
+                # Array files are then sliced from the page cache, not read whole.
+                self.memory_plan.override(
+                    self.loader, "chunk_size", self.memory_plan.chunk_size
+                )
+                self.memory_plan.override(self.loader, "mmap", True)
+            with profiler.stage("scan_bounds"):
+                min_bound, _ = self.loader.scan_bounds()
+            processed_pcd = self.preprocessor.preprocess_chunks(
+                self.loader.iter_chunks(),
+                min_bound,
+                profiler=profiler,
+                neighbor_radius=neighbor_radius,
+                on_downsampled=on_downsampled,
+            )
+            loaded.n_points = self.loader.n_points
+        else:
+            self.loader.n_points = loaded.n_points
+            processed_pcd = self.preprocessor.preprocess(
+                self._take_pcd(loaded),
+                profiler=profiler,
+                neighbor_radius=neighbor_radius,
+                on_downsampled=on_downsampled,
+            )
+
+        if loaded.cache_key is not None:
+            with profiler.stage("cache_store", points_in=point_count(processed_pcd)):
+                self.cache.put(
+                    loaded.cache_key,
+                    processed_pcd,
+                    metadata={
+                        "n_points": self.loader.n_points,
+                        "voxel_size": self.preprocessor.selected_voxel_size,
+                    },
+                )
+
+        return processed_pcd
+
+    def _shared_graph_radius(self) -> float | None:
+        """
+        Get the radius of the neighbour graph shared by normal estimation and
+        clustering.
+
+        Returns:
+            float | None: The clusterer's `eps`, or None if no graph is shared.
+        """
+        if (
+            self.pipeline_cfg.get("share_neighbor_graph", True)
+            and self.clusterer.backend == "open3d"
+            and self.clusterer.tile_size is None
+            and not self.clusterer.coarse_to_fine
+            and self.preprocessor.normal_tile_size is None
+        ):
+            return self.clusterer.eps
+
+        return None
+
+    def _normals_method(self) -> str:
+        """
+        Get the configured way of estimating normals, which is part of the cache
+        key since the methods agree only up to rounding.
+
+        Returns:
+            str: "graph", "tiled" or "open3d".
+        """
+        if self._shared_graph_radius() is not None:
+            return "graph"
+        if self.preprocessor.normal_tile_size is not None:
+            return "tiled"
+
+        return "open3d"
+
+    def _take_pcd(self, loaded: LoadedInput) -> PointCloud:
+        """
+        Get the loaded point cloud to preprocess. With a memory budget, no other
+        reference to it is kept, so it is freed as soon as it is downsampled.
+
+        Args:
+            loaded (LoadedInput): The loaded input.
+
+        Returns:
+            PointCloud: The loaded point cloud.
+        """
+        pcd = loaded.pcd
+        if self.planner is not None:
+            loaded.pcd = None
+            self.loader.release()
+
+        return pcd
+
+    def _fetch(
+        self,
+        loader: PointCloudLoader,
+        profiler: PipelineProfiler,
+    ) -> LoadedInput:
+        """
+        Look the input up in the cache, and load it on a cache miss unless it is
+        streamed in chunks. The cache key covers whether the input is streamed, as
+        configured or as planned under `max_memory`, since streaming drops the
+        normals and colours stored in the file, and how normals are estimated.
+
+        Args:
+            loader (PointCloudLoader): Loader configured with the input file.
+            profiler (PipelineProfiler): Profiler recording the stages.
+
+        Returns:
+            LoadedInput: The loaded or cached point cloud.
+        """
+        loaded = LoadedInput(path=loader.resolve_path(), profiler=profiler)
+        if self.planner is not None:
+            loaded.plan = self.planner.plan_load(loader)
+        streamed = bool(loader.chunk_size or (loaded.plan and loaded.plan.chunk_size))
+        if self.cache is not None:
+            with profiler.stage("cache_lookup") as metrics:
+                # Streamed inputs keep only their coordinates, so they are cached
+                # apart from whole loads.
+                loaded.cache_key = self.cache.make_key(
+                    loaded.path,
+                    {
+                        **self.preprocessor.get_params(),
+                        "streamed": streamed,
+                        "normals": self._normals_method(),
+                    },
+                )
+                loaded.cached = self.cache.get(loaded.cache_key)
+                if loaded.cached is not None:
+                    metrics.points_out = point_count(loaded.cached[0])
+            if loaded.cached is not None:
+                return loaded
+
+        if not streamed:
+            with profiler.stage("load") as metrics:
+                loaded.pcd = loader.load()
+                metrics.points_out = point_count(loaded.pcd)
+            loaded.n_points = loader.n_points
+
+        return loaded
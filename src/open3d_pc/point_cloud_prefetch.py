@@ -0,0 +1,287 @@
+import logging
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from src.open3d_pc.config import to_dict
+from src.open3d_pc.geometry import PointCloud, point_count
+from src.open3d_pc.point_cloud_batch import (
+    BatchFileResult,
+    BatchSummary,
+    PointCloudBatchProcessor,
+    output_subdirs,
+)
+from src.open3d_pc.point_cloud_pipeline import PointCloudPipeline
+from src.open3d_pc.point_cloud_writer import PointCloudWriter
+
+if TYPE_CHECKING:
+    from omegaconf import DictConfig
+
+logger = logging.getLogger(__name__)
+
+
+class PointCloudPrefetchExecutor:
+    """
+    Processes many point cloud files one after another, overlapping the I/O of the
+    neighbouring files with the processing of the current one.
+
+    While file N is preprocessed and clustered on the calling thread, file N+1 is
+    loaded (or its cache entry read) on a background loader thread, and the clusters
+    of file N-1 are written on a background writer thread. At most `queue_depth`
+    files are loaded ahead and at most `queue_depth` results wait to be written, so
+    no more than `2 * queue_depth + 1` point clouds are held in memory at once.
+
+    As in batch mode, visualisation is disabled, clusters are saved to a
+    subdirectory of `cluster_output.output_dir` named by `output_subdirs`, and
+    failures are isolated to the file that caused them.
+
+    Attributes:
+        pipeline (PointCloudPipeline): Pipeline processing every file.
+        queue_depth (int): Maximum number of files loaded ahead of, and of results
+            waiting to be written behind, the current file. Defaults to 1.
+        writer (PointCloudWriter | None): Writer saving the clusters, or None if
+            `cluster_output.save_clusters` is disabled.
+        output_dir (Path): Directory holding the per-file cluster directories.
+        summary (BatchSummary): Aggregate statistics of the latest run.
+        load_wait (float): Time the latest run spent waiting for files to load, in
+            seconds. Close to zero when loading is fully hidden behind processing.
+        write_wait (float): Time the latest run spent waiting for results to be
+            written, in seconds.
+    """
+
+    def __init__(self, pipeline_cfg: dict, queue_depth: int = 1):
+        if queue_depth < 1:
+            raise ValueError(f"queue_depth must be at least 1, got {queue_depth}")
+
+        self.pipeline = PointCloudPipeline.from_config(pipeline_cfg)
+        output_cfg = dict(self.pipeline.cluster_output_cfg)
+        self.writer = None
+        if output_cfg.get("save_clusters", False):
+            self.writer = PointCloudWriter(
+                export_mode=output_cfg.get("export_mode", "per_cluster"),
+                io_threads=output_cfg.get("io_threads"),
+            )
+        self.output_dir = Path(output_cfg.get("output_dir", "output_clusters"))
+        # Clusters are written by the writer thread rather than by the pipeline.
+        output_cfg["visualize"] = False
+        output_cfg["save_clusters"] = False
+        self.pipeline.cluster_output_cfg = output_cfg
+
+        # A memory plan changes the pipeline's loader while a file is streamed, so
+        # the loader thread keeps to the configured settings.
+        self._loader_settings = self.pipeline.loader_settings()
+        self.queue_depth = queue_depth
+        self.summary = BatchSummary()
+        self.load_wait = 0.0
+        self.write_wait = 0.0
+        self._output_names = {}
+
+    @classmethod
+    def from_config(cls, cfg: "DictConfig | dict") -> "PointCloudPrefetchExecutor":
+        """
+        Alternative constructor to create a PointCloudPrefetchExecutor from a
+        DictConfig or a nested config dictionary with a "batch" section.
+
+        Args:
+            cfg (DictConfig | dict): Full pipeline configuration.
+
+        Returns:
+            PointCloudPrefetchExecutor: Instance configured from the "batch" section.
+        """
+        cfg = to_dict(cfg)
+
+        batch_cfg = cfg.get("batch") or {}
+        return cls(
+            pipeline_cfg={key: value for key, value in cfg.items() if key != "batch"},
+            queue_depth=batch_cfg.get("queue_depth") or 1,
+        )
+
+    def run(
+        self,
+        inputs: str | Path | Iterable[str | Path],
+        pattern: str = "*",
+    ) -> Iterator[BatchFileResult]:
+        """
+        Process the files in order, loading and writing in the background.
+
+        Args:
+            inputs (str | Path | Iterable[str | Path]): Directory, glob expression, or
+                explicit list of file paths.
+            pattern (str): Glob pattern used when `inputs` is a directory. Defaults
+                to "*".
+
+        Yields:
+            BatchFileResult: Result for each file once its clusters are written, in
+                input order.
+        """
+        if isinstance(inputs, (str, Path)):
+            paths = PointCloudBatchProcessor.collect_files(inputs, pattern)
+        else:
+            paths = [str(path) for path in inputs]
+
+        self.summary = BatchSummary(n_files=len(paths))
+        self._output_names = output_subdirs(paths)
+        self.load_wait = 0.0
+        self.write_wait = 0.0
+        logger.info(
+            f"Processing {len(paths)} files with prefetching "
+            f"(queue depth {self.queue_depth})."
+        )
+        start = time.perf_counter()
+
+        with (
+            ThreadPoolExecutor(1, thread_name_prefix="loader") as loader,
+            ThreadPoolExecutor(1, thread_name_prefix="writer") as writer,
+        ):
+            loads = deque()
+            writes = deque()
+            for i, path in enumerate(paths):
+                # Keep the loader `queue_depth` files ahead of the current one.
+                while len(loads) <= self.queue_depth and i + len(loads) < len(paths):
+                    next_path = paths[i + len(loads)]
+                    loads.append(
+                        loader.submit(
+                            self.pipeline.fetch,
+                            next_path,
+                            loader_settings=self._loader_settings,
+                        )
+                    )
+
+                result, pcd, labels = self._process(path, loads.popleft())
+                if pcd is None:
+                    writes.append(_completed(result))
+                else:
+                    writes.append(writer.submit(self._write, result, pcd, labels))
+
+                while len(writes) > self.queue_depth:
+                    yield self._finish(writes.popleft())
+            while writes:
+                yield self._finish(writes.popleft())
+
+        self.summary.elapsed = time.perf_counter() - start
+        logger.info(
+            f"Processed {self.summary.n_files} files "
+            f"({self.summary.n_failed} failed) in {self.summary.elapsed:.2f}s: "
+            f"{self.summary.files_per_second:.2f} files/s, "
+            f"{self.summary.points_per_second:.0f} points/s, "
+            f"{self.load_wait:.2f}s waiting for loads, "
+            f"{self.write_wait:.2f}s waiting for writes."
+        )
+
+    def _process(
+        self,
+        path: str,
+        load: Future,
+    ) -> tuple[BatchFileResult, PointCloud | None, np.ndarray | None]:
+        """
+        Wait for a file to be loaded and run the pipeline on it.
+
+        Args:
+            path (str): Path of the file.
+            load (Future): Future of the file's `PointCloudPipeline.fetch`.
+
+        Returns:
+            tuple: A tuple containing:
+                - result (BatchFileResult): Result of the file so far.
+                - pcd (PointCloud | None): The clustered point cloud, or None if
+                  processing failed.
+                - labels (np.ndarray | None): Cluster labels, or None if processing
+                  failed.
+        """
+        start = time.perf_counter()
+        try:
+            loaded = load.result()
+            self.load_wait += time.perf_counter() - start
+            pcd, labels = self.pipeline.run(loaded=loaded)
+        except Exception as e:
+            return (
+                BatchFileResult(
+                    path=path,
+                    elapsed=time.perf_counter() - start,
+                    error=f"{type(e).__name__}: {e}",
+                ),
+                None,
+                None,
+            )
+
+        result = BatchFileResult(
+            path=path,
+            labels=labels,
+            n_points=loaded.n_points,
+            n_processed_points=point_count(pcd),
+            n_clusters=int(labels.max()) + 1 if len(labels) else 0,
+            elapsed=time.perf_counter() - start,
+        )
+        return result, pcd, labels
+
+    def _write(
+        self,
+        result: BatchFileResult,
+        pcd: PointCloud,
+        labels: np.ndarray,
+    ) -> BatchFileResult:
+        """
+        Save the clusters of a processed file, recording any error in its result.
+        Runs on the writer thread.
+
+        Args:
+            result (BatchFileResult): Result of the processed file.
+            pcd (PointCloud): The clustered point cloud.
+            labels (np.ndarray): Cluster labels for each point.
+
+        Returns:
+            BatchFileResult: The result, including the time spent writing.
+        """
+        if self.writer is None or result.n_clusters == 0:
+            return result
+
+        start = time.perf_counter()
+        try:
+            self.writer.write(
+                pcd, labels, self.output_dir / self._output_names[result.path]
+            )
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        result.elapsed += time.perf_counter() - start
+
+        return result
+
+    def _finish(self, write: Future) -> BatchFileResult:
+        """
+        Wait for a result to be written and update the running summary.
+
+        Args:
+            write (Future): Future of the file's `_write`.
+
+        Returns:
+            BatchFileResult: Result of the file.
+        """
+        start = time.perf_counter()
+        result = write.result()
+        self.write_wait += time.perf_counter() - start
+
+        self.summary.add(result)
+        if result.ok:
+            logger.info(
+                f"Processed {result.path}: {result.n_points} points, "
+                f"{result.n_clusters} clusters in {result.elapsed:.2f}s."
+            )
+        else:
+            logger.error(f"Failed to process {result.path}: {result.error}")
+
+        return result
+
+
+def _completed(result: BatchFileResult) -> Future:
+    """
+    Wrap a result in a completed future, so it is queued behind pending writes.
+    """
+    future = Future()
+    future.set_result(result)
+
+    return future
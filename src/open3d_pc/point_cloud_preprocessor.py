@@ -1,19 +1,94 @@
 import logging
+import multiprocessing
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 import open3d as o3d
 
+from src.open3d_pc.geometry import (
+    PointCloud,
+    get_array,
+    has_array,
+    is_tensor,
+    make_pointcloud,
+    point_count,
+    set_array,
+)
+from src.open3d_pc.neighbor_graph import NeighborGraph
+from src.open3d_pc.pipeline_profiler import PipelineProfiler
+from src.open3d_pc.spatial import (
+    iter_tiles,
+    knn_search,
+    radius_search,
+    voxel_size_for_target,
+    within_radius,
+)
+from src.open3d_pc.voxel_accumulator import VoxelAccumulator
+
 logger = logging.getLogger(__name__)
 
+OUTLIER_METHODS = ("statistical", "radius")
+
+# Called with the downsampled point cloud and the requested neighbour graph radius,
+# returning the radius to use.
+DownsampledHook = Callable[[PointCloud, float | None], float | None]
+
+# Number of points voxelised at once in float32 mode, which bounds the size of the
+# float64 temporaries.
+_DOWNSAMPLE_CHUNK_SIZE = 1 << 20
+
 
 class PointCloudPreprocessor:
     """
-    Preprocesses point clouds by downsampling and estimating surface normals.
+    Preprocesses point clouds by downsampling, optionally removing outliers, and
+    estimating surface normals.
 
     Attributes:
         voxel_size (float): Voxel size for downsampling. Defaults to 0.05.
         normal_radius (float): Radius for normal estimation. Defaults to 0.1.
         normal_max_nn (int): Maximum number of nearest neighbors for normal estimation.
             Defaults to 30.
+        target_points (int | None): If set, the voxel size is chosen for each point
+            cloud so that downsampling keeps about this many points, and
+            `voxel_size` is ignored. Defaults to None.
+        memory_budget (int | None): If set, the voxel size is chosen for each point
+            cloud so that the preprocessed point cloud takes at most about this many
+            bytes. Combined with `target_points`, the smaller target wins. Defaults
+            to None.
+        outlier_removal (str | None): Outlier removal applied after downsampling:
+            "statistical" removes points whose mean distance to their
+            `outlier_nb_neighbors` nearest neighbours exceeds the average by more
+            than `outlier_std_ratio` standard deviations, "radius" removes points
+            with fewer than `outlier_nb_points` other points within
+            `outlier_radius`. If None, no points are removed. Defaults to None.
+        outlier_nb_neighbors (int): Number of neighbours of the statistical
+            outlier test. Defaults to 20.
+        outlier_std_ratio (float): Standard deviation multiplier of the
+            statistical outlier test. Defaults to 2.0.
+        outlier_radius (float | None): Search radius of the radius outlier test.
+            Defaults to None, which uses `normal_radius`.
+        outlier_nb_points (int): Minimum number of other points within
+            `outlier_radius` of the radius outlier test. Defaults to 5.
+        normal_tile_size (float | None): Edge length of the tiles used for
+            tiled normal estimation. If set, normals are estimated tile by tile on
+            a process pool, each tile extended by a halo of the normal radius, so no
+            search structure over the whole cloud is built. If None, normals are
+            estimated for the whole cloud at once. Defaults to None.
+        n_jobs (int | None): Number of worker processes estimating the normals of
+            tiles in parallel. Defaults to the number of CPUs.
+        float32 (bool): Whether to downsample into a tensor point cloud with
+            float32 storage, which halves the memory of the following stages.
+            Tensor point clouds, e.g. loaded in float32 mode, are processed as
+            tensor point clouds either way. Defaults to False.
+        selected_voxel_size (float | None): Voxel size used by the latest
+            `downsample` call.
+        n_outliers (int): Number of outliers removed by the latest `preprocess`
+            call.
+        neighbor_graph (NeighborGraph | None): Neighbour graph of the latest
+            preprocessed point cloud, if `preprocess` was asked to build one.
     """
 
     def __init__(
@@ -21,82 +96,529 @@ class PointCloudPreprocessor:
         voxel_size: float = 0.05,
         normal_radius: float = 0.1,
         normal_max_nn: int = 30,
+        target_points: int | None = None,
+        memory_budget: int | None = None,
+        outlier_removal: str | None = None,
+        outlier_nb_neighbors: int = 20,
+        outlier_std_ratio: float = 2.0,
+        outlier_radius: float | None = None,
+        outlier_nb_points: int = 5,
+        normal_tile_size: float | None = None,
+        n_jobs: int | None = None,
+        float32: bool = False,
     ):
+        if outlier_removal is not None and outlier_removal not in OUTLIER_METHODS:
+            raise ValueError(
+                f"Unknown outlier removal {outlier_removal}, expected one of "
+                f"{OUTLIER_METHODS}"
+            )
         self.voxel_size = voxel_size
         self.normal_radius = normal_radius
         self.normal_max_nn = normal_max_nn
+        self.target_points = target_points
+        self.memory_budget = memory_budget
+        self.outlier_removal = outlier_removal
+        self.outlier_nb_neighbors = outlier_nb_neighbors
+        self.outlier_std_ratio = outlier_std_ratio
+        self.outlier_radius = outlier_radius
+        self.outlier_nb_points = outlier_nb_points
+        self.normal_tile_size = normal_tile_size
+        self.n_jobs = n_jobs or os.cpu_count()
+        self.float32 = float32
+        self.selected_voxel_size = None
+        self.n_outliers = 0
+        self.neighbor_graph = None
 
-    def preprocess(self, pcd: o3d.geometry.PointCloud) -> o3d.geometry.PointCloud:
+    def get_params(self) -> dict:
         """
-        Preprocess the point cloud by downsampling and estimating surface normals.
+        Get the parameters that determine the preprocessing result.
 
-        Uses the instance's voxel size and normal estimation parameters.
+        Returns:
+            dict: The preprocessing parameters.
+        """
+        return {
+            "voxel_size": self.voxel_size,
+            "normal_radius": self.normal_radius,
+            "normal_max_nn": self.normal_max_nn,
+            "target_points": self.target_points,
+            "memory_budget": self.memory_budget,
+            "outlier_removal": self.outlier_removal,
+            "outlier_nb_neighbors": self.outlier_nb_neighbors,
+            "outlier_std_ratio": self.outlier_std_ratio,
+            "outlier_radius": self.outlier_radius,
+            "outlier_nb_points": self.outlier_nb_points,
+            "float32": self.float32,
+        }
+
+    def preprocess(
+        self,
+        pcd: PointCloud,
+        profiler: PipelineProfiler | None = None,
+        neighbor_radius: float | None = None,
+        on_downsampled: DownsampledHook | None = None,
+    ) -> PointCloud:
+        """
+        Preprocess the point cloud by downsampling, removing outliers if enabled, and
+        estimating surface normals.
+
+        Uses the instance's voxel size, or the one chosen for the target point count
+        or memory budget, and outlier removal and normal estimation parameters.
 
         Args:
-            pcd (o3d.geometry.PointCloud): Input point cloud to preprocess.
+            pcd (PointCloud): Input point cloud to preprocess.
+            profiler (PipelineProfiler | None): Profiler recording the
+                "select_voxel_size", "downsample", "remove_outliers" and "normals"
+                stages. Defaults to None.
+            neighbor_radius (float | None): If set, build a neighbour graph of the
+                downsampled point cloud with this radius (at least `normal_radius`,
+                and `outlier_radius` for radius outlier removal), use it for outlier
+                removal and normal estimation and keep it in `neighbor_graph` for
+                later stages. Defaults to None.
+            on_downsampled (DownsampledHook | None): Called with the downsampled
+                point cloud and `neighbor_radius` before the remaining stages, and
+                returning the neighbour graph radius to use instead, e.g. None if
+                the graph would not fit in memory. Defaults to None.
 
         Returns:
-            pcd (o3d.geometry.PointCloud): The preprocessed point cloud with
-                downsampling and normals estimated.
+            pcd (PointCloud): The preprocessed point cloud with downsampling and
+                normals estimated.
         """
-        pcd = self.downsample(pcd)
-        pcd = self.estimate_normals(pcd)
+        profiler = profiler or PipelineProfiler()
+        voxel_size = None
+        if self.has_target():
+            with profiler.stage("select_voxel_size", points_in=point_count(pcd)):
+                voxel_size = self.select_voxel_size(pcd)
+        with profiler.stage("downsample", points_in=point_count(pcd)) as metrics:
+            pcd = self.downsample(pcd, voxel_size)
+            metrics.points_out = point_count(pcd)
 
-        logger.info(f"Processed point cloud with {len(pcd.points)} points.")
+        return self._finish_preprocessing(
+            pcd, profiler, neighbor_radius, on_downsampled
+        )
+
+    def preprocess_chunks(
+        self,
+        chunks: Iterable[np.ndarray],
+        min_bound: np.ndarray,
+        profiler: PipelineProfiler | None = None,
+        neighbor_radius: float | None = None,
+        on_downsampled: DownsampledHook | None = None,
+    ) -> PointCloud:
+        """
+        Preprocess a point cloud streamed in chunks by downsampling it incrementally
+        and estimating surface normals on the result.
+
+        Args:
+            chunks (Iterable[np.ndarray]): Chunks of (M, 3) point coordinates.
+            min_bound (np.ndarray): Minimum bound of the whole point cloud.
+            profiler (PipelineProfiler | None): Profiler recording the
+                "load_downsample", "remove_outliers" and "normals" stages. Loading
+                and downsampling are recorded as one stage since they are
+                interleaved. Defaults to None.
+            neighbor_radius (float | None): If set, build a neighbour graph of the
+                downsampled point cloud, as in `preprocess`. Defaults to None.
+            on_downsampled (DownsampledHook | None): Called with the downsampled
+                point cloud, as in `preprocess`. Defaults to None.
+
+        Returns:
+            pcd (PointCloud): The preprocessed point cloud with downsampling and
+                normals estimated.
+        """
+        profiler = profiler or PipelineProfiler()
+        with profiler.stage("load_downsample") as metrics:
+            pcd = self.downsample_chunks(chunks, min_bound)
+            metrics.points_out = point_count(pcd)
+
+        return self._finish_preprocessing(
+            pcd, profiler, neighbor_radius, on_downsampled
+        )
+
+    def _finish_preprocessing(
+        self,
+        pcd: PointCloud,
+        profiler: PipelineProfiler,
+        neighbor_radius: float | None,
+        on_downsampled: DownsampledHook | None = None,
+    ) -> PointCloud:
+        """
+        Build the neighbour graph if requested, remove outliers if enabled and
+        estimate normals on the downsampled point cloud.
+        """
+        self.neighbor_graph = None
+        self.n_outliers = 0
+        if on_downsampled is not None:
+            neighbor_radius = on_downsampled(pcd, neighbor_radius)
+        if neighbor_radius is not None:
+            radius = max(neighbor_radius, self.normal_radius)
+            if self.outlier_removal == "radius":
+                radius = max(radius, self.effective_outlier_radius())
+            with profiler.stage(
+                "neighbor_graph", points_in=point_count(pcd)
+            ) as metrics:
+                self.neighbor_graph = NeighborGraph.from_pointcloud(pcd, radius)
+                metrics.points_out = point_count(pcd)
+        if self.outlier_removal is not None:
+            with profiler.stage(
+                "remove_outliers", points_in=point_count(pcd)
+            ) as metrics:
+                pcd, self.neighbor_graph = self.remove_outliers(
+                    pcd, neighbor_graph=self.neighbor_graph
+                )
+                metrics.points_out = point_count(pcd)
+        with profiler.stage("normals", points_in=point_count(pcd)) as metrics:
+            pcd = self.estimate_normals(pcd, neighbor_graph=self.neighbor_graph)
+            metrics.points_out = point_count(pcd)
+
+        logger.info(f"Processed point cloud with {point_count(pcd)} points.")
         return pcd
 
     def downsample(
         self,
-        pcd: o3d.geometry.PointCloud,
+        pcd: PointCloud,
         voxel_size: float = None,
-    ) -> o3d.geometry.PointCloud:
+    ) -> PointCloud:
         """
         Downsample the point cloud using voxel downsampling.
 
+        In `float32` mode, and for tensor point clouds, the result is a tensor point
+        cloud with float32 storage.
+
         Args:
-            pcd (o3d.geometry.PointCloud): Input point cloud to downsample.
+            pcd (PointCloud): Input point cloud to downsample.
             voxel_size (float | None): Override the voxel size for downsampling. If
-                None, uses the instance's `voxel_size`.
+                None, uses the size chosen by `select_voxel_size` if a target point
+                count or memory budget is set, or the instance's `voxel_size`.
 
         Returns:
-            down_pcd (o3d.geometry.PointCloud): The downsampled point cloud.
+            down_pcd (PointCloud): The downsampled point cloud.
 
         Raises:
             ValueError: If voxel size is not positive.
         """
+        if voxel_size is None:
+            voxel_size = (
+                self.select_voxel_size(pcd) if self.has_target() else self.voxel_size
+            )
+        if voxel_size <= 0:
+            raise ValueError(f"voxel_size must be positive, got {voxel_size}")
+
+        if self.float32 or is_tensor(pcd):
+            down_pcd = self._downsample_float32(pcd, voxel_size)
+        else:
+            down_pcd = pcd.voxel_down_sample(voxel_size)
+        self.selected_voxel_size = voxel_size
+        logger.debug(
+            f"Downsampled point cloud from {point_count(pcd)} "
+            f"to {point_count(down_pcd)} points."
+        )
+
+        return down_pcd
+
+    def select_voxel_size(self, pcd: PointCloud) -> float:
+        """
+        Choose the voxel size at which downsampling keeps about `target_points`
+        points, or fits the preprocessed point cloud into `memory_budget` bytes.
+
+        The size is estimated from one octree pass over the points, refined with a
+        few voxel counts, instead of downsampling repeatedly (see
+        `voxel_size_for_target`).
+
+        Args:
+            pcd (PointCloud): Input point cloud to downsample.
+
+        Returns:
+            float: The chosen voxel size.
+
+        Raises:
+            ValueError: If neither a target point count nor a memory budget is set,
+                if they are not positive, or if the point cloud is empty.
+        """
+        targets = []
+        if self.target_points is not None:
+            targets.append(self.target_points)
+        if self.memory_budget is not None:
+            if self.memory_budget <= 0:
+                raise ValueError(
+                    f"memory_budget must be positive, got {self.memory_budget}"
+                )
+            # Downsampled points keep their coordinates and colours and gain normals.
+            itemsize = 4 if self.float32 or is_tensor(pcd) else 8
+            bytes_per_point = itemsize * 3 * (3 if has_array(pcd, "colors") else 2)
+            targets.append(max(self.memory_budget // bytes_per_point, 1))
+        if not targets:
+            raise ValueError("Either target_points or memory_budget must be set")
+
+        target_points = min(targets)
+        voxel_size = voxel_size_for_target(get_array(pcd), target_points)
+        logger.info(
+            f"Selected voxel size {voxel_size:.6g} for a target of {target_points} "
+            f"points."
+        )
+
+        return voxel_size
+
+    def has_target(self) -> bool:
+        """
+        Check whether the voxel size is chosen per cloud, from `target_points` or
+        `memory_budget`, rather than fixed.
+
+        Returns:
+            bool: True if a target point count or memory budget is set.
+        """
+        return self.target_points is not None or self.memory_budget is not None
+
+    def effective_outlier_radius(self) -> float:
+        """
+        Get the search radius of the radius outlier test, which falls back to
+        `normal_radius` when `outlier_radius` is not set.
+
+        Returns:
+            float: Search radius of the radius outlier test.
+        """
+        return (
+            self.normal_radius if self.outlier_radius is None else self.outlier_radius
+        )
+
+    def _downsample_float32(self, pcd: PointCloud, voxel_size: float) -> PointCloud:
+        """
+        Downsample a point cloud into a tensor point cloud with float32 storage.
+
+        Open3D's tensor `voxel_down_sample` uses a different voxel grid than the
+        legacy one, so the points are voxelised with a `VoxelAccumulator` anchored
+        like the legacy grid instead, in chunks to bound its float64 temporaries.
+        The result matches legacy downsampling up to float32 precision and the
+        order of the points.
+
+        Args:
+            pcd (PointCloud): Input point cloud.
+            voxel_size (float): Voxel size for downsampling.
+
+        Returns:
+            o3d.t.geometry.PointCloud: The downsampled point cloud.
+        """
+        points = get_array(pcd)
+        if len(points) == 0:
+            return make_pointcloud(points, float32=True)
+
+        attributes = {name: get_array(pcd, name) for name in ("normals", "colors")}
+        accumulator = VoxelAccumulator(voxel_size, points.min(axis=0))
+        for start in range(0, len(points), _DOWNSAMPLE_CHUNK_SIZE):
+            chunk = slice(start, start + _DOWNSAMPLE_CHUNK_SIZE)
+            accumulator.add(
+                points[chunk],
+                **{
+                    name: None if values is None else values[chunk]
+                    for name, values in attributes.items()
+                },
+            )
+
+        return accumulator.to_pointcloud(float32=True)
+
+    def remove_outliers(
+        self,
+        pcd: PointCloud,
+        neighbor_graph: NeighborGraph | None = None,
+    ) -> tuple[PointCloud, NeighborGraph | None]:
+        """
+        Remove the outliers found by `outlier_mask` and record their number in
+        `n_outliers`.
+
+        Args:
+            pcd (PointCloud): Input point cloud.
+            neighbor_graph (NeighborGraph | None): Prebuilt neighbour graph of the
+                point cloud, see `outlier_mask`. Defaults to None.
+
+        Returns:
+            tuple[PointCloud, NeighborGraph | None]: A tuple containing:
+                - pcd (PointCloud): The point cloud without outliers.
+                - neighbor_graph (NeighborGraph | None): The neighbour graph of the
+                  remaining points, or None if no graph was given.
+        """
+        keep = self.outlier_mask(pcd, neighbor_graph=neighbor_graph)
+        self.n_outliers = int(len(keep) - keep.sum())
+        logger.info(
+            f"Removed {self.n_outliers} of {len(keep)} points as "
+            f"{self.outlier_removal} outliers."
+        )
+        if keep.all():
+            return pcd, neighbor_graph
+
+        if is_tensor(pcd):
+            pcd = pcd.select_by_mask(o3d.core.Tensor(keep))
+        else:
+            pcd = pcd.select_by_index(np.flatnonzero(keep))
+        if neighbor_graph is not None:
+            neighbor_graph = neighbor_graph.subset(keep)
+
+        return pcd, neighbor_graph
+
+    def outlier_mask(
+        self,
+        pcd: PointCloud,
+        neighbor_graph: NeighborGraph | None = None,
+    ) -> np.ndarray:
+        """
+        Find the points to keep according to `outlier_removal`, with the same
+        results as Open3D's `remove_statistical_outlier` and `remove_radius_outlier`.
+
+        Without a neighbour graph, Open3D's multi-threaded implementations are used.
+        With a graph, the neighbour counts or nearest-neighbour distances are read
+        from it instead of searching the point cloud again; only points with fewer
+        than `outlier_nb_neighbors` neighbours in the graph are searched for the
+        statistical test.
+
+        Args:
+            pcd (PointCloud): Input point cloud.
+            neighbor_graph (NeighborGraph | None): Prebuilt neighbour graph of the
+                point cloud, with a radius of at least `outlier_radius` for radius
+                outlier removal. Defaults to None.
+
+        Returns:
+            np.ndarray: (N,) boolean mask of the points to keep.
+
+        Raises:
+            ValueError: If outlier removal is disabled, or if the neighbour graph
+                does not match the point cloud or has a smaller radius.
+        """
+        if self.outlier_removal is None:
+            raise ValueError("outlier_removal is not set")
+        n_points = point_count(pcd)
+        if neighbor_graph is not None and neighbor_graph.n_points != n_points:
+            raise ValueError(
+                f"Neighbour graph has {neighbor_graph.n_points} points, but the "
+                f"point cloud has {n_points}"
+            )
+        keep = np.zeros(n_points, dtype=bool)
+        if n_points == 0:
+            return keep
+
+        if neighbor_graph is None and is_tensor(pcd):
+            return self._tensor_outlier_mask(pcd)
+        if neighbor_graph is None:
+            if self.outlier_removal == "radius":
+                _, indices = pcd.remove_radius_outlier(
+                    self.outlier_nb_points, self.effective_outlier_radius()
+                )
+            else:
+                _, indices = pcd.remove_statistical_outlier(
+                    self.outlier_nb_neighbors, self.outlier_std_ratio
+                )
+            keep[indices] = True
+            return keep
+
+        if self.outlier_removal == "radius":
+            counts = neighbor_graph.restrict(self.effective_outlier_radius()).counts()
+            # The counts include the point itself.
+            return counts - 1 >= self.outlier_nb_points
+
+        points = get_array(pcd)
+        mean_distances = _knn_mean_distances(
+            points, neighbor_graph, self.outlier_nb_neighbors
+        )
+        # As in Open3D, points whose neighbours all coincide with them are dropped.
+        valid = mean_distances > 0
+        if valid.sum() < 2:
+            return valid
+        threshold = mean_distances[valid].mean()
+        threshold += self.outlier_std_ratio * mean_distances[valid].std(ddof=1)
+
+        return valid & (mean_distances < threshold)
+
+    def _tensor_outlier_mask(self, pcd: o3d.t.geometry.PointCloud) -> np.ndarray:
+        """
+        Find the points to keep with Open3D's tensor outlier removal, whose radius
+        test counts the point itself, unlike the legacy one.
+        """
+        if self.outlier_removal == "radius":
+            _, keep = pcd.remove_radius_outliers(
+                self.outlier_nb_points + 1, self.effective_outlier_radius()
+            )
+        else:
+            _, keep = pcd.remove_statistical_outliers(
+                self.outlier_nb_neighbors, self.outlier_std_ratio
+            )
+
+        return keep.numpy()
+
+    def downsample_chunks(
+        self,
+        chunks: Iterable[np.ndarray],
+        min_bound: np.ndarray,
+        voxel_size: float = None,
+    ) -> PointCloud:
+        """
+        Voxel-downsample a point cloud streamed in chunks, keeping only running
+        per-voxel sums in memory. The result matches `downsample` on the full cloud
+        when `min_bound` is the cloud's minimum bound.
+
+        Args:
+            chunks (Iterable[np.ndarray]): Chunks of (M, 3) point coordinates.
+            min_bound (np.ndarray): Minimum bound of the whole point cloud, which
+                anchors the voxel grid.
+            voxel_size (float | None): Override the voxel size for downsampling. If
+                None, uses the instance's `voxel_size`.
+
+        Returns:
+            down_pcd (PointCloud): The downsampled point cloud.
+
+        Raises:
+            ValueError: If voxel size is not positive, or if no voxel size is given
+                while a target point count or memory budget is set, since choosing
+                one needs the whole point cloud.
+        """
+        if voxel_size is None and self.has_target():
+            raise ValueError(
+                "target_points and memory_budget need the whole point cloud and are "
+                "not supported when streaming chunks"
+            )
         voxel_size = self.voxel_size if voxel_size is None else voxel_size
         if voxel_size <= 0:
             raise ValueError(f"voxel_size must be positive, got {voxel_size}")
 
-        down_pcd = pcd.voxel_down_sample(voxel_size)
+        accumulator = VoxelAccumulator(voxel_size, min_bound)
+        for chunk in chunks:
+            accumulator.add(chunk)
+
+        down_pcd = accumulator.to_pointcloud(float32=self.float32)
+        self.selected_voxel_size = voxel_size
         logger.debug(
-            f"Downsampled point cloud from {len(pcd.points)} "
-            f"to {len(down_pcd.points)} points."
+            f"Downsampled streamed point cloud from {accumulator.n_points} "
+            f"to {point_count(down_pcd)} points."
         )
 
         return down_pcd
 
     def estimate_normals(
         self,
-        pcd: o3d.geometry.PointCloud,
+        pcd: PointCloud,
         radius: float = None,
         max_nn: int = None,
-    ) -> o3d.geometry.PointCloud:
+        neighbor_graph: NeighborGraph | None = None,
+    ) -> PointCloud:
         """
         Estimate surface normals for the point cloud.
 
+        If a neighbour graph is given, the normals are computed from it. Otherwise,
+        if `normal_tile_size` is set, they are estimated tile by tile (see
+        `_estimate_normals_tiled`), and else with one Open3D call for the whole
+        cloud.
+
         Args:
-            pcd (o3d.geometry.PointCloud): Input point cloud for normal estimation.
+            pcd (PointCloud): Input point cloud for normal estimation.
             radius (float | None): Search radius for neighbors. If None, uses the
                 instance's `normal_radius`.
             max_nn (int | None): Maximum number of nearest neighbors for normal
                 estimation. If None, uses the instance's `normal_max_nn`.
+            neighbor_graph (NeighborGraph | None): Prebuilt neighbour graph of the
+                point cloud with a radius of at least `radius`. If given, normals are
+                computed from it instead of searching a KD-tree. Defaults to None.
 
         Returns:
-            o3d.geometry.PointCloud: The point cloud with estimated normals.
+            PointCloud: The point cloud with estimated normals.
 
         Raises:
-            ValueError: If radius or max_nn is not positive.
+            ValueError: If radius or max_nn is not positive, or if the neighbour
+                graph does not match the point cloud or has a smaller radius.
         """
         radius = self.normal_radius if radius is None else radius
         max_nn = self.normal_max_nn if max_nn is None else max_nn
@@ -105,6 +627,23 @@ class PointCloudPreprocessor:
         if max_nn <= 0:
             raise ValueError(f"max_nn must be positive, got {max_nn}")
 
+        if neighbor_graph is not None:
+            if neighbor_graph.n_points != point_count(pcd):
+                raise ValueError(
+                    f"Neighbour graph has {neighbor_graph.n_points} points, but the "
+                    f"point cloud has {point_count(pcd)}"
+                )
+            return self._estimate_normals_from_graph(
+                pcd, neighbor_graph.restrict(radius, max_nn)
+            )
+
+        if self.normal_tile_size is not None:
+            return self._estimate_normals_tiled(pcd, radius, max_nn)
+        if is_tensor(pcd):
+            if point_count(pcd):
+                pcd.estimate_normals(max_nn=max_nn, radius=radius)
+            return pcd
+
         pcd.estimate_normals(
             search_param=o3d.geometry.KDTreeSearchParamHybrid(
                 radius=radius,
@@ -113,3 +652,409 @@ class PointCloudPreprocessor:
         )
 
         return pcd
+
+    def estimate_normals_at(
+        self,
+        points: np.ndarray,
+        indices: np.ndarray,
+        radius: float = None,
+        max_nn: int = None,
+    ) -> np.ndarray:
+        """
+        Estimate the surface normals of a subset of points from their neighbours
+        among all points, e.g. to update the normals around a local change.
+
+        Only the neighbourhood of the subset is searched, so the cost grows with the
+        size of the subset rather than with the number of points. The normals match
+        those estimated for the whole point cloud, up to their sign.
+
+        Args:
+            points (np.ndarray): (N, 3) array of all points.
+            indices (np.ndarray): Indices of the points whose normals are estimated.
+            radius (float | None): Search radius for neighbors. If None, uses the
+                instance's `normal_radius`.
+            max_nn (int | None): Maximum number of nearest neighbors for normal
+                estimation. If None, uses the instance's `normal_max_nn`.
+
+        Returns:
+            np.ndarray: (len(indices), 3) array of unit normals.
+        """
+        radius = self.normal_radius if radius is None else radius
+        max_nn = self.normal_max_nn if max_nn is None else max_nn
+        if len(indices) == 0:
+            return np.zeros((0, 3))
+
+        queries = points[indices]
+        local = np.flatnonzero(within_radius(points, queries, radius))
+        offsets, neighbors, sq_distances = radius_search(
+            points[local], queries, radius, sort=True
+        )
+        graph = NeighborGraph(offsets, local[neighbors], sq_distances, radius)
+
+        return _graph_normals(points, graph.restrict(radius, max_nn), indices)
+
+    def _estimate_normals_tiled(
+        self,
+        pcd: PointCloud,
+        radius: float,
+        max_nn: int,
+    ) -> PointCloud:
+        """
+        Estimate normals tile by tile and write them back in the original point
+        order.
+
+        Each tile is extended by a halo of width `radius`, so the neighbourhood of
+        every point owned by a tile lies entirely inside the extended tile, and
+        Open3D's normal estimation runs on one extended tile at a time. The normals
+        of owned points are therefore identical to those of one global call, while
+        only the search structures of a few tiles exist at a time.
+
+        Args:
+            pcd (PointCloud): Input point cloud.
+            radius (float): Search radius for neighbors.
+            max_nn (int): Maximum number of nearest neighbors.
+
+        Returns:
+            PointCloud: The point cloud with estimated normals.
+
+        Raises:
+            ValueError: If `normal_tile_size` is not positive.
+        """
+        points = get_array(pcd)
+        existing = get_array(pcd, "normals")
+        tiles = (
+            (
+                owned,
+                (
+                    points[extended],
+                    None if existing is None else existing[extended],
+                    np.searchsorted(extended, owned),
+                    radius,
+                    max_nn,
+                ),
+            )
+            for owned, extended in iter_tiles(points, self.normal_tile_size, radius)
+        )
+
+        normals = np.zeros((len(points), 3))
+        n_tiles = 0
+        for owned, tile_normals in self._map_tiles(tiles):
+            normals[owned] = tile_normals
+            n_tiles += 1
+        logger.debug(f"Estimated normals of {len(points)} points in {n_tiles} tiles.")
+        set_array(pcd, "normals", normals)
+
+        return pcd
+
+    def _map_tiles(
+        self,
+        tiles: Iterable[tuple[np.ndarray, tuple]],
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """
+        Estimate the normals of tiles on a process pool, yielding results in tile
+        order. At most `2 * n_jobs` tiles are in flight. With a single job, tiles
+        are processed in the calling process, since starting a worker costs more
+        than it saves.
+
+        Args:
+            tiles (Iterable[tuple[np.ndarray, tuple]]): Indices of the points owned
+                by each tile, and the arguments of `_tile_normals` for it.
+
+        Yields:
+            tuple[np.ndarray, np.ndarray]: The owned point indices and their normals.
+        """
+        if self.n_jobs == 1:
+            for owned, args in tiles:
+                yield owned, _tile_normals(*args)
+            return
+
+        # Open3D's thread pools are not safe to fork, so workers are spawned.
+        with ProcessPoolExecutor(
+            max_workers=self.n_jobs, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            pending = deque()
+            for owned, args in tiles:
+                pending.append((owned, executor.submit(_tile_normals, *args)))
+                if len(pending) >= 2 * self.n_jobs:
+                    owned, future = pending.popleft()
+                    yield owned, future.result()
+            while pending:
+                owned, future = pending.popleft()
+                yield owned, future.result()
+
+    def _estimate_normals_from_graph(
+        self,
+        pcd: PointCloud,
+        graph: NeighborGraph,
+    ) -> PointCloud:
+        """
+        Estimate normals from a neighbour graph of the whole point cloud with
+        `_graph_normals`.
+
+        Args:
+            pcd (PointCloud): Input point cloud.
+            graph (NeighborGraph): Neighbour graph restricted to the normal radius
+                and maximum number of neighbours.
+
+        Returns:
+            PointCloud: The point cloud with estimated normals.
+        """
+        points = get_array(pcd)
+        if len(points) == 0:
+            return pcd
+
+        normals = _graph_normals(points, graph)
+        if has_array(pcd, "normals"):
+            # Keep the orientation of existing normals, as Open3D does.
+            flip = np.einsum("ij,ij->i", normals, get_array(pcd, "normals")) < 0
+            normals[flip] *= -1
+        set_array(pcd, "normals", normals)
+
+        return pcd
+
+
+def _tile_normals(
+    points: np.ndarray,
+    normals: np.ndarray | None,
+    owned: np.ndarray,
+    radius: float,
+    max_nn: int,
+) -> np.ndarray:
+    """
+    Estimate the normals of an extended tile with Open3D. Runs in a worker process.
+
+    Args:
+        points (np.ndarray): (M, 3) points of the extended tile.
+        normals (np.ndarray | None): Existing (M, 3) normals, whose orientation is
+            kept as Open3D does, or None.
+        owned (np.ndarray): Positions of the points owned by the tile.
+        radius (float): Search radius for neighbors.
+        max_nn (int): Maximum number of nearest neighbors.
+
+    Returns:
+        np.ndarray: (len(owned), 3) normals of the owned points.
+    """
+    pcd = make_pointcloud(points, normals=normals)
+    pcd.estimate_normals(
+        search_param=o3d.geometry.KDTreeSearchParamHybrid(radius=radius, max_nn=max_nn)
+    )
+
+    return np.asarray(pcd.normals)[owned]
+
+
+def _knn_mean_distances(
+    points: np.ndarray,
+    graph: NeighborGraph,
+    k: int,
+) -> np.ndarray:
+    """
+    Compute the mean distance of every point to its `k` nearest neighbours,
+    including itself. The neighbours are read from the graph where it holds at
+    least `k` of them, and searched for the remaining points.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points.
+        graph (NeighborGraph): Neighbour graph of the points.
+        k (int): Number of neighbours, capped at the number of points.
+
+    Returns:
+        np.ndarray: (N,) mean neighbour distances.
+    """
+    k = min(k, len(points))
+    graph = graph.restrict(graph.radius, k)
+    # Every row holds at least the point itself, so no row is empty.
+    sums = np.add.reduceat(np.sqrt(graph.sq_distances), graph.offsets[:-1])
+    short = np.flatnonzero(graph.counts() < k)
+    if len(short):
+        _, sq_distances = knn_search(points, points[short], k)
+        sums[short] = np.sqrt(sq_distances).sum(axis=1)
+
+    return sums / k
+
+
+def _graph_normals(
+    points: np.ndarray,
+    graph: NeighborGraph,
+    queries: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Estimate normals as the eigenvector of the smallest eigenvalue of each
+    neighbourhood's covariance, as Open3D does. The covariances of all query points
+    are accumulated with one reduction per coordinate product over the graph's rows
+    and solved in closed form for all of them at once.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points, indexed by the graph.
+        graph (NeighborGraph): Neighbour graph with one row per query point,
+            restricted to the normal radius and maximum number of neighbours.
+        queries (np.ndarray | None): Index of the point of every row of the graph.
+            Defaults to None, which means every point has its own row.
+
+    Returns:
+        np.ndarray: (M, 3) array of unit normals, one per row of the graph.
+    """
+    counts = graph.counts()
+    starts = graph.offsets[:-1]
+    centres = points if queries is None else points[queries]
+    # Centre each neighbourhood on its query point for numerical stability.
+    deltas = [
+        coords[graph.indices] - np.repeat(centre, counts)
+        for coords, centre in zip(
+            np.ascontiguousarray(points.T), centres.T, strict=True
+        )
+    ]
+    means = np.stack(
+        [np.add.reduceat(delta, starts) / counts for delta in deltas], axis=1
+    )
+    covariances = np.empty((len(counts), 3, 3))
+    for i in range(3):
+        for j in range(i, 3):
+            moment = np.add.reduceat(deltas[i] * deltas[j], starts) / counts
+            covariances[:, i, j] = moment - means[:, i] * means[:, j]
+            covariances[:, j, i] = covariances[:, i, j]
+
+    normals = _smallest_eigenvectors(covariances)
+    # Open3D falls back to +z for neighbourhoods too small to define a plane.
+    normals[counts < 3] = (0.0, 0.0, 1.0)
+
+    return normals
+
+
+def _smallest_eigenvectors(matrices: np.ndarray) -> np.ndarray:
+    """
+    Compute the unit eigenvector of the smallest eigenvalue of many symmetric 3x3
+    matrices, with the same sign as Open3D's normal estimation.
+
+    The eigenvalues are found with the trigonometric solution of the
+    characteristic polynomial. As in Open3D, the eigenvector of the eigenvalue
+    furthest from the other two is computed first, as the largest cross product of
+    two rows of `A - lambda * I`. If that is the largest eigenvalue, the smallest
+    one's eigenvector is derived from it, which decides its sign. This is about
+    twice as fast as `np.linalg.eigh` on large batches. Matrices whose remaining
+    eigenvector is not unique fall back to `np.linalg.eigh`.
+
+    Args:
+        matrices (np.ndarray): (N, 3, 3) array of symmetric matrices.
+
+    Returns:
+        np.ndarray: (N, 3) array of unit eigenvectors.
+    """
+    a00, a01, a02 = matrices[:, 0, 0], matrices[:, 0, 1], matrices[:, 0, 2]
+    a11, a12, a22 = matrices[:, 1, 1], matrices[:, 1, 2], matrices[:, 2, 2]
+    mean = (a00 + a11 + a22) / 3
+    b00, b11, b22 = a00 - mean, a11 - mean, a22 - mean
+    p = np.sqrt((b00**2 + b11**2 + b22**2 + 2 * (a01**2 + a02**2 + a12**2)) / 6)
+    det = (
+        b00 * (b11 * b22 - a12**2)
+        - a01 * (a01 * b22 - a12 * a02)
+        + a02 * (a01 * a12 - b11 * a02)
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.clip(np.nan_to_num(det / (2 * p**3)), -1, 1)
+    angle = np.arccos(ratio) / 3
+    smallest = mean + 2 * p * np.cos(angle + 2 * np.pi / 3)
+    largest = mean + 2 * p * np.cos(angle)
+
+    # A non-negative determinant puts the middle eigenvalue closer to the smallest.
+    via_largest = ratio >= 0
+    vectors, norms = _row_cross_eigenvectors(
+        matrices, np.where(via_largest, largest, smallest)
+    )
+    scale = np.abs(matrices).reshape(-1, 9).max(axis=1)
+    degenerate = ~(norms > 1e-6 * scale**2)
+    vectors[~degenerate] /= norms[~degenerate, None]
+
+    derived = via_largest & ~degenerate
+    if derived.any():
+        middle = 3 * mean[derived] - smallest[derived] - largest[derived]
+        vectors[derived] = _smallest_from_largest(
+            matrices[derived], vectors[derived], middle
+        )
+    if degenerate.any():
+        vectors[degenerate] = np.linalg.eigh(matrices[degenerate])[1][:, :, 0]
+
+    return vectors
+
+
+def _row_cross_eigenvectors(
+    matrices: np.ndarray,
+    eigenvalues: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute an eigenvector of each matrix as the largest cross product of two rows
+    of `A - lambda * I`.
+
+    Args:
+        matrices (np.ndarray): (N, 3, 3) array of symmetric matrices.
+        eigenvalues (np.ndarray): (N,) eigenvalue of each matrix.
+
+    Returns:
+        tuple: A tuple containing:
+            - vectors (np.ndarray): (N, 3) eigenvectors, not normalised.
+            - norms (np.ndarray): (N,) norms of the eigenvectors.
+    """
+    shifted = matrices - eigenvalues[:, None, None] * np.eye(3)
+    crosses = np.stack(
+        [
+            np.cross(shifted[:, 0], shifted[:, 1]),
+            np.cross(shifted[:, 0], shifted[:, 2]),
+            np.cross(shifted[:, 1], shifted[:, 2]),
+        ],
+        axis=1,
+    )
+    sq_norms = np.einsum("nki,nki->nk", crosses, crosses)
+    best = sq_norms.argmax(axis=1)
+    rows = np.arange(len(matrices))
+
+    return crosses[rows, best], np.sqrt(sq_norms[rows, best])
+
+
+def _smallest_from_largest(
+    matrices: np.ndarray,
+    vectors: np.ndarray,
+    middle: np.ndarray,
+) -> np.ndarray:
+    """
+    Compute the unit eigenvector of the smallest eigenvalue of each matrix from
+    the eigenvector of its largest one, as Open3D does: the middle eigenvector is
+    solved for in the plane orthogonal to the largest one, and the smallest is
+    their cross product. The plane's basis and therefore the sign follow Open3D.
+
+    Args:
+        matrices (np.ndarray): (N, 3, 3) array of symmetric matrices.
+        vectors (np.ndarray): (N, 3) unit eigenvectors of the largest eigenvalues.
+        middle (np.ndarray): (N,) middle eigenvalues.
+
+    Returns:
+        np.ndarray: (N, 3) array of unit eigenvectors.
+    """
+    x, y, z = vectors.T
+    # The basis (u, v) of the plane, with u = (-z, 0, x) or (0, z, -y) normalised
+    # and v = vectors x u.
+    along_x = np.abs(x) > np.abs(y)
+    norms = np.where(along_x, np.hypot(x, z), np.hypot(y, z))
+    u = (
+        np.where(along_x, -z, 0) / norms,
+        np.where(along_x, 0, z) / norms,
+        np.where(along_x, x, -y) / norms,
+    )
+    v = (y * u[2] - z * u[1], z * u[0] - x * u[2], x * u[1] - y * u[0])
+
+    def form(a: tuple, b: tuple) -> np.ndarray:
+        return sum(matrices[:, i, j] * a[i] * b[j] for i in range(3) for j in range(3))
+
+    m00, m01, m11 = form(u, u) - middle, form(u, v), form(v, v) - middle
+    # The middle eigenvector is the null vector alpha * u + beta * v of the larger
+    # row of the 2x2 problem, and vectors x (alpha * u + beta * v) is
+    # alpha * v - beta * u.
+    first_row = np.abs(m00) >= np.abs(m11)
+    diagonal = np.where(first_row, m00, m11)
+    alpha = np.where(first_row, m01, diagonal)
+    beta = -np.where(first_row, diagonal, m01)
+    lengths = np.hypot(alpha, beta)
+    # Open3D keeps u as the middle eigenvector when the problem is all zero.
+    solved = lengths > 0
+    alpha = np.where(solved, alpha / np.where(solved, lengths, 1), 1)
+    beta = np.where(solved, beta / np.where(solved, lengths, 1), 0)
+
+    return np.stack([alpha * v[k] - beta * u[k] for k in range(3)], axis=1)
@@ -0,0 +1,480 @@
+import logging
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+import open3d as o3d
+
+from src.open3d_pc.config import to_dict
+from src.open3d_pc.geometry import PointCloud, get_array
+from src.open3d_pc.neighbor_graph import NeighborGraph
+from src.open3d_pc.pipeline_profiler import PipelineProfiler, ProfilerHook
+from src.open3d_pc.point_cloud_clusterer import PointCloudClusterer
+from src.open3d_pc.point_cloud_preprocessor import PointCloudPreprocessor
+from src.open3d_pc.spatial import within_radius
+
+if TYPE_CHECKING:
+    from omegaconf import DictConfig
+
+logger = logging.getLogger(__name__)
+
+# Bits per axis of the packed voxel keys, which are signed around the grid origin.
+_KEY_BITS = 21
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+
+
+@dataclass
+class FrameStats:
+    """
+    Amount of work done for one frame of a sequence.
+
+    Attributes:
+        n_points (int): Number of points in the raw frame.
+        n_voxels (int): Number of points after downsampling.
+        n_changed (int): Number of voxels added or moved since the previous frame.
+        n_removed (int): Number of voxels of the previous frame removed or moved.
+        n_normals (int): Number of points whose normals were recomputed.
+        n_reclustered (int): Number of points whose labels were recomputed.
+        n_clusters (int): Number of clusters in the frame.
+    """
+
+    n_points: int = 0
+    n_voxels: int = 0
+    n_changed: int = 0
+    n_removed: int = 0
+    n_normals: int = 0
+    n_reclustered: int = 0
+    n_clusters: int = 0
+
+
+class PointCloudSequenceProcessor:
+    """
+    Processes a sequence of overlapping frames, such as registered LiDAR sweeps,
+    reusing the results of the previous frame wherever the frame did not change.
+
+    Frames are downsampled on a voxel grid with a fixed origin, so the voxels of
+    consecutive frames can be matched by their grid index. A voxel whose centroid
+    moved by at most `change_tolerance` keeps its previous centroid, and with it its
+    previous normal and label, unless a changed voxel lies close enough to affect
+    them:
+
+    - Normals are recomputed for the points within `normal_radius` of a change.
+    - DBSCAN is rerun on the points within `2 * eps` of a change and on every
+      cluster containing such a point, using an `eps`-wide halo for the neighbour
+      counts. Core points outside this region cannot change status or connect to a
+      core point inside it, so every other cluster keeps its labels.
+
+    The cost of a frame therefore grows with the size of the changed region and of
+    the clusters touching it, plus a linear pass to voxelise and match the raw points.
+
+    Cluster IDs are stable across frames: every reclustered cluster takes the ID of
+    the previous cluster it overlaps most, and new clusters get IDs that were never
+    used before. Labels are therefore not consecutive; noise is -1.
+
+    Attributes:
+        preprocessor (PointCloudPreprocessor): Provides the voxel size and the normal
+            estimation parameters. Target point count and memory budget modes are
+            not used, since the grid must stay fixed across frames.
+        clusterer (PointCloudClusterer): Provides the DBSCAN parameters.
+        change_tolerance (float): Maximum movement of a voxel's centroid for the
+            voxel to count as unchanged. Defaults to a quarter of the voxel size.
+        rebuild_fraction (float): Fraction of normals affected by changes above
+            which a frame is processed from scratch, from one neighbour graph shared
+            by normal estimation and clustering, since searching around every change
+            would cost more. Cluster IDs are still matched. Defaults to 0.5.
+        profiler_hooks (list[ProfilerHook]): Hooks receiving the metrics of every
+            stage.
+        stats (FrameStats | None): Work done for the latest frame.
+        report (dict | None): Stage metrics of the latest frame.
+    """
+
+    def __init__(
+        self,
+        preprocessor: PointCloudPreprocessor | None = None,
+        clusterer: PointCloudClusterer | None = None,
+        change_tolerance: float | None = None,
+        rebuild_fraction: float = 0.5,
+        profiler_hooks: list[ProfilerHook] | None = None,
+    ):
+        self.preprocessor = preprocessor or PointCloudPreprocessor()
+        self.clusterer = clusterer or PointCloudClusterer()
+        if change_tolerance is None:
+            change_tolerance = self.preprocessor.voxel_size / 4
+        self.change_tolerance = change_tolerance
+        self.rebuild_fraction = rebuild_fraction
+        self.profiler_hooks = profiler_hooks or []
+        self.stats = None
+        self.report = None
+        self.reset()
+
+    @classmethod
+    def from_config(cls, cfg: "DictConfig | dict") -> "PointCloudSequenceProcessor":
+        """
+        Alternative constructor to create a PointCloudSequenceProcessor from a
+        DictConfig or a nested config dictionary.
+
+        Args:
+            cfg (DictConfig | dict): Full pipeline configuration, using the
+                "preprocessor", "clusterer" and optionally "sequence" sections.
+
+        Returns:
+            PointCloudSequenceProcessor: Instance configured from the sections.
+        """
+        cfg = to_dict(cfg)
+
+        clusterer_cfg = dict(cfg.get("clusterer") or {})
+        # Frames are always reclustered with DBSCAN on their neighbour graph.
+        clusterer_cfg.pop("tile_size", None)
+        clusterer_cfg.pop("backend", None)
+        sequence_cfg = cfg.get("sequence") or {}
+        return cls(
+            preprocessor=PointCloudPreprocessor(**(cfg.get("preprocessor") or {})),
+            clusterer=PointCloudClusterer(**clusterer_cfg),
+            change_tolerance=sequence_cfg.get("change_tolerance"),
+            rebuild_fraction=sequence_cfg.get("rebuild_fraction", 0.5),
+        )
+
+    def reset(self) -> None:
+        """
+        Forget the previous frame, so the next frame is processed from scratch.
+        """
+        self._keys = None
+        self._points = None
+        self._normals = None
+        self._labels = None
+        self._next_id = 0
+
+    def run(
+        self,
+        frames: Iterable[np.ndarray | o3d.geometry.PointCloud],
+    ) -> Iterator[tuple[o3d.geometry.PointCloud, np.ndarray]]:
+        """
+        Process every frame of a sequence in turn.
+
+        Args:
+            frames (Iterable[np.ndarray | o3d.geometry.PointCloud]): Frames as (N, 3)
+                arrays or point clouds, in a common coordinate frame.
+
+        Yields:
+            tuple[o3d.geometry.PointCloud, np.ndarray]: The result of `process` for
+                every frame.
+        """
+        for frame in frames:
+            yield self.process(frame)
+
+    def process(
+        self,
+        frame: np.ndarray | PointCloud,
+    ) -> tuple[o3d.geometry.PointCloud, np.ndarray]:
+        """
+        Downsample, estimate normals and cluster the next frame, reusing the results
+        of the previous frame where nothing changed.
+
+        Args:
+            frame (np.ndarray | PointCloud): The frame as an (N, 3) array or a
+                legacy or tensor point cloud, in the same coordinate frame as the
+                previous frames.
+
+        Returns:
+            tuple[o3d.geometry.PointCloud, np.ndarray]: A tuple containing:
+                - pcd (o3d.geometry.PointCloud): The downsampled frame with normals.
+                - labels (np.ndarray): Stable cluster IDs for each point, with -1 for
+                  noise.
+
+        Raises:
+            ValueError: If the frame extends beyond the range of the voxel grid.
+        """
+        if not isinstance(frame, np.ndarray):
+            frame = get_array(frame)
+        stats = FrameStats(n_points=len(frame))
+        profiler = PipelineProfiler(self.profiler_hooks)
+
+        with profiler.stage("voxelize", points_in=len(frame)) as metrics:
+            keys, points = self._voxelize(frame)
+            kept, previous, changes = self._match(keys, points)
+            if kept.any():
+                # Unchanged voxels keep their previous centroid, so that everything
+                # derived from them stays valid.
+                points[kept] = self._points[previous[kept]]
+            metrics.points_out = len(points)
+        stats.n_voxels = len(points)
+        stats.n_changed = int((~kept).sum())
+        stats.n_removed = len(changes) - stats.n_changed
+
+        with profiler.stage("normals", points_in=len(points)) as metrics:
+            dirty = ~kept
+            limit = self.rebuild_fraction * len(points)
+            if kept.any() and dirty.sum() <= limit:
+                radius = self.preprocessor.normal_radius
+                dirty |= within_radius(points, changes, radius)
+            graph = None
+            if not kept.any() or dirty.sum() > limit:
+                # Searching around every change would cost more than starting over.
+                dirty[:] = True
+                graph = NeighborGraph.build(
+                    points, max(self.preprocessor.normal_radius, self.clusterer.eps)
+                )
+            normals = self._update_normals(points, kept, previous, dirty, graph)
+            metrics.points_out = int(dirty.sum())
+        stats.n_normals = int(dirty.sum())
+
+        with profiler.stage("dbscan", points_in=len(points)) as metrics:
+            labels, region = self._update_labels(points, kept, previous, changes, graph)
+            metrics.points_out = int(region.sum())
+        stats.n_reclustered = int(region.sum())
+        stats.n_clusters = int(np.count_nonzero(np.bincount(labels[labels >= 0])))
+
+        self._keys, self._points = keys, points
+        self._normals, self._labels = normals, labels
+        self.stats = stats
+        self.report = profiler.finish()
+        logger.info(
+            f"Processed frame of {stats.n_points} points into {stats.n_voxels} "
+            f"voxels: {stats.n_changed} added or moved, {stats.n_removed} removed or "
+            f"moved, {stats.n_normals} normals and "
+            f"{stats.n_reclustered} labels recomputed, {stats.n_clusters} clusters."
+        )
+
+        pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+        pcd.normals = o3d.utility.Vector3dVector(normals)
+        return pcd, labels
+
+    def _voxelize(self, frame: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Downsample a frame to the centroids of the occupied voxels of the fixed grid.
+
+        Args:
+            frame (np.ndarray): (N, 3) array of raw points.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: A tuple containing:
+                - keys (np.ndarray): Sorted packed index of every occupied voxel.
+                - points (np.ndarray): (M, 3) centroid of every occupied voxel.
+
+        Raises:
+            ValueError: If the frame extends beyond the range of the voxel grid.
+        """
+        if len(frame) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, 3))
+
+        voxel_size = self.preprocessor.voxel_size
+        cells = np.floor(frame / voxel_size).astype(np.int64) + _KEY_OFFSET
+        if cells.min() < 0 or cells.max() >= 1 << _KEY_BITS:
+            raise ValueError(
+                f"Frame extends beyond the voxel grid, whose coordinates must lie "
+                f"within +/-{_KEY_OFFSET * voxel_size} of the origin"
+            )
+        packed = (cells[:, 0] << (2 * _KEY_BITS)) | (cells[:, 1] << _KEY_BITS)
+        packed |= cells[:, 2]
+
+        order = np.argsort(packed)
+        packed = packed[order]
+        starts = np.flatnonzero(np.diff(packed, prepend=-1))
+        counts = np.diff(np.append(starts, len(packed)))
+        sums = np.add.reduceat(frame[order], starts, axis=0)
+
+        return packed[starts], sums / counts[:, None]
+
+    def _match(
+        self,
+        keys: np.ndarray,
+        points: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Match the voxels of a frame with those of the previous frame.
+
+        Args:
+            keys (np.ndarray): Sorted packed index of every voxel of the frame.
+            points (np.ndarray): (M, 3) centroid of every voxel of the frame.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: A tuple containing:
+                - kept (np.ndarray): (M,) mask of the unchanged voxels.
+                - previous (np.ndarray): (M,) index of every unchanged voxel in the
+                  previous frame.
+                - changes (np.ndarray): (K, 3) positions of every change: the new
+                  centroids of added and moved voxels, and the previous centroids of
+                  removed and moved voxels.
+        """
+        kept = np.zeros(len(keys), dtype=bool)
+        if self._keys is None or len(self._keys) == 0 or len(keys) == 0:
+            previous_points = np.zeros((0, 3)) if self._points is None else self._points
+            return (
+                kept,
+                np.zeros(len(keys), dtype=np.int64),
+                np.concatenate([points, previous_points]),
+            )
+
+        previous = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        matched = self._keys[previous] == keys
+        shift = np.linalg.norm(
+            points[matched] - self._points[previous[matched]], axis=1
+        )
+        kept[matched] = shift <= self.change_tolerance
+
+        previous_kept = np.zeros(len(self._keys), dtype=bool)
+        previous_kept[previous[kept]] = True
+        changes = np.concatenate([points[~kept], self._points[~previous_kept]])
+
+        return kept, previous, changes
+
+    def _update_normals(
+        self,
+        points: np.ndarray,
+        kept: np.ndarray,
+        previous: np.ndarray,
+        dirty: np.ndarray,
+        graph: NeighborGraph | None = None,
+    ) -> np.ndarray:
+        """
+        Carry the normals of unchanged neighbourhoods over and recompute the others.
+
+        Args:
+            points (np.ndarray): (M, 3) points of the frame.
+            kept (np.ndarray): (M,) mask of the unchanged voxels.
+            previous (np.ndarray): (M,) index of the unchanged voxels in the previous
+                frame.
+            dirty (np.ndarray): (M,) mask of the normals to recompute, i.e. those
+                within `normal_radius` of a change.
+            graph (NeighborGraph | None): Neighbour graph of all points. If given,
+                every normal is recomputed from it. Defaults to None.
+
+        Returns:
+            np.ndarray: (M, 3) normals of the frame.
+        """
+        normals = np.zeros((len(points), 3))
+        if not dirty.all():
+            normals[~dirty] = self._normals[previous[~dirty]]
+
+        indices = np.flatnonzero(dirty)
+        if graph is not None:
+            pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+            pcd = self.preprocessor.estimate_normals(pcd, neighbor_graph=graph)
+            fresh = np.asarray(pcd.normals)
+        else:
+            fresh = self.preprocessor.estimate_normals_at(points, indices)
+        reused = np.flatnonzero(kept[indices])
+        if len(reused):
+            # Keep the orientation of the previous normals, as Open3D does.
+            old = self._normals[previous[indices[reused]]]
+            fresh[reused[np.einsum("ij,ij->i", fresh[reused], old) < 0]] *= -1
+        normals[indices] = fresh
+
+        return normals
+
+    def _update_labels(
+        self,
+        points: np.ndarray,
+        kept: np.ndarray,
+        previous: np.ndarray,
+        changes: np.ndarray,
+        graph: NeighborGraph | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Carry the labels of clusters away from every change over, and rerun DBSCAN
+        on the points near a change and the clusters containing them.
+
+        Args:
+            points (np.ndarray): (M, 3) points of the frame.
+            kept (np.ndarray): (M,) mask of the unchanged voxels.
+            previous (np.ndarray): (M,) index of the unchanged voxels in the previous
+                frame.
+            changes (np.ndarray): (K, 3) positions of every change.
+            graph (NeighborGraph | None): Neighbour graph of all points. If given,
+                every point is reclustered on it. Defaults to None.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: A tuple containing:
+                - labels (np.ndarray): (M,) stable cluster IDs, with -1 for noise.
+                - region (np.ndarray): (M,) mask of the reclustered points.
+        """
+        eps = self.clusterer.eps
+        carried = np.full(len(points), -1, dtype=np.int64)
+        if kept.any():
+            carried[kept] = self._labels[previous[kept]]
+
+        region = np.ones(len(points), dtype=bool) if graph is not None else ~kept
+        if graph is None:
+            region |= within_radius(points, changes, 2 * eps)
+            previous_kept = np.zeros(len(self._labels), dtype=bool)
+            previous_kept[previous[kept]] = True
+            affected = np.union1d(carried[region], self._labels[~previous_kept])
+            affected = affected[affected >= 0]
+            region |= np.isin(carried, affected)
+
+        labels = carried.copy()
+        if not region.any():
+            return labels, region
+
+        if graph is not None:
+            subset = np.arange(len(points))
+        else:
+            # The halo completes the neighbour counts of the region's points.
+            subset = region | within_radius(points, points[region], eps)
+            subset = np.flatnonzero(subset)
+            graph = NeighborGraph.build(points[subset], eps)
+        graph = graph.restrict(eps)
+        counts = graph.counts()
+        local = self.clusterer._cluster_graph(graph)
+
+        in_region = region[subset]
+        ids = self._match_clusters(local, carried[subset], in_region, counts)
+        labels[subset[in_region]] = ids[local[in_region] + 1]
+
+        return labels, region
+
+    def _match_clusters(
+        self,
+        local: np.ndarray,
+        carried: np.ndarray,
+        in_region: np.ndarray,
+        counts: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Give every reclustered cluster a stable ID.
+
+        A cluster containing a core point of the halo belongs to a cluster outside
+        the region and takes its ID. Every other cluster takes the ID of the previous
+        cluster it overlaps most, where each previous ID goes to the cluster with the
+        largest overlap, and the remaining clusters get new IDs.
+
+        Args:
+            local (np.ndarray): Consecutive labels of the reclustered points and their
+                halo, with -1 for noise.
+            carried (np.ndarray): Previous IDs of the same points, or -1.
+            in_region (np.ndarray): Mask of the reclustered points.
+            counts (np.ndarray): Neighbour counts of the same points.
+
+        Returns:
+            np.ndarray: ID of every local label, shifted by one so that index 0 maps
+                noise to -1.
+        """
+        n_local = int(local.max()) + 1 if len(local) else 0
+        ids = np.full(n_local + 1, -1, dtype=np.int64)
+
+        halo_core = ~in_region & (local >= 0) & (carried >= 0)
+        halo_core &= counts >= self.clusterer.min_points
+        ids[local[halo_core] + 1] = carried[halo_core]
+
+        overlap = in_region & (local >= 0) & (carried >= 0)
+        if overlap.any():
+            pairs, sizes = np.unique(
+                np.stack([local[overlap], carried[overlap]], axis=1),
+                axis=0,
+                return_counts=True,
+            )
+            pairs = pairs[np.argsort(-sizes, kind="stable")]
+            # Each previous ID goes to the cluster overlapping it most, then each
+            # cluster keeps the largest of the IDs it was given. Both steps keep the
+            # pairs in order of decreasing overlap.
+            pairs = pairs[np.sort(np.unique(pairs[:, 1], return_index=True)[1])]
+            pairs = pairs[np.unique(pairs[:, 0], return_index=True)[1]]
+            free = ids[pairs[:, 0] + 1] < 0
+            ids[pairs[free, 0] + 1] = pairs[free, 1]
+
+        new = np.flatnonzero(ids[1:] < 0) + 1
+        ids[new] = self._next_id + np.arange(len(new))
+        self._next_id += len(new)
+
+        return ids
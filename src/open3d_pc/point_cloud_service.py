@@ -0,0 +1,581 @@
+import json
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from src.open3d_pc.config import to_dict
+from src.open3d_pc.point_cloud_batch import (
+    BatchFileResult,
+    _init_worker,
+    _process_file,
+    _process_points,
+)
+
+if TYPE_CHECKING:
+    from multiprocessing.synchronize import Barrier
+
+    from omegaconf import DictConfig
+
+logger = logging.getLogger(__name__)
+
+# Number of latest requests the latency percentiles are computed over.
+_LATENCY_WINDOW = 1000
+
+_BUFFER_DTYPES = {"float32": np.float32, "float64": np.float64}
+
+# Seconds a starting worker waits for the others before the start is given up.
+_WARM_UP_TIMEOUT = 300
+
+
+def _init_service_worker(pipeline_cfg: dict, started: "Barrier") -> None:
+    """
+    Build the worker's pipeline as in batch mode and run it once on a tiny cloud,
+    so that Open3D's voxel grid, KD-tree and DBSCAN code is loaded before the first
+    request. Then wait until every worker of the pool got this far. Interrupts are
+    ignored, so that Ctrl+C only stops the server, which then shuts the workers
+    down.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _init_worker(pipeline_cfg)
+    points = np.random.default_rng(0).uniform(0, 0.01, size=(10, 3))
+    result = _process_points(points, name="<warm-up>")
+    if not result.ok:
+        logger.warning(f"Warm-up run of a worker failed: {result.error}")
+    started.wait(_WARM_UP_TIMEOUT)
+
+
+def _process_batch(items: list[str | np.ndarray]) -> list[BatchFileResult]:
+    """
+    Run the worker's pipeline on a batch of file paths and point arrays, so that the
+    whole batch costs a single round trip to the worker.
+    """
+    return [
+        _process_file(item) if isinstance(item, str) else _process_points(item)
+        for item in items
+    ]
+
+
+def _warm_up() -> None:
+    """
+    No-op task, which makes the pool start a worker. The pipeline is built and run
+    by the pool's initializer.
+    """
+
+
+class ServiceMetrics:
+    """
+    Thread-safe counters and latency window of a PointCloudService.
+
+    Attributes:
+        n_requests (int): Number of requests answered, including failed items.
+        n_items (int): Number of files and point buffers processed.
+        n_failed (int): Number of items that failed to process.
+        n_rejected (int): Number of requests rejected because the queue was full.
+        in_flight (int): Number of items submitted to the workers and not yet
+            answered, i.e. the current queue depth.
+        max_in_flight (int): Highest queue depth seen.
+    """
+
+    def __init__(self):
+        self.n_requests = 0
+        self.n_items = 0
+        self.n_failed = 0
+        self.n_rejected = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._latencies = deque(maxlen=_LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def try_acquire(self, n_items: int, max_queue: int) -> bool:
+        """
+        Reserve queue slots for the items of a request.
+
+        Args:
+            n_items (int): Number of items in the request.
+            max_queue (int): Maximum number of items in flight.
+
+        Returns:
+            bool: True if the slots were reserved, False if the request is rejected.
+        """
+        with self._lock:
+            if self.in_flight + n_items > max_queue:
+                self.n_rejected += 1
+                return False
+            self.in_flight += n_items
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return True
+
+    def release(self, results: list[BatchFileResult], n_items: int, latency: float):
+        """
+        Free the queue slots of an answered request and record its latency.
+
+        Args:
+            results (list[BatchFileResult]): Results of the request's items, empty if
+                the workers failed.
+            n_items (int): Number of items in the request.
+            latency (float): Time from receiving the request to answering it, in
+                seconds.
+        """
+        with self._lock:
+            self.in_flight -= n_items
+            self.n_requests += 1
+            self.n_items += n_items
+            self.n_failed += sum(not result.ok for result in results)
+            self.n_failed += n_items - len(results)
+            self._latencies.append(latency)
+
+    def snapshot(self) -> dict:
+        """
+        Get the current metrics.
+
+        Returns:
+            dict: Counters, queue depth, and the mean and percentiles of the latest
+                request latencies in milliseconds.
+        """
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            metrics = {
+                "requests": self.n_requests,
+                "items": self.n_items,
+                "failed": self.n_failed,
+                "rejected": self.n_rejected,
+                "queue_depth": self.in_flight,
+                "max_queue_depth": self.max_in_flight,
+            }
+
+        metrics["latency_ms"] = {"window": len(latencies)}
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            metrics["latency_ms"].update(
+                mean=float(latencies.mean()),
+                p50=float(p50),
+                p95=float(p95),
+                p99=float(p99),
+                max=float(latencies.max()),
+            )
+
+        return metrics
+
+
+class PointCloudService:
+    """
+    Long-running local HTTP service processing point clouds on a pool of warm worker
+    processes.
+
+    Each worker builds its PointCloudPipeline once, as in batch mode, and keeps it
+    for every request, so requests do not pay for starting Python, importing Open3D
+    or building the pipeline. Visualisation and saving clusters are disabled, since
+    the labels are returned to the client. If a worker dies, e.g. on a segfault in
+    Open3D, the pool is replaced by a new, warmed-up one, and the requests that were
+    in flight on the old pool are retried once.
+
+    Endpoints:
+        POST /process: Process a JSON body `{"path": ...}`, `{"points": [[x, y, z],
+            ...]}`, or `{"items": [...]}` holding several of those, which are sent
+            to one worker as a single batch. A body of type
+            `application/octet-stream` is read as a raw (N, 3) little-endian array
+            of points, float32 unless `?dtype=float64` is given. Answers with the
+            labels and statistics of every item, or 503 if the queue is full.
+        GET /metrics: Request counts, queue depth and latency percentiles.
+        GET /health: Whether the service is up, and its number of workers.
+
+    Attributes:
+        pipeline_cfg (dict): Nested pipeline configuration with "loader",
+            "preprocessor", "clusterer", and "cluster_output" sections.
+        host (str): Address to listen on. Defaults to "127.0.0.1".
+        port (int): Port to listen on, or 0 to pick a free one, which is stored here
+            once the service is started. Defaults to 8000.
+        num_workers (int): Number of worker processes. Defaults to the number of
+            CPUs.
+        max_queue (int): Maximum number of items in flight before new requests are
+            rejected with 503. Defaults to `4 * num_workers`.
+        max_batch_size (int): Maximum number of items in a single request. Defaults
+            to 64.
+        start_method (str): Multiprocessing start method for the workers. Defaults
+            to "spawn".
+        metrics (ServiceMetrics): Counters and latencies of the requests so far.
+    """
+
+    def __init__(
+        self,
+        pipeline_cfg: dict,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        num_workers: int | None = None,
+        max_queue: int | None = None,
+        max_batch_size: int = 64,
+        start_method: str = "spawn",
+    ):
+        self.pipeline_cfg = dict(pipeline_cfg)
+        self.pipeline_cfg["cluster_output"] = {
+            **(pipeline_cfg.get("cluster_output") or {}),
+            "visualize": False,
+            "save_clusters": False,
+        }
+        self.host = host
+        self.port = port
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.max_queue = max_queue or 4 * self.num_workers
+        self.max_batch_size = max_batch_size
+        self.start_method = start_method
+        self.metrics = ServiceMetrics()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._retry_lock = threading.Lock()
+        self._server = None
+
+    @classmethod
+    def from_config(cls, cfg: "DictConfig | dict") -> "PointCloudService":
+        """
+        Alternative constructor to create a PointCloudService from a DictConfig or a
+        nested config dictionary with a "service" section.
+
+        Args:
+            cfg (DictConfig | dict): Full pipeline configuration.
+
+        Returns:
+            PointCloudService: Instance configured from the "service" section.
+        """
+        cfg = to_dict(cfg)
+
+        service_cfg = cfg.get("service") or {}
+        return cls(
+            pipeline_cfg={
+                key: value
+                for key, value in cfg.items()
+                if key not in ("batch", "service")
+            },
+            host=service_cfg.get("host") or "127.0.0.1",
+            port=service_cfg.get("port", 8000),
+            num_workers=service_cfg.get("num_workers"),
+            max_queue=service_cfg.get("max_queue"),
+            max_batch_size=service_cfg.get("max_batch_size") or 64,
+            start_method=service_cfg.get("start_method", "spawn"),
+        )
+
+    def start(self) -> None:
+        """
+        Start the workers, wait until every one has built and run its pipeline, and
+        bind the HTTP server. Requests are only served once `serve_forever` is
+        called.
+        """
+        self._executor = self._make_executor()
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _RequestHandler)
+        self._server.daemon_threads = True
+        self._server.service = self
+        self.port = self._server.server_address[1]
+
+    def _make_executor(self) -> ProcessPoolExecutor:
+        """
+        Start a pool of workers and wait until every one has warmed up.
+
+        Returns:
+            ProcessPoolExecutor: The warm worker pool.
+
+        Raises:
+            BrokenProcessPool: If a worker failed to start.
+        """
+        context = multiprocessing.get_context(self.start_method)
+        executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=context,
+            initializer=_init_service_worker,
+            initargs=(self.pipeline_cfg, context.Barrier(self.num_workers)),
+        )
+        start = time.perf_counter()
+        try:
+            # One task per worker makes the pool start all of them, and the barrier
+            # in their initializer holds every task until all have warmed up.
+            warm_ups = [executor.submit(_warm_up) for _ in range(self.num_workers)]
+            for future in warm_ups:
+                future.result()
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+        logger.info(
+            f"Started {self.num_workers} workers in {time.perf_counter() - start:.2f}s."
+        )
+
+        return executor
+
+    def _submit_batch(self, items: list[str | np.ndarray]) -> Future:
+        """
+        Send a batch of items to the pool, replacing the pool first if a worker died.
+
+        Args:
+            items (list[str | np.ndarray]): File paths and (N, 3) arrays of points.
+
+        Returns:
+            Future: Future of the list of results.
+        """
+        with self._executor_lock:
+            try:
+                return self._executor.submit(_process_batch, items)
+            except BrokenProcessPool:
+                logger.warning("A worker died, restarting the worker pool.")
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._make_executor()
+                return self._executor.submit(_process_batch, items)
+
+    def serve_forever(self) -> None:
+        """
+        Serve requests until `shutdown` is called from another thread, or the
+        process is interrupted.
+        """
+        if self._server is None:
+            self.start()
+
+        logger.info(f"Serving on http://{self.host}:{self.port}.")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Interrupted, shutting down.")
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        """
+        Stop `serve_forever`, which then closes the server and the workers.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+
+    def close(self) -> None:
+        """
+        Close the server and the workers.
+        """
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "PointCloudService":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def submit(self, items: list[str | np.ndarray]) -> Future | None:
+        """
+        Send a batch of items to a worker, unless the queue is full.
+
+        Args:
+            items (list[str | np.ndarray]): File paths and (N, 3) arrays of points.
+
+        Returns:
+            Future | None: Future of the list of results, or None if the request is
+                rejected. The caller must pass every accepted batch to `finish`.
+
+        Raises:
+            ValueError: If the batch is empty or larger than `max_batch_size`.
+        """
+        if not 1 <= len(items) <= self.max_batch_size:
+            raise ValueError(
+                f"A request must hold between 1 and {self.max_batch_size} items, "
+                f"got {len(items)}"
+            )
+        if not self.metrics.try_acquire(len(items), self.max_queue):
+            return None
+
+        try:
+            return self._submit_batch(items)
+        except BaseException:
+            self.metrics.release([], len(items), 0.0)
+            raise
+
+    def finish(
+        self,
+        future: Future,
+        items: list[str | np.ndarray],
+        received: float,
+    ) -> list[BatchFileResult]:
+        """
+        Wait for the results of a submitted batch and record its metrics.
+
+        A dying worker breaks every batch in flight on the pool, not only its own,
+        so a broken batch is retried once on the replaced pool. Retries run one at a
+        time, so that the retry of the batch that killed the worker cannot break
+        the others again. Only a batch that breaks the pool again fails.
+
+        Args:
+            future (Future): Future returned by `submit`.
+            items (list[str | np.ndarray]): Items of the batch.
+            received (float): `time.perf_counter()` when the request was received.
+
+        Returns:
+            list[BatchFileResult]: Result of every item, in order.
+
+        Raises:
+            BrokenProcessPool: If a worker died while processing the batch twice.
+        """
+        results = []
+        try:
+            try:
+                results = future.result()
+            except BrokenProcessPool:
+                with self._retry_lock:
+                    results = self._submit_batch(items).result()
+        finally:
+            # If the batch failed, every item of it is counted as failed.
+            self.metrics.release(results, len(items), time.perf_counter() - received)
+
+        return results
+
+
+def _result_to_dict(result: BatchFileResult) -> dict:
+    """
+    Convert the result of an item to a JSON-serialisable dictionary.
+    """
+    if not result.ok:
+        return {"ok": False, "error": result.error}
+
+    labels = result.labels
+    return {
+        "ok": True,
+        "labels": labels.tolist(),
+        "n_points": result.n_points,
+        "n_processed_points": result.n_processed_points,
+        "n_clusters": result.n_clusters,
+        "cluster_sizes": np.bincount(labels[labels >= 0]).tolist(),
+        "n_noise": int((labels < 0).sum()),
+        "elapsed": result.elapsed,
+    }
+
+
+def _parse_item(item: dict) -> str | np.ndarray:
+    """
+    Parse a `{"path": ...}` or `{"points": ...}` item of a JSON request.
+
+    Raises:
+        ValueError: If the item holds neither, or its points are not (N, 3).
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Every item must be an object")
+    if "path" in item:
+        return str(item["path"])
+    if "points" in item:
+        points = np.asarray(item["points"], dtype=np.float64)
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError(f"points must have shape (N, 3), got {points.shape}")
+        return points
+
+    raise ValueError('Every item must have a "path" or "points" key')
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler of a PointCloudService, stored on the server as `service`.
+    """
+
+    def do_GET(self):
+        service = self.server.service
+        path = urlparse(self.path).path
+        if path == "/metrics":
+            self._send_json(HTTPStatus.OK, service.metrics.snapshot())
+        elif path == "/health":
+            self._send_json(
+                HTTPStatus.OK, {"status": "ok", "workers": service.num_workers}
+            )
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {path}"})
+
+    def do_POST(self):
+        received = time.perf_counter()
+        service = self.server.service
+        url = urlparse(self.path)
+        if url.path != "/process":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {url.path}"})
+            return
+
+        try:
+            items, batched = self._read_items(parse_qs(url.query))
+            future = service.submit(items)
+        except ValueError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        if future is None:
+            self._send_json(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {"error": "Queue is full, retry later"},
+                headers={"Retry-After": "1"},
+            )
+            return
+
+        try:
+            results = service.finish(future, items, received)
+        except Exception as e:
+            self._send_json(
+                HTTPStatus.INTERNAL_SERVER_ERROR,
+                {"error": f"{type(e).__name__}: {e}"},
+            )
+            return
+
+        results = [_result_to_dict(result) for result in results]
+        self._send_json(HTTPStatus.OK, {"results": results} if batched else results[0])
+
+    def _read_items(
+        self,
+        query: dict[str, list[str]],
+    ) -> tuple[list[str | np.ndarray], bool]:
+        """
+        Read the items of a request body.
+
+        Returns:
+            tuple: The items, and whether they were sent as a batch.
+
+        Raises:
+            ValueError: If the body is malformed.
+        """
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.headers.get("Content-Type", "") == "application/octet-stream":
+            dtype = query.get("dtype", ["float32"])[0]
+            if dtype not in _BUFFER_DTYPES:
+                raise ValueError(f"Unsupported dtype {dtype}")
+            dtype = np.dtype(_BUFFER_DTYPES[dtype]).newbyteorder("<")
+            if len(body) % (3 * dtype.itemsize):
+                raise ValueError("Buffer length is not a multiple of 3 values")
+            return [np.frombuffer(body, dtype=dtype).reshape(-1, 3)], False
+
+        try:
+            request = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}") from e
+        if isinstance(request, dict) and "items" in request:
+            if not isinstance(request["items"], list):
+                raise ValueError('"items" must be a list')
+            return [_parse_item(item) for item in request["items"]], True
+
+        return [_parse_item(request)], False
+
+    def _send_json(
+        self,
+        status: HTTPStatus,
+        payload: dict,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
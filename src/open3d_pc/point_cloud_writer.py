@@ -0,0 +1,219 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from src.open3d_pc.geometry import PointCloud, get_array, point_count
+from src.open3d_pc.point_cloud_columns import PointCloudColumnStore
+
+logger = logging.getLogger(__name__)
+
+EXPORT_MODES = ("per_cluster", "labelled", "columnar")
+
+# PLY property types of the fields written by `PointCloudWriter`.
+_PLY_TYPES = {"<f8": "double", "<f4": "float", "u1": "uchar", "<i4": "int"}
+
+
+class PointCloudWriter:
+    """
+    Writes clustered point clouds as binary little-endian PLY files.
+
+    The vertex records of all points are gathered once, in cluster order, into a
+    single structured array. Every cluster is then a contiguous slice of it, which is
+    written without further copies on a thread pool. The files have the same layout
+    as those written by Open3D (double coordinates and normals, uchar colours) and
+    can be read back by Open3D or memory-mapped by `PointCloudLoader`. Coordinates
+    and normals of float32 tensor point clouds are written as float properties.
+
+    Attributes:
+        export_mode (str): Either "per_cluster", which writes one
+            `cluster_<id>.ply` file per cluster, or "labelled", which writes all
+            points to a single `labelled.ply` file with an extra `label` property
+            (-1 for noise), or "columnar", which writes all points sorted by label
+            to a `labelled_columns` PointCloudColumnStore, so clusters can be read
+            back individually. Defaults to "per_cluster".
+        io_threads (int | None): Number of threads writing files in "per_cluster"
+            mode. Defaults to None, which uses the `ThreadPoolExecutor` default.
+    """
+
+    def __init__(self, export_mode: str = "per_cluster", io_threads: int | None = None):
+        if export_mode not in EXPORT_MODES:
+            raise ValueError(
+                f"Unknown export mode {export_mode}, expected one of {EXPORT_MODES}"
+            )
+        self.export_mode = export_mode
+        self.io_threads = io_threads
+
+    def write(
+        self,
+        pcd: PointCloud,
+        labels: np.ndarray,
+        output_dir: str | Path,
+    ) -> list[Path]:
+        """
+        Write the clusters of a point cloud according to `export_mode`.
+
+        Args:
+            pcd (PointCloud): The point cloud containing the clusters.
+            labels (np.ndarray): Cluster labels for each point, with -1 for noise.
+            output_dir (str | Path): Directory to write the files to.
+
+        Returns:
+            list[Path]: Paths of the written files.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        if self.export_mode == "labelled":
+            path = output_dir / "labelled.ply"
+            write_ply(path, _vertex_records(pcd, labels=labels))
+            logger.info(f"Saved {len(labels)} labelled points to {path}.")
+            return [path]
+        if self.export_mode == "columnar":
+            return [self.write_columns(pcd, labels, output_dir / "labelled_columns")]
+
+        return self.write_clusters(pcd, labels, output_dir)
+
+    def write_clusters(
+        self,
+        pcd: PointCloud,
+        labels: np.ndarray,
+        output_dir: str | Path,
+    ) -> list[Path]:
+        """
+        Write each cluster to its own `cluster_<id>.ply` file. Noise is not written.
+
+        The labels are sorted once, so the cost is O(N log N) regardless of the
+        number of clusters.
+
+        Args:
+            pcd (PointCloud): The point cloud containing the clusters.
+            labels (np.ndarray): Cluster labels for each point, with -1 for noise.
+            output_dir (str | Path): Directory to write the files to.
+
+        Returns:
+            list[Path]: Paths of the written files, in cluster order.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        order = np.argsort(labels, kind="stable")
+        sorted_labels = labels[order]
+        n_clusters = int(sorted_labels[-1]) + 1 if len(labels) else 0
+        bounds = np.searchsorted(sorted_labels, np.arange(n_clusters + 1))
+        records = _vertex_records(pcd, order=order[bounds[0] :])
+        bounds -= bounds[0]
+
+        paths = [output_dir / f"cluster_{i}.ply" for i in range(n_clusters)]
+        slices = [
+            records[start:end]
+            for start, end in zip(bounds[:-1], bounds[1:], strict=True)
+        ]
+        with ThreadPoolExecutor(max_workers=self.io_threads) as executor:
+            # Consume the results so that write errors are raised here.
+            list(executor.map(write_ply, paths, slices))
+        logger.info(f"Saved {n_clusters} clusters to {output_dir}.")
+
+        return paths
+
+    def write_columns(
+        self,
+        pcd: PointCloud,
+        labels: np.ndarray,
+        path: str | Path,
+    ) -> Path:
+        """
+        Write all points to a column store, replacing any store at `path`. Points
+        are sorted by label, so every chunk spans a narrow label range and reading
+        a few clusters back only touches their chunks.
+
+        Args:
+            pcd (PointCloud): The point cloud containing the clusters.
+            labels (np.ndarray): Cluster labels for each point, with -1 for noise.
+            path (str | Path): Directory of the store.
+
+        Returns:
+            Path: Directory of the store.
+        """
+        order = np.argsort(labels, kind="stable")
+        normals = get_array(pcd, "normals")
+        colors = get_array(pcd, "colors")
+        store = PointCloudColumnStore(path, mode="w")
+        store.append(
+            get_array(pcd)[order],
+            normals=normals[order] if normals is not None else None,
+            colors=colors[order] if colors is not None else None,
+            labels=labels[order],
+        )
+        logger.info(f"Saved {len(labels)} labelled points to {store.path}.")
+
+        return store.path
+
+
+def write_ply(path: str | Path, records: np.ndarray) -> None:
+    """
+    Write a structured array of vertex records as a binary little-endian PLY file.
+
+    Args:
+        path (str | Path): Output file path.
+        records (np.ndarray): Structured array whose field names are used as the PLY
+            vertex property names.
+    """
+    header = ["ply", "format binary_little_endian 1.0"]
+    header.append(f"element vertex {len(records)}")
+    for name in records.dtype.names:
+        ply_type = _PLY_TYPES[records.dtype[name].str.lstrip("|")]
+        header.append(f"property {ply_type} {name}")
+    header.append("end_header\n")
+
+    with open(path, "wb") as f:
+        f.write("\n".join(header).encode("ascii"))
+        records.tofile(f)
+
+
+def _vertex_records(
+    pcd: PointCloud,
+    order: np.ndarray | None = None,
+    labels: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Gather the attributes of a point cloud into one structured array of PLY vertex
+    records.
+
+    Args:
+        pcd (PointCloud): Input point cloud.
+        order (np.ndarray | None): Indices of the points to gather, in output order.
+            Defaults to None, which keeps all points in their order.
+        labels (np.ndarray | None): Optional cluster labels, added as a `label`
+            property.
+
+    Returns:
+        np.ndarray: Structured array with one record per point.
+    """
+    points = get_array(pcd)
+    # float32 point clouds are written with float properties rather than widened.
+    float_type = "<f4" if points.dtype == np.float32 else "<f8"
+    columns = [(("x", "y", "z"), float_type, points)]
+    normals = get_array(pcd, "normals")
+    if normals is not None:
+        columns.append((("nx", "ny", "nz"), float_type, normals))
+    colors = get_array(pcd, "colors")
+    if colors is not None:
+        colors = np.round(np.clip(colors, 0, 1) * 255)
+        columns.append((("red", "green", "blue"), "u1", colors))
+
+    fields = [(name, dtype) for names, dtype, _ in columns for name in names]
+    if labels is not None:
+        fields.append(("label", "<i4"))
+    n_records = point_count(pcd) if order is None else len(order)
+    records = np.empty(n_records, dtype=fields)
+
+    for names, _, values in columns:
+        values = values if order is None else values[order]
+        for i, name in enumerate(names):
+            records[name] = values[:, i]
+    if labels is not None:
+        records["label"] = labels if order is None else labels[order]
+
+    return records
@@ -0,0 +1,531 @@
+import logging
+from collections.abc import Iterator
+
+import numpy as np
+import open3d.core as o3c
+
+logger = logging.getLogger(__name__)
+
+# Bits per axis of the Morton codes used by `occupied_voxel_counts`, so that the
+# interleaved code of all three axes fits in 63 bits.
+MORTON_BITS = 21
+
+# Offsets of a voxel and its 26 neighbours.
+NEIGHBOR_OFFSETS = np.stack(
+    np.meshgrid(*[np.arange(-1, 2)] * 3, indexing="ij"), axis=-1
+).reshape(-1, 3)
+
+
+def radius_search(
+    points: np.ndarray,
+    queries: np.ndarray,
+    radius: float,
+    sort: bool = False,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find all points within `radius` of each query point.
+
+    The neighbours are returned in compressed sparse row form: the neighbours of query
+    `i` are `indices[offsets[i]:offsets[i + 1]]`. A query that is also one of the
+    points is returned as its own neighbour, matching Open3D's DBSCAN convention.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points to search.
+        queries (np.ndarray): (M, 3) array of query points.
+        radius (float): Search radius.
+        sort (bool): Whether to sort each query's neighbours by distance. Defaults to
+            False.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: A tuple containing:
+            - offsets (np.ndarray): (M + 1,) row offsets into `indices`.
+            - indices (np.ndarray): Indices into `points` of every neighbour.
+            - sq_distances (np.ndarray): Squared distance to every neighbour.
+    """
+    if len(points) == 0 or len(queries) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return np.zeros(len(queries) + 1, dtype=np.int64), empty, empty.astype(float)
+
+    nns = o3c.nns.NearestNeighborSearch(o3c.Tensor.from_numpy(points))
+    nns.fixed_radius_index(radius)
+    indices, sq_distances, offsets = nns.fixed_radius_search(
+        o3c.Tensor.from_numpy(np.ascontiguousarray(queries, dtype=points.dtype)),
+        radius,
+        sort=sort,
+    )
+
+    return offsets.numpy(), indices.numpy(), sq_distances.numpy()
+
+
+def knn_search(
+    points: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find the `k` nearest points of each query point, sorted by distance. A query
+    that is also one of the points is returned as its own nearest neighbour.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points to search.
+        queries (np.ndarray): (M, 3) array of query points.
+        k (int): Number of neighbours. At most N are returned.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: A tuple containing:
+            - indices (np.ndarray): (M, min(k, N)) indices into `points` of the
+              neighbours.
+            - sq_distances (np.ndarray): (M, min(k, N)) squared distances to the
+              neighbours.
+    """
+    k = min(k, len(points))
+    if k == 0 or len(queries) == 0:
+        return np.zeros((len(queries), k), dtype=np.int64), np.zeros((len(queries), k))
+
+    nns = o3c.nns.NearestNeighborSearch(o3c.Tensor.from_numpy(points))
+    nns.knn_index()
+    indices, sq_distances = nns.knn_search(
+        o3c.Tensor.from_numpy(np.ascontiguousarray(queries, dtype=points.dtype)), k
+    )
+
+    return indices.numpy(), sq_distances.numpy()
+
+
+def within_radius(
+    points: np.ndarray,
+    targets: np.ndarray,
+    radius: float,
+) -> np.ndarray:
+    """
+    Mark the points lying within `radius` of any target point.
+
+    Points are first pre-filtered on a grid with cells of size `radius`, keeping only
+    those in the 27 cells around a target's cell, so only points near the targets are
+    searched for their nearest target. The cost of the search therefore grows with
+    the size of the targets' neighbourhood rather than with the number of points.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points.
+        targets (np.ndarray): (M, 3) array of target points.
+        radius (float): Search radius.
+
+    Returns:
+        np.ndarray: (N,) boolean mask of the points within `radius` of a target.
+    """
+    mask = np.zeros(len(points), dtype=bool)
+    if len(points) == 0 or len(targets) == 0:
+        return mask
+
+    lower = targets.min(axis=0) - radius
+    upper = targets.max(axis=0) + radius
+    candidates = np.flatnonzero(np.all((points >= lower) & (points <= upper), axis=1))
+    if len(candidates) == 0:
+        return mask
+
+    # Cells are counted from one cell below the targets' bounds, so the keys of the
+    # targets' neighbouring cells and of every candidate are non-negative.
+    cell_origin = lower - radius
+    target_cells = np.floor((targets - cell_origin) / radius).astype(np.int64)
+    point_cells = np.floor((points[candidates] - cell_origin) / radius)
+    point_cells = point_cells.astype(np.int64)
+    dims = np.maximum(target_cells.max(axis=0), point_cells.max(axis=0)) + 2
+
+    offsets = np.stack(np.meshgrid(*[[-1, 0, 1]] * 3, indexing="ij"), axis=-1)
+    near_cells = (target_cells[:, None, :] + offsets.reshape(1, -1, 3)).reshape(-1, 3)
+    near_keys = np.ravel_multi_index(near_cells.T, dims)
+    point_keys = np.ravel_multi_index(point_cells.T, dims)
+    if np.prod(dims) <= 4 * len(candidates):
+        # Small grids are looked up in a dense mask, which is much faster than
+        # searching sorted keys.
+        near = np.zeros(np.prod(dims), dtype=bool)
+        near[near_keys] = True
+        candidates = candidates[near[point_keys]]
+    else:
+        near_keys = np.sort(near_keys)
+        position = np.searchsorted(near_keys, point_keys)
+        position = np.minimum(position, len(near_keys) - 1)
+        candidates = candidates[near_keys[position] == point_keys]
+    if len(candidates) == 0:
+        return mask
+
+    # Only the nearest target matters, which is much cheaper to find than all of
+    # the targets within the radius.
+    _, sq_distances = knn_search(targets, points[candidates], 1)
+    mask[candidates[sq_distances[:, 0] <= radius**2]] = True
+
+    return mask
+
+
+def connected_components(
+    n: int,
+    src: np.ndarray,
+    dst: np.ndarray,
+    parent: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Label the connected components of an undirected graph given as an edge list.
+
+    Uses vectorised hooking and pointer jumping, so the number of passes grows with
+    the logarithm of the component diameter rather than the number of edges. Edges
+    whose endpoints are already merged are dropped after every pass.
+
+    Args:
+        n (int): Number of nodes.
+        src (np.ndarray): Source node of every edge.
+        dst (np.ndarray): Destination node of every edge.
+        parent (np.ndarray | None): Components of a subset of the graph's edges, as
+            returned by a previous call, to which `src` and `dst` are added. Defaults
+            to None, which starts from isolated nodes.
+
+    Returns:
+        np.ndarray: (n,) array mapping every node to the smallest node index in its
+            component.
+    """
+    parent = np.arange(n) if parent is None else parent.copy()
+    while True:
+        root_src, root_dst = parent[src], parent[dst]
+        unmerged = root_src != root_dst
+        if not unmerged.any():
+            return parent
+
+        # Merged nodes never split again, so their edges need not be revisited.
+        src, dst = src[unmerged], dst[unmerged]
+        lo = np.minimum(root_src[unmerged], root_dst[unmerged])
+        hi = np.maximum(root_src[unmerged], root_dst[unmerged])
+        np.minimum.at(parent, hi, lo)
+
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+
+def relabel_consecutive(labels: np.ndarray) -> np.ndarray:
+    """
+    Relabel non-negative labels to 0..k-1 in order of first appearance, keeping -1
+    for noise.
+
+    Args:
+        labels (np.ndarray): Arbitrary non-negative labels, with -1 for noise.
+
+    Returns:
+        np.ndarray: Consecutive labels with the same partition.
+    """
+    result = np.full(len(labels), -1, dtype=np.int64)
+    valid = labels >= 0
+    if not valid.any():
+        return result
+
+    unique, first, inverse = np.unique(
+        labels[valid], return_index=True, return_inverse=True
+    )
+    rank = np.empty(len(unique), dtype=np.int64)
+    rank[np.argsort(first)] = np.arange(len(unique))
+    result[valid] = rank[inverse]
+
+    return result
+
+
+def iter_tiles(
+    points: np.ndarray,
+    tile_size: float,
+    halo: float,
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    Split space into cubic tiles and yield the points of each tile with a halo.
+
+    Every point is owned by exactly one tile. The extended tile additionally contains
+    every point within `halo` of the tile's bounds (per axis), so any neighbourhood of
+    radius up to `halo` around an owned point lies entirely inside it.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points.
+        tile_size (float): Edge length of each tile.
+        halo (float): Width of the halo added around each tile.
+
+    Yields:
+        tuple[np.ndarray, np.ndarray]: A tuple containing:
+            - owned (np.ndarray): Sorted indices of the points owned by the tile.
+            - extended (np.ndarray): Sorted indices of the owned and halo points.
+
+    Raises:
+        ValueError: If tile_size is not positive.
+    """
+    if tile_size <= 0:
+        raise ValueError(f"tile_size must be positive, got {tile_size}")
+    if len(points) == 0:
+        return
+
+    origin = points.min(axis=0)
+    keys = np.floor((points - origin) / tile_size).astype(np.int64)
+    order = np.lexsort(keys.T[::-1])
+    unique_keys, starts = np.unique(keys[order], axis=0, return_index=True)
+    ends = np.append(starts[1:], len(order))
+    bounds = list(zip(starts, ends, strict=True))
+    tiles = dict(zip(map(tuple, unique_keys), bounds, strict=True))
+
+    reach = int(np.ceil(halo / tile_size))
+    offsets = np.stack(
+        np.meshgrid(*[np.arange(-reach, reach + 1)] * 3, indexing="ij"), axis=-1
+    ).reshape(-1, 3)
+
+    for key, (start, end) in zip(unique_keys, bounds, strict=True):
+        owned = np.sort(order[start:end])
+
+        candidates = [
+            order[slice(*tiles[neighbor])]
+            for neighbor in map(tuple, key + offsets)
+            if neighbor in tiles
+        ]
+        candidates = np.sort(np.concatenate(candidates))
+        lower = origin + key * tile_size - halo
+        upper = origin + (key + 1) * tile_size + halo
+        inside = np.all(
+            (points[candidates] >= lower) & (points[candidates] <= upper), axis=1
+        )
+
+        # Guard against owned points dropped by rounding at the tile bounds.
+        yield owned, np.union1d(candidates[inside], owned)
+
+
+def flat_voxel_keys(
+    keys: np.ndarray,
+    padding: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Flatten non-negative integer voxel coordinates into scalar keys in
+    lexicographic order, leaving room for `padding` voxels beyond the largest.
+
+    Args:
+        keys (np.ndarray): (N, 3) non-negative integer voxel coordinates.
+        padding (int): Number of voxels past the largest coordinate along each
+            axis that still get distinct keys. Defaults to 0.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The keys, and the key offset of a step along
+            each axis.
+    """
+    dims = keys.max(axis=0) + 1 + padding
+    strides = np.array([dims[1] * dims[2], dims[2], 1])
+
+    return keys @ strides, strides
+
+
+def hash_grid(
+    points: np.ndarray,
+    cell_size: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sort points into the cells of a grid and find the occupied neighbours of every
+    occupied cell.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points.
+        cell_size (float): Edge length of the cells.
+
+    Returns:
+        tuple: A tuple containing:
+            - order (np.ndarray): (N,) permutation sorting the points by cell.
+            - starts (np.ndarray): (M,) start of each occupied cell in the sorted
+              points.
+            - sizes (np.ndarray): (M,) number of points of each cell.
+            - neighbors (np.ndarray): (M, 27) index of the cell at each of
+              `NEIGHBOR_OFFSETS`, or -1 if it is empty.
+    """
+    # Cells are offset by one so that their neighbours have non-negative keys.
+    keys = np.floor((points - points.min(axis=0)) / cell_size).astype(np.int64) + 1
+    flat, strides = flat_voxel_keys(keys, padding=1)
+    order = np.argsort(flat, kind="stable")
+    flat = flat[order]
+    starts = np.flatnonzero(np.diff(flat, prepend=-1))
+    sizes = np.diff(starts, append=len(points))
+    cells = flat[starts]
+
+    targets = cells[:, None] + NEIGHBOR_OFFSETS @ strides
+    neighbors = np.searchsorted(cells, targets)
+    neighbors[neighbors == len(cells)] = 0
+    neighbors[cells[neighbors] != targets] = -1
+
+    return order, starts, sizes, neighbors
+
+
+def occupied_voxel_counts(points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Count the occupied voxels of an octree over the points at every level.
+
+    Level `l` divides the points' bounding cube into voxels of `1 / 2**l` of its edge
+    length. The points are sorted once by their Morton code at the finest level, so
+    the points of every voxel at every level are contiguous and each level is counted
+    with one pass over the sorted codes.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: A tuple containing:
+            - sizes (np.ndarray): (MORTON_BITS + 1,) voxel size of every level.
+            - counts (np.ndarray): (MORTON_BITS + 1,) number of occupied voxels of
+              every level, non-decreasing with the level.
+    """
+    levels = np.arange(MORTON_BITS + 1)
+    if len(points) == 0:
+        return np.ones(len(levels)) / 2.0**levels, np.zeros(len(levels), dtype=np.int64)
+
+    min_bound = points.min(axis=0)
+    extent = float((points.max(axis=0) - min_bound).max()) or 1.0
+    resolution = 2**MORTON_BITS
+    cells = np.floor((points - min_bound) / extent * resolution)
+    cells = np.clip(cells, 0, resolution - 1).astype(np.uint64)
+    codes = np.sort(
+        _spread_bits(cells[:, 0])
+        | _spread_bits(cells[:, 1]) << np.uint64(1)
+        | _spread_bits(cells[:, 2]) << np.uint64(2)
+    )
+
+    # Neighbouring codes share the voxels of every level above the highest bit
+    # in which they differ, so each pair starts a new voxel from that level on.
+    thresholds = np.uint64(1) << (3 * levels).astype(np.uint64)
+    first_split = np.searchsorted(thresholds, codes[1:] ^ codes[:-1], side="right")
+    splits = np.bincount(len(levels) - first_split, minlength=len(levels) + 1)
+    counts = 1 + np.cumsum(splits[: len(levels)])
+
+    return extent / 2.0**levels, counts
+
+
+def count_voxels(points: np.ndarray, voxel_size: float) -> int:
+    """
+    Count the voxels occupied by the points on the grid used by Open3D's
+    `voxel_down_sample`, i.e. the number of points it would keep.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points.
+        voxel_size (float): Edge length of the voxels.
+
+    Returns:
+        int: Number of occupied voxels.
+    """
+    if len(points) == 0:
+        return 0
+
+    origin = points.min(axis=0) - voxel_size / 2
+    keys = np.floor((points - origin) / voxel_size).astype(np.int64)
+    dims = keys.max(axis=0) + 1
+    flat = np.sort((keys[:, 0] * dims[1] + keys[:, 1]) * dims[2] + keys[:, 2])
+
+    return 1 + int(np.count_nonzero(flat[1:] != flat[:-1]))
+
+
+def voxel_size_for_target(
+    points: np.ndarray,
+    target_points: int,
+    rel_tol: float = 0.05,
+    max_iter: int = 8,
+) -> float:
+    """
+    Find a voxel size at which voxel downsampling keeps about `target_points`
+    points, without downsampling.
+
+    The number of occupied voxels is counted at every octree level in one pass by
+    `occupied_voxel_counts`, and an initial size is interpolated between the two
+    levels bracketing the target assuming a power law, i.e. a constant fractal
+    dimension within one octave. As the octree grid differs from Open3D's, the size
+    is then refined with a few exact counts by `count_voxels` until the count is
+    within `rel_tol` of the target. If the target is at least the number of distinct
+    points, the largest octree voxel size that keeps them all apart is returned.
+
+    Args:
+        points (np.ndarray): (N, 3) array of points.
+        target_points (int): Desired number of points after downsampling.
+        rel_tol (float): Accepted relative deviation from the target. Defaults to
+            0.05.
+        max_iter (int): Maximum number of refining counts. Defaults to 8.
+
+    Returns:
+        float: The voxel size whose count was closest to the target.
+
+    Raises:
+        ValueError: If target_points is not positive or there are no points.
+    """
+    if target_points <= 0:
+        raise ValueError(f"target_points must be positive, got {target_points}")
+    if len(points) == 0:
+        raise ValueError("Cannot select a voxel size for an empty point cloud")
+
+    sizes, counts = occupied_voxel_counts(points)
+    if target_points >= counts[-1]:
+        return _separating_voxel_size(points, sizes, counts)
+
+    level = max(int(np.searchsorted(counts, target_points)), 1)
+    lower, upper = counts[level - 1], counts[level]
+    # Local fractal dimension: the count grows by 2**dimension per halving.
+    dimension = max(np.log2(upper / lower), 0.5)
+    size = sizes[level - 1] * (target_points / lower) ** (-1 / dimension)
+
+    # Sizes known to keep too many (fine) and too few (coarse) points.
+    fine, coarse = 0.0, np.inf
+    best_size, best_error = size, np.inf
+    previous = None
+    for _ in range(max_iter):
+        count = count_voxels(points, size)
+        error = abs(np.log(count / target_points))
+        if error < best_error:
+            best_size, best_error = size, error
+        if abs(count / target_points - 1) <= rel_tol:
+            break
+
+        if count > target_points:
+            fine = max(fine, size)
+        else:
+            coarse = min(coarse, size)
+        if previous is not None and previous[1] != count and previous[0] != size:
+            slope = np.log(count / previous[1]) / np.log(previous[0] / size)
+            dimension = float(np.clip(slope, 0.5, 3.0))
+        previous = (size, count)
+        size *= (count / target_points) ** (1 / dimension)
+        if fine > 0 and coarse < np.inf and not fine < size < coarse:
+            # The count is a step function of the size, so fall back to bisection.
+            size = np.sqrt(fine * coarse)
+
+    return float(best_size)
+
+
+def _separating_voxel_size(
+    points: np.ndarray,
+    sizes: np.ndarray,
+    counts: np.ndarray,
+) -> float:
+    """
+    Find the largest octree voxel size at which every distinct point keeps its own
+    voxel of Open3D's grid, given the octree counts of `occupied_voxel_counts`.
+    """
+    level = int(np.searchsorted(counts, counts[-1]))
+    # Points apart on the octree grid can still share a voxel of Open3D's grid.
+    while level < MORTON_BITS and count_voxels(points, sizes[level]) < counts[-1]:
+        level += 1
+
+    return float(sizes[level])
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    """
+    Insert two zero bits between each of the lowest `MORTON_BITS` bits of every value,
+    to interleave three coordinates into a Morton code.
+
+    Args:
+        values (np.ndarray): Array of uint64 values below `2**MORTON_BITS`.
+
+    Returns:
+        np.ndarray: Array of uint64 values with the spread bits.
+    """
+    values = values.astype(np.uint64)
+    for shift, mask in (
+        (32, 0x1F00000000FFFF),
+        (16, 0x1F0000FF0000FF),
+        (8, 0x100F00F00F00F00F),
+        (4, 0x10C30C30C30C30C3),
+        (2, 0x1249249249249249),
+    ):
+        values = (values | values << np.uint64(shift)) & np.uint64(mask)
+
+    return values
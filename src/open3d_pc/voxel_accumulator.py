@@ -0,0 +1,145 @@
+import logging
+
+import numpy as np
+
+from src.open3d_pc.geometry import PointCloud, make_pointcloud
+
+logger = logging.getLogger(__name__)
+
+# Voxel coordinates are packed into one int64 key with this many bits per axis.
+_KEY_BITS = 21
+
+
+class VoxelAccumulator:
+    """
+    Incrementally voxel-downsamples a point cloud fed in chunks.
+
+    The accumulator keeps running per-voxel sums and counts of the points (and of
+    their normals and colours, if given), so its memory is bounded by the number of
+    occupied voxels rather than the number of points. The voxel grid is anchored at
+    `min_bound - voxel_size / 2`, like Open3D's `voxel_down_sample`, so the result
+    matches downsampling the full cloud when `min_bound` is the cloud's minimum bound.
+
+    Attributes:
+        voxel_size (float): Edge length of the voxels.
+        min_bound (np.ndarray): Minimum bound of the whole point cloud.
+        n_points (int): Number of points accumulated so far.
+    """
+
+    def __init__(self, voxel_size: float, min_bound: np.ndarray):
+        if voxel_size <= 0:
+            raise ValueError(f"voxel_size must be positive, got {voxel_size}")
+
+        self.voxel_size = voxel_size
+        self.min_bound = np.asarray(min_bound, dtype=np.float64)
+        self.n_points = 0
+        self._origin = self.min_bound - voxel_size / 2
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._sums = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(
+        self,
+        points: np.ndarray,
+        normals: np.ndarray | None = None,
+        colors: np.ndarray | None = None,
+    ) -> None:
+        """
+        Add a chunk of points to the running voxel sums.
+
+        Normals and colours must be given either for every chunk or for none.
+
+        Args:
+            points (np.ndarray): (N, 3) array of points.
+            normals (np.ndarray | None): Optional (N, 3) array of normals.
+            colors (np.ndarray | None): Optional (N, 3) array of colours.
+
+        Raises:
+            ValueError: If a point lies outside the range covered by the voxel keys.
+        """
+        if len(points) == 0:
+            return
+
+        attributes = {"points": points, "normals": normals, "colors": colors}
+        attributes = {
+            name: np.asarray(values, dtype=np.float64)
+            for name, values in attributes.items()
+            if values is not None
+        }
+
+        keys = self._voxel_keys(attributes["points"])
+        merged_keys, inverse = np.unique(
+            np.concatenate([self._keys, keys]), return_inverse=True
+        )
+        n_old = len(self._keys)
+        self._counts = np.bincount(
+            inverse,
+            weights=np.concatenate([self._counts, np.ones(len(keys))]),
+            minlength=len(merged_keys),
+        ).astype(np.int64)
+
+        for name, values in attributes.items():
+            sums = self._sums.get(name, np.zeros((n_old, 3)))
+            stacked = np.concatenate([sums, values])
+            self._sums[name] = np.stack(
+                [np.bincount(inverse, weights=stacked[:, axis]) for axis in range(3)],
+                axis=1,
+            )
+
+        self._keys = merged_keys
+        self.n_points += len(keys)
+
+    def to_pointcloud(self, float32: bool = False) -> PointCloud:
+        """
+        Build the downsampled point cloud from the accumulated voxel averages.
+
+        Args:
+            float32 (bool): Whether to build a tensor point cloud with float32
+                storage instead of a legacy point cloud. The averages are always
+                accumulated in float64. Defaults to False.
+
+        Returns:
+            PointCloud: Point cloud with one point per occupied voxel, plus averaged
+                normals and colours if they were accumulated.
+        """
+        if not len(self):
+            return make_pointcloud(np.zeros((0, 3)), float32=float32)
+
+        means = {
+            name: sums / self._counts[:, None] for name, sums in self._sums.items()
+        }
+
+        return make_pointcloud(
+            means["points"],
+            normals=means.get("normals"),
+            colors=means.get("colors"),
+            float32=float32,
+        )
+
+    def _voxel_keys(self, points: np.ndarray) -> np.ndarray:
+        """
+        Compute the packed voxel key of each point.
+
+        Args:
+            points (np.ndarray): (N, 3) array of points.
+
+        Returns:
+            np.ndarray: (N,) array of int64 voxel keys.
+
+        Raises:
+            ValueError: If a point lies below `min_bound` or too far above it.
+        """
+        coords = np.floor((points - self._origin) / self.voxel_size).astype(np.int64)
+        if coords.min() < 0 or coords.max() >= 1 << _KEY_BITS:
+            raise ValueError(
+                "Points lie outside the voxel grid, check min_bound and voxel_size."
+            )
+
+        return (
+            (coords[:, 0] << (2 * _KEY_BITS))
+            | (coords[:, 1] << _KEY_BITS)
+            | (coords[:, 2])
+        )
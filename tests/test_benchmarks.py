@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from benchmarks.compare_backends import adjusted_rand_index, compare_backends
+from benchmarks.run_benchmarks import compare_results, run_case
+from benchmarks.synthetic_scenes import SCENES, make_scene
+
+
+@pytest.mark.parametrize("scene", list(SCENES))
+def test_make_scene_is_reproducible(scene):
+    points = make_scene(scene, 1000, seed=1)
+
+    assert points.shape == (1000, 3)
+    assert np.isfinite(points).all()
+    assert np.array_equal(points, make_scene(scene, 1000, seed=1))
+    assert not np.array_equal(points, make_scene(scene, 1000, seed=2))
+
+
+def test_make_scene_unknown():
+    with pytest.raises(ValueError):
+        make_scene("unknown", 10)
+
+
+def test_run_case(tmp_path):
+    cfg = {"preprocessor": {"voxel_size": 0.1}, "clusterer": {"min_points": 5}}
+
+    case = run_case("blobs", 2000, cfg, tmp_path, repeat=2)
+
+    assert case["n_points"] == 2000
+    assert "dbscan" in case["stages"]
+    assert case["stages"]["load"]["points_out"] == 2000
+    assert case["total_wall_time"] > 0
+    assert (tmp_path / "blobs-2000-0.npy").is_file()
+
+
+def test_compare_results():
+    def results(total, dbscan, peak_rss=100):
+        return {
+            "cases": {
+                "blobs-1000": {
+                    "total_wall_time": total,
+                    "peak_rss": peak_rss,
+                    "stages": {
+                        "load": {"wall_time": 0.001},
+                        "dbscan": {"wall_time": dbscan},
+                    },
+                }
+            }
+        }
+
+    baseline = results(1.0, 0.5)
+
+    assert compare_results(results(1.1, 0.55), baseline, threshold=0.2) == []
+    # The load stage is below min_time, so its tenfold slowdown is ignored
+    slower = results(1.5, 0.8)
+    slower["cases"]["blobs-1000"]["stages"]["load"]["wall_time"] = 0.01
+    regressions = compare_results(slower, baseline, threshold=0.2)
+    assert len(regressions) == 2
+    assert compare_results(results(1.0, 0.5, peak_rss=200), baseline) != []
+    assert compare_results(results(2.0, 1.0), {"cases": {}}) == []
+
+
+def test_adjusted_rand_index():
+    labels = np.array([0, 0, 1, 1, -1])
+
+    assert adjusted_rand_index(labels, np.array([5, 5, 2, 2, -1])) == 1.0
+    assert adjusted_rand_index(labels, np.array([0, 1, 0, 1, -1])) < 0.5
+
+
+def test_compare_backends():
+    points = make_scene("blobs", 2000)
+
+    results = compare_backends(points, 0.3, 5, ["grid", "voxel"])
+
+    assert list(results) == ["grid", "voxel"]
+    assert results["grid"]["agreement"] > 0.99
+    assert results["voxel"]["wall_time"] > 0
+    assert 0 <= results["voxel"]["noise_fraction"] <= 1
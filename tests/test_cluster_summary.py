@@ -0,0 +1,61 @@
+import numpy as np
+import open3d as o3d
+
+from src.open3d_pc.cluster_summary import (
+    CLUSTER_SUMMARY_DTYPE,
+    summarize_clusters,
+    write_summary,
+)
+
+
+def test_summarize_clusters_matches_per_cluster_loop(synthetic_pcd):
+    synthetic_pcd.estimate_normals()
+    labels = np.random.default_rng(0).integers(-1, 30, size=500)
+    labels[labels == 7] = -1
+
+    summary = summarize_clusters(synthetic_pcd, labels)
+
+    assert summary.dtype == CLUSTER_SUMMARY_DTYPE
+    assert 7 not in summary["label"]
+    assert np.array_equal(summary["label"], np.unique(labels[labels >= 0]))
+    for record in summary:
+        cluster = synthetic_pcd.select_by_index(
+            np.flatnonzero(labels == record["label"])
+        )
+        bbox = cluster.get_axis_aligned_bounding_box()
+        normal = np.asarray(cluster.normals).sum(axis=0)
+        assert record["n_points"] == len(cluster.points)
+        assert np.allclose(record["centroid"], cluster.get_center())
+        assert np.array_equal(record["min_bound"], bbox.min_bound)
+        assert np.array_equal(record["max_bound"], bbox.max_bound)
+        assert np.allclose(record["mean_normal"], normal / np.linalg.norm(normal))
+
+
+def test_summarize_clusters_tensor_without_normals(synthetic_clustered_pcd):
+    tensor_pcd = o3d.t.geometry.PointCloud.from_legacy(
+        synthetic_clustered_pcd, o3d.core.float32
+    )
+    labels = np.repeat([0, 1, 2], 50)
+
+    summary = summarize_clusters(tensor_pcd, labels)
+
+    points = np.asarray(synthetic_clustered_pcd.points)
+    assert np.array_equal(summary["n_points"], [50, 50, 50])
+    assert np.allclose(summary["centroid"][1], points[50:100].mean(axis=0))
+    assert not summary["mean_normal"].any()
+
+
+def test_summarize_clusters_only_noise(synthetic_pcd):
+    summary = summarize_clusters(synthetic_pcd, np.full(500, -1))
+
+    assert len(summary) == 0
+    assert summary.dtype == CLUSTER_SUMMARY_DTYPE
+
+
+def test_write_summary_round_trip(synthetic_clustered_pcd, tmp_path):
+    summary = summarize_clusters(synthetic_clustered_pcd, np.repeat([0, 1, 2], 50))
+
+    write_summary(tmp_path / "out" / "summary.npy", summary)
+
+    loaded = np.load(tmp_path / "out" / "summary.npy")
+    assert np.array_equal(loaded, summary)
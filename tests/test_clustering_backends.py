@@ -0,0 +1,123 @@
+import numpy as np
+import open3d as o3d
+import pytest
+
+from src.open3d_pc import clustering_backends
+from src.open3d_pc.clustering_backends import (
+    CLUSTERING_BACKENDS,
+    get_clustering_backend,
+    grid_dbscan,
+    open3d_dbscan,
+    register_clustering_backend,
+    voxel_components,
+)
+from src.open3d_pc.spatial import radius_search
+
+
+def uniform_pcd(n_points=2000, seed=0):
+    points = np.random.default_rng(seed).uniform(0, 1, size=(n_points, 3))
+
+    return o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+
+
+def assert_same_dbscan(labels, expected, points, eps, min_points):
+    offsets, _, _ = radius_search(points, points, eps)
+    core = np.diff(offsets) >= min_points
+    pairs = set(zip(labels[core], expected[core], strict=True))
+    assert len(pairs) == len(np.unique(expected[core]))
+    assert np.array_equal(labels < 0, expected < 0)
+
+
+@pytest.mark.parametrize("backend", ["open3d", "grid", "voxel"])
+def test_backends_share_labels_contract(backend, synthetic_clustered_pcd):
+    labels = get_clustering_backend(backend)(synthetic_clustered_pcd, 0.1, 5)
+
+    assert labels.shape == (150,)
+    assert np.issubdtype(labels.dtype, np.integer)
+    assert labels.min() >= -1
+    assert np.array_equal(np.unique(labels[labels >= 0]), np.arange(3))
+
+
+def test_grid_dbscan_matches_open3d():
+    pcd = uniform_pcd()
+
+    labels = grid_dbscan(pcd, 0.08, 8)
+
+    expected = open3d_dbscan(pcd, 0.08, 8)
+    assert_same_dbscan(labels, expected, np.asarray(pcd.points), 0.08, 8)
+
+
+def test_grid_dbscan_across_chunks(monkeypatch):
+    pcd = uniform_pcd()
+    monkeypatch.setattr(clustering_backends, "_GRID_CHUNK_PAIRS", 500)
+
+    labels = grid_dbscan(pcd, 0.08, 8)
+
+    expected = open3d_dbscan(pcd, 0.08, 8)
+    assert_same_dbscan(labels, expected, np.asarray(pcd.points), 0.08, 8)
+
+
+def test_grid_dbscan_excludes_neighbours_at_eps():
+    # Every point is exactly eps from its lattice neighbours, so none is a
+    # neighbour and all are noise.
+    axis = np.arange(12) * 0.5
+    points = np.stack(np.meshgrid(axis, axis, axis, indexing="ij"), -1).reshape(-1, 3)
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+
+    labels = grid_dbscan(pcd, 0.5, 3)
+
+    assert np.array_equal(labels, open3d_dbscan(pcd, 0.5, 3))
+    assert (labels == -1).all()
+
+
+def test_grid_dbscan_tensor_pointcloud(synthetic_clustered_pcd):
+    pcd = o3d.t.geometry.PointCloud.from_legacy(
+        synthetic_clustered_pcd, o3d.core.float32
+    )
+
+    labels = grid_dbscan(pcd, 0.1, 5)
+
+    assert np.array_equal(labels, grid_dbscan(synthetic_clustered_pcd, 0.1, 5))
+
+
+def test_grid_dbscan_empty():
+    labels = grid_dbscan(o3d.geometry.PointCloud(), 0.1, 5)
+
+    assert labels.shape == (0,)
+
+
+def test_voxel_components_joins_adjacent_voxels():
+    # Two dense voxels sharing a corner, one further away and a sparse one. The
+    # point at the origin aligns the voxels with the groups.
+    rng = np.random.default_rng(0)
+    points = np.vstack(
+        [[[0.0, 0.0, 0.0]]]
+        + [rng.uniform(low + 0.01, low + 0.09, size=(10, 3)) for low in (0, 0.1, 0.3)]
+        + [[[0.55, 0.55, 0.55]]]
+    )
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+
+    labels = voxel_components(pcd, 0.1, 5)
+
+    assert (labels[:21] == 0).all()
+    assert (labels[21:31] == 1).all()
+    assert labels[31] == -1
+
+
+def test_register_clustering_backend(monkeypatch):
+    monkeypatch.setattr(clustering_backends, "CLUSTERING_BACKENDS", {})
+
+    @register_clustering_backend("noise")
+    def all_noise(pcd, eps, min_points):
+        return np.full(len(pcd.points), -1)
+
+    assert get_clustering_backend("noise") is all_noise
+    with pytest.raises(ValueError, match="already registered"):
+        register_clustering_backend("noise")(all_noise)
+
+
+def test_get_unknown_clustering_backend():
+    with pytest.raises(ValueError, match="Unknown clustering backend"):
+        get_clustering_backend("unknown")
+
+    assert {"open3d", "grid", "voxel"} <= set(CLUSTERING_BACKENDS)
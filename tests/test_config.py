@@ -0,0 +1,105 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+from src.open3d_pc.config import CONFIG_PATH, load_config, to_dict
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Time spent importing the entry point and the pipeline on top of Open3D, which
+# cannot be deferred. Eagerly importing Hydra, OmegaConf and pyplot alone costs
+# about a second.
+IMPORT_TIME_BUDGET = 0.4
+LAZY_MODULES = ("hydra", "omegaconf", "matplotlib")
+
+
+def test_load_config_defaults():
+    with open(CONFIG_PATH, encoding="utf-8") as f:
+        expected = yaml.safe_load(f)
+
+    assert load_config() == expected
+
+
+def test_to_dict_resolves_dictconfig():
+    from omegaconf import OmegaConf
+
+    cfg = OmegaConf.create({"a": {"b": 1}, "c": "${a.b}"})
+
+    assert to_dict(cfg) == {"a": {"b": 1}, "c": 1}
+
+
+def test_to_dict_keeps_dict():
+    cfg = {"a": {"b": 1}}
+
+    assert to_dict(cfg) is cfg
+
+
+def test_load_config_overrides():
+    cfg = load_config(
+        [
+            "loader.path=data/scan.ply",
+            "preprocessor.voxel_size=0.1",
+            "clusterer.min_points=5",
+            "cluster_output.visualize=False",
+            "cluster_output.output_dir='out'",
+            "clusterer.tile_size=null",
+        ]
+    )
+
+    assert cfg["loader"]["path"] == "data/scan.ply"
+    assert cfg["preprocessor"]["voxel_size"] == 0.1
+    assert cfg["clusterer"]["min_points"] == 5
+    assert cfg["cluster_output"]["visualize"] is False
+    assert cfg["cluster_output"]["output_dir"] == "out"
+    assert cfg["clusterer"]["tile_size"] is None
+
+
+def test_load_config_does_not_modify_defaults():
+    load_config(["clusterer.min_points=5"])
+
+    assert load_config()["clusterer"]["min_points"] != 5
+
+
+@pytest.mark.parametrize(
+    "override",
+    [
+        "--multirun",
+        "+clusterer.foo=1",
+        "~clusterer.n_jobs",
+        "hydra.run.dir=.",
+        "clusterer.foo=1",
+        "clusterer=1",
+        "clusterer.eps=0.1,0.2",
+        "clusterer.eps=${preprocessor.voxel_size}",
+        "clusterer.eps=choice(0.1,0.2)",
+    ],
+)
+def test_load_config_defers_to_hydra(override):
+    assert load_config([override]) is None
+
+
+def test_import_time_budget():
+    code = (
+        "import open3d, sys\n"
+        "import main, src.open3d_pc.point_cloud_batch\n"
+        f"print([m for m in {LAZY_MODULES!r} if m in sys.modules])"
+    )
+    # Imports are only timed in a fresh interpreter, started from a fixed argv.
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "[]"
+    # Every line of -X importtime is "self | cumulative | module" in microseconds.
+    lines = re.findall(r"\|\s+(\d+) \|\s+(\S+)$", result.stderr, re.MULTILINE)
+    cumulative = {name: int(us) for us, name in lines}
+    elapsed = cumulative["main"] + cumulative["src.open3d_pc.point_cloud_batch"]
+    assert elapsed / 1e6 < IMPORT_TIME_BUDGET
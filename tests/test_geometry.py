@@ -0,0 +1,60 @@
+import numpy as np
+import open3d as o3d
+import pytest
+
+from src.open3d_pc.geometry import (
+    get_array,
+    has_array,
+    is_tensor,
+    make_pointcloud,
+    point_count,
+    set_array,
+    to_legacy,
+)
+
+
+@pytest.mark.parametrize("float32", [False, True])
+def test_make_pointcloud_and_get_arrays(float32):
+    points = np.random.rand(20, 3)
+    colors = np.random.rand(20, 3)
+
+    pcd = make_pointcloud(points, colors=colors, float32=float32)
+
+    dtype = np.float32 if float32 else np.float64
+    assert is_tensor(pcd) == float32
+    assert point_count(pcd) == 20
+    assert get_array(pcd).dtype == dtype
+    assert np.allclose(get_array(pcd), points, atol=1e-6)
+    assert np.allclose(get_array(pcd, "colors"), colors, atol=1e-6)
+    assert not has_array(pcd, "normals")
+    assert get_array(pcd, "normals") is None
+
+    set_array(pcd, "normals", np.tile([0.0, 0.0, 1.0], (20, 1)))
+    assert get_array(pcd, "normals").dtype == dtype
+    assert np.allclose(np.asarray(to_legacy(pcd).normals), [0.0, 0.0, 1.0])
+
+
+def test_get_array_shares_tensor_memory():
+    pcd = make_pointcloud(np.random.rand(10, 3), float32=True)
+
+    get_array(pcd)[0] = 5.0
+
+    assert np.allclose(pcd.point.positions.numpy()[0], 5.0)
+
+
+def test_set_array_copies_read_only_views():
+    points = np.random.rand(10, 3).astype(np.float32)
+    points.flags.writeable = False
+
+    pcd = make_pointcloud(points, float32=True)
+    legacy = make_pointcloud(points)
+
+    assert not np.shares_memory(get_array(pcd), points)
+    assert get_array(pcd).flags.writeable
+    assert np.allclose(np.asarray(legacy.points), points)
+
+
+def test_empty_pointclouds():
+    for pcd in (o3d.geometry.PointCloud(), o3d.t.geometry.PointCloud()):
+        assert point_count(pcd) == 0
+        assert get_array(pcd).shape == (0, 3)
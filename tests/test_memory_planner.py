@@ -0,0 +1,137 @@
+import numpy as np
+import open3d as o3d
+import pytest
+
+from src.open3d_pc.memory_planner import MemoryPlanner, estimate_neighbors
+from src.open3d_pc.point_cloud_clusterer import PointCloudClusterer
+from src.open3d_pc.point_cloud_loader import PointCloudLoader
+from src.open3d_pc.point_cloud_pipeline import PointCloudPipeline
+from src.open3d_pc.point_cloud_preprocessor import PointCloudPreprocessor
+
+
+def make_planner(max_memory, **preprocessor_cfg):
+    return MemoryPlanner(
+        max_memory,
+        PointCloudPreprocessor(**preprocessor_cfg),
+        PointCloudClusterer(eps=0.05, min_points=5),
+    )
+
+
+def test_invalid_max_memory():
+    with pytest.raises(ValueError, match="max_memory must be positive"):
+        make_planner(0)
+
+
+def test_plan_load_streams_when_over_budget(synthetic_pcd, tmp_path):
+    path = str(tmp_path / "sample.npy")
+    np.save(path, np.asarray(synthetic_pcd.points))
+    loader = PointCloudLoader(path=path)
+
+    fits = make_planner(1 << 30).plan_load(loader)
+    streamed = make_planner(50_000).plan_load(loader)
+
+    assert fits.n_points == streamed.n_points == 500
+    assert fits.chunk_size is None
+    assert not fits.decisions
+    assert streamed.chunk_size is not None
+    assert streamed.load_bytes > 50_000
+
+
+def test_plan_load_keeps_whole_cloud_with_target(synthetic_pcd, tmp_path):
+    path = str(tmp_path / "sample.npy")
+    np.save(path, np.asarray(synthetic_pcd.points))
+
+    plan = make_planner(50_000, target_points=100).plan_load(
+        PointCloudLoader(path=path)
+    )
+
+    assert plan.chunk_size is None
+    assert "need the whole cloud" in plan.decisions[0]
+
+
+def test_plan_processing_skips_graph_and_tiles(synthetic_pcd):
+    planner = make_planner(10_000, normal_radius=0.1)
+    plan = planner.plan_load(PointCloudLoader(path=None, chunk_size=100))
+
+    radius = planner.plan_processing(plan, synthetic_pcd, neighbor_radius=0.05)
+
+    assert radius is None
+    assert not plan.share_neighbor_graph
+    assert planner.preprocessor.normal_tile_size == plan.normal_tile_size
+    assert planner.clusterer.tile_size == plan.cluster_tile_size
+    assert plan.cluster_tile_size >= 4 * planner.clusterer.eps
+
+    plan.restore()
+
+    assert planner.preprocessor.normal_tile_size is None
+    assert planner.clusterer.tile_size is None
+
+
+def test_plan_processing_keeps_graph_within_budget(synthetic_pcd):
+    planner = make_planner(1 << 30)
+    plan = planner.plan_load(PointCloudLoader(path=None, chunk_size=100))
+
+    radius = planner.plan_processing(plan, synthetic_pcd, neighbor_radius=0.05)
+
+    assert radius == 0.05
+    assert plan.share_neighbor_graph
+    assert plan.neighbors >= 1
+    assert plan.normal_tile_size is None
+    assert plan.cluster_tile_size is None
+
+
+def test_plan_processing_does_not_tile_other_backends(synthetic_pcd):
+    planner = MemoryPlanner(
+        10_000,
+        PointCloudPreprocessor(),
+        PointCloudClusterer(eps=0.05, min_points=5, backend="grid"),
+    )
+    plan = planner.plan_load(PointCloudLoader(path=None, chunk_size=100))
+
+    planner.plan_processing(plan, synthetic_pcd, neighbor_radius=None)
+
+    assert plan.cluster_tile_size is None
+    assert planner.clusterer.tile_size is None
+
+
+def test_estimate_neighbors_matches_exact_count():
+    points = np.random.default_rng(0).random((100_000, 3))
+    tree = o3d.geometry.KDTreeFlann(
+        o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points[:2000]))
+    )
+    exact = np.mean(
+        [tree.search_radius_vector_3d(point, 0.05)[0] for point in points[:2000]]
+    )
+
+    estimate = estimate_neighbors(points, 0.05)
+
+    # The exact count of the first 2000 points scales with the density.
+    assert estimate == pytest.approx(1 + (exact - 1) * 50, rel=0.15)
+
+
+def test_pipeline_with_small_max_memory(synthetic_clustered_pcd, tmp_path):
+    path = tmp_path / "input.npy"
+    np.save(path, np.asarray(synthetic_clustered_pcd.points))
+    cfg = {
+        "loader": {"path": str(path)},
+        "preprocessor": {"voxel_size": 0.005},
+        "clusterer": {"eps": 0.108, "min_points": 5},
+        "cluster_output": {},
+    }
+    expected = PointCloudPipeline.from_config(cfg).run()[1]
+    pipeline = PointCloudPipeline.from_config(
+        {**cfg, "pipeline": {"max_memory": 20_000}}
+    )
+
+    _, labels, report = pipeline.run(return_report=True)
+
+    names = [stage["name"] for stage in report["stages"]]
+    plan = report["memory_plan"]
+    assert "load_downsample" in names
+    assert "neighbor_graph" not in names
+    assert plan["chunk_size"] is not None
+    assert plan["cluster_tile_size"] is not None
+    assert labels.max() + 1 == expected.max() + 1 == 3
+    assert pipeline.clusterer.tile_size is None
+    assert pipeline.loader.chunk_size is None
+    assert not pipeline.loader.mmap
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from src.open3d_pc.neighbor_graph import NeighborGraph
+
+
+def test_build_matches_brute_force(synthetic_pcd):
+    points = np.asarray(synthetic_pcd.points)
+    graph = NeighborGraph.from_pointcloud(synthetic_pcd, radius=0.2)
+
+    sq_distances = ((points[:, None] - points[None]) ** 2).sum(axis=-1)
+    assert graph.n_points == len(points)
+    assert np.array_equal(graph.counts(), (sq_distances <= 0.04).sum(axis=1))
+    row = graph.indices[graph.offsets[7] : graph.offsets[8]]
+    assert row[0] == 7
+    assert np.all(np.diff(graph.sq_distances[graph.offsets[7] : graph.offsets[8]]) >= 0)
+    assert set(row) == set(np.flatnonzero(sq_distances[7] <= 0.04))
+
+
+def test_restrict(synthetic_pcd):
+    graph = NeighborGraph.from_pointcloud(synthetic_pcd, radius=0.2)
+
+    smaller = graph.restrict(0.1)
+    expected = NeighborGraph.from_pointcloud(synthetic_pcd, radius=0.1)
+    assert np.array_equal(smaller.counts(), expected.counts())
+
+    capped = graph.restrict(0.2, max_nn=5)
+    assert capped.counts().max() == 5
+    assert np.array_equal(capped.counts(), np.minimum(graph.counts(), 5))
+    assert np.array_equal(
+        capped.indices[capped.offsets[3] : capped.offsets[4]],
+        graph.indices[graph.offsets[3] : graph.offsets[3] + capped.counts()[3]],
+    )
+
+
+def test_restrict_larger_radius(synthetic_pcd):
+    graph = NeighborGraph.from_pointcloud(synthetic_pcd, radius=0.1)
+
+    with pytest.raises(ValueError, match="smaller than the required radius"):
+        graph.restrict(0.2)
+
+
+def test_subset(synthetic_pcd):
+    points = np.asarray(synthetic_pcd.points)
+    graph = NeighborGraph.build(points, radius=0.2)
+    keep = np.arange(len(points)) % 3 != 0
+
+    subset = graph.subset(keep)
+    expected = NeighborGraph.build(points[keep], radius=0.2)
+    assert subset.n_points == keep.sum()
+    assert np.array_equal(subset.counts(), expected.counts())
+    assert np.array_equal(subset.indices[subset.offsets[:-1]], np.arange(keep.sum()))
+    assert np.array_equal(np.sort(subset.sq_distances), np.sort(expected.sq_distances))
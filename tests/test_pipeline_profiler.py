@@ -0,0 +1,204 @@
+import json
+
+import numpy as np
+import open3d as o3d
+
+from src.open3d_pc.pipeline_profiler import PipelineProfiler, ProfilerHook
+from src.open3d_pc.point_cloud_pipeline import PointCloudPipeline
+
+
+class RecordingHook(ProfilerHook):
+    def __init__(self):
+        self.stages = []
+        self.reports = []
+
+    def on_stage_end(self, metrics):
+        self.stages.append(metrics.name)
+
+    def on_report(self, report):
+        self.reports.append(report)
+
+
+def test_stage_records_metrics():
+    hook = RecordingHook()
+    profiler = PipelineProfiler(hooks=[hook])
+
+    with profiler.stage("work", points_in=10) as metrics:
+        sum(range(10000))
+        metrics.points_out = 5
+    report = profiler.finish()
+
+    assert hook.stages == ["work"]
+    assert hook.reports == [report]
+    stage = report["stages"][0]
+    assert stage["name"] == "work"
+    assert stage["points_in"] == 10
+    assert stage["points_out"] == 5
+    assert stage["wall_time"] > 0
+    assert report["total_wall_time"] == stage["wall_time"]
+
+
+def test_write_json_and_chrome_trace(tmp_path):
+    profiler = PipelineProfiler()
+    with profiler.stage("a"):
+        pass
+    with profiler.stage("b"):
+        pass
+
+    profiler.write_json(tmp_path / "report.json")
+    profiler.write_chrome_trace(tmp_path / "trace.json")
+
+    report = json.loads((tmp_path / "report.json").read_text())
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    assert [stage["name"] for stage in report["stages"]] == ["a", "b"]
+    assert [event["name"] for event in trace["traceEvents"]] == ["a", "b"]
+    assert all(event["ph"] == "X" for event in trace["traceEvents"])
+
+
+def test_pipeline_run_returns_report(synthetic_clustered_pcd, tmp_path):
+    path = tmp_path / "input.ply"
+    o3d.io.write_point_cloud(str(path), synthetic_clustered_pcd)
+    hook = RecordingHook()
+    pipeline = PointCloudPipeline(
+        loader_cfg={"path": str(path)},
+        preprocessor_cfg={"voxel_size": 0.005},
+        clusterer_cfg={"min_points": 5},
+        cluster_output_cfg={"save_clusters": True, "output_dir": str(tmp_path)},
+        profiling_cfg={"trace_path": str(tmp_path / "trace.json")},
+        profiler_hooks=[hook],
+    )
+
+    pcd, labels, report = pipeline.run(return_report=True)
+
+    names = [stage["name"] for stage in report["stages"]]
+    assert names == [
+        "load",
+        "downsample",
+        "neighbor_graph",
+        "normals",
+        "dbscan",
+        "save_clusters",
+    ]
+    assert hook.stages == names
+    assert report["stages"][0]["points_out"] == 150
+    assert report["stages"][4]["points_in"] == len(pcd.points)
+    assert pipeline.report == report
+    assert (tmp_path / "trace.json").is_file()
+
+
+def test_pipeline_run_with_fetched_input(synthetic_clustered_pcd, tmp_path):
+    path = tmp_path / "input.ply"
+    o3d.io.write_point_cloud(str(path), synthetic_clustered_pcd)
+    hook = RecordingHook()
+    pipeline = PointCloudPipeline(
+        loader_cfg={},
+        preprocessor_cfg={"voxel_size": 0.005},
+        clusterer_cfg={"min_points": 5},
+        cluster_output_cfg={},
+        profiler_hooks=[hook],
+    )
+
+    loaded = pipeline.fetch(path)
+    pcd, labels, report = pipeline.run(loaded=loaded, return_report=True)
+
+    assert pipeline.loader.path == str(path)
+    assert pipeline.loader.n_points == 150
+    assert labels.max() + 1 == 3
+    names = [stage["name"] for stage in report["stages"]]
+    assert names[0] == "load"
+    assert hook.stages == names
+    # The load ran before the run's profiler was created.
+    assert report["stages"][0]["start"] < report["stages"][1]["start"]
+
+
+def test_pipeline_float32_matches_float64(synthetic_clustered_pcd, tmp_path):
+    path = tmp_path / "input.ply"
+    o3d.io.write_point_cloud(str(path), synthetic_clustered_pcd)
+    results = []
+    for float32 in (False, True):
+        pipeline = PointCloudPipeline(
+            loader_cfg={"path": str(path)},
+            preprocessor_cfg={"voxel_size": 0.005},
+            clusterer_cfg={"min_points": 5},
+            cluster_output_cfg={},
+            pipeline_cfg={"float32": float32},
+        )
+        results.append(pipeline.run())
+
+    (expected, expected_labels), (pcd, labels) = results
+    assert isinstance(pcd, o3d.t.geometry.PointCloud)
+    assert pcd.point.positions.dtype == o3d.core.float32
+    assert len(pcd.point.positions) == len(expected.points)
+    assert labels.max() == expected_labels.max() == 2
+
+
+def test_pipeline_tiled_normals_skip_neighbor_graph(synthetic_clustered_pcd, tmp_path):
+    path = tmp_path / "input.ply"
+    o3d.io.write_point_cloud(str(path), synthetic_clustered_pcd)
+    pipeline = PointCloudPipeline(
+        loader_cfg={"path": str(path)},
+        preprocessor_cfg={"voxel_size": 0.005, "normal_tile_size": 0.5, "n_jobs": 1},
+        clusterer_cfg={"min_points": 5},
+        cluster_output_cfg={},
+    )
+
+    pcd, labels, report = pipeline.run(return_report=True)
+
+    names = [stage["name"] for stage in report["stages"]]
+    assert "neighbor_graph" not in names
+    assert pcd.has_normals()
+    assert labels.max() + 1 == 3
+
+
+def test_pipeline_coarse_to_fine_skips_neighbor_graph(
+    synthetic_clustered_pcd, tmp_path
+):
+    path = tmp_path / "input.ply"
+    o3d.io.write_point_cloud(str(path), synthetic_clustered_pcd)
+    pipeline = PointCloudPipeline(
+        loader_cfg={"path": str(path)},
+        preprocessor_cfg={"voxel_size": 0.005},
+        clusterer_cfg={"min_points": 5, "coarse_to_fine": True},
+        cluster_output_cfg={},
+    )
+
+    _, labels, report = pipeline.run(return_report=True)
+
+    names = [stage["name"] for stage in report["stages"]]
+    assert "neighbor_graph" not in names
+    assert labels.max() + 1 == 3
+
+
+def test_pipeline_grid_backend_skips_neighbor_graph(synthetic_clustered_pcd, tmp_path):
+    path = tmp_path / "input.ply"
+    o3d.io.write_point_cloud(str(path), synthetic_clustered_pcd)
+    pipeline = PointCloudPipeline(
+        loader_cfg={"path": str(path)},
+        preprocessor_cfg={"voxel_size": 0.005},
+        clusterer_cfg={"min_points": 5, "backend": "grid"},
+        cluster_output_cfg={},
+    )
+
+    _, labels, report = pipeline.run(return_report=True)
+
+    names = [stage["name"] for stage in report["stages"]]
+    assert "neighbor_graph" not in names
+    assert labels.max() + 1 == 3
+
+
+def test_pipeline_writes_cluster_summary(synthetic_clustered_pcd, tmp_path):
+    path = tmp_path / "input.ply"
+    o3d.io.write_point_cloud(str(path), synthetic_clustered_pcd)
+    pipeline = PointCloudPipeline(
+        loader_cfg={"path": str(path)},
+        preprocessor_cfg={"voxel_size": 0.005},
+        clusterer_cfg={"min_points": 5},
+        cluster_output_cfg={"summary_path": str(tmp_path / "summary.npy")},
+    )
+
+    _, labels, report = pipeline.run(return_report=True)
+
+    summary = np.load(tmp_path / "summary.npy")
+    assert np.array_equal(summary, pipeline.cluster_summary)
+    assert summary["n_points"].sum() == (labels >= 0).sum()
+    assert "cluster_summary" in [stage["name"] for stage in report["stages"]]
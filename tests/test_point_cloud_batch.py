@@ -0,0 +1,137 @@
+import os
+
+import open3d as o3d
+import pytest
+
+from src.open3d_pc.point_cloud_batch import PointCloudBatchProcessor, output_subdirs
+from src.open3d_pc.point_cloud_pipeline import PointCloudPipeline
+
+PIPELINE_CFG = {
+    "loader": {},
+    "preprocessor": {"voxel_size": 0.005},
+    "clusterer": {"eps": 0.108, "min_points": 5},
+    "cluster_output": {"visualize": False, "save_clusters": False},
+}
+
+
+@pytest.fixture
+def scan_dir(synthetic_clustered_pcd, tmp_path):
+    for i in range(3):
+        o3d.io.write_point_cloud(
+            str(tmp_path / f"scan_{i}.ply"), synthetic_clustered_pcd
+        )
+    (tmp_path / "notes.txt").write_text("not a point cloud")
+
+    return tmp_path
+
+
+def test_collect_files_from_directory(scan_dir):
+    files = PointCloudBatchProcessor.collect_files(scan_dir)
+
+    assert [f.rsplit("/", 1)[-1] for f in files] == [
+        "scan_0.ply",
+        "scan_1.ply",
+        "scan_2.ply",
+    ]
+
+
+def test_collect_files_from_glob(scan_dir):
+    files = PointCloudBatchProcessor.collect_files(scan_dir / "scan_1.*")
+
+    assert len(files) == 1
+
+
+def test_collect_files_none_found(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        PointCloudBatchProcessor.collect_files(tmp_path)
+
+
+def test_run_isolates_failures(scan_dir):
+    batch = PointCloudBatchProcessor(PIPELINE_CFG, num_workers=2)
+    paths = PointCloudBatchProcessor.collect_files(scan_dir)
+    paths.append(str(scan_dir / "missing.ply"))
+
+    results = {result.path: result for result in batch.run(paths)}
+
+    assert len(results) == 4
+    assert not results[paths[-1]].ok
+    assert "FileNotFoundError" in results[paths[-1]].error
+    for path in paths[:-1]:
+        assert results[path].ok
+        assert results[path].n_clusters == 3
+        assert len(results[path].labels) == results[path].n_processed_points
+
+    assert batch.summary.n_files == 4
+    assert batch.summary.n_failed == 1
+    assert batch.summary.n_points == 3 * 150
+    assert batch.summary.points_per_second > 0
+
+
+def test_run_survives_worker_crash(scan_dir, monkeypatch):
+    run = PointCloudPipeline.run
+
+    def crashing_run(self, path=None, *args, **kwargs):
+        if path is not None and os.path.basename(path) == "crash.ply":
+            os._exit(1)
+        return run(self, path, *args, **kwargs)
+
+    # Forked workers inherit the patched pipeline.
+    monkeypatch.setattr(PointCloudPipeline, "run", crashing_run)
+    crash = scan_dir / "crash.ply"
+    crash.write_bytes((scan_dir / "scan_0.ply").read_bytes())
+    paths = PointCloudBatchProcessor.collect_files(scan_dir)
+    batch = PointCloudBatchProcessor(PIPELINE_CFG, num_workers=2, start_method="fork")
+
+    results = {result.path: result for result in batch.run(paths)}
+
+    assert len(results) == 4
+    assert "BrokenProcessPool" in results[str(crash)].error
+    for path in paths:
+        if path != str(crash):
+            assert results[path].ok
+            assert results[path].n_clusters == 3
+    assert batch.summary.failed == [str(crash)]
+
+
+def test_output_subdirs_keep_same_named_files_apart(tmp_path):
+    paths = [
+        str(tmp_path / "a" / "scan.ply"),
+        str(tmp_path / "b" / "scan.ply"),
+        str(tmp_path / "b" / "scan.xyz"),
+        str(tmp_path / "b" / "other.ply"),
+    ]
+
+    names = output_subdirs(paths)
+
+    assert [str(names[path]) for path in paths] == [
+        "a/scan",
+        "b/scan_ply",
+        "b/scan_xyz",
+        "b/other",
+    ]
+
+
+def test_run_saves_same_named_files_apart(synthetic_clustered_pcd, tmp_path):
+    paths = []
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        paths.append(str(tmp_path / name / "scan.ply"))
+        o3d.io.write_point_cloud(paths[-1], synthetic_clustered_pcd)
+    cfg = dict(
+        PIPELINE_CFG,
+        cluster_output={"save_clusters": True, "output_dir": str(tmp_path / "out")},
+    )
+
+    results = list(PointCloudBatchProcessor(cfg, num_workers=2).run(paths))
+
+    assert all(result.ok for result in results)
+    for name in ("a", "b"):
+        assert len(list((tmp_path / "out" / name / "scan").glob("*.ply"))) == 3
+
+
+def test_from_config():
+    cfg = dict(PIPELINE_CFG, batch={"num_workers": 3})
+    batch = PointCloudBatchProcessor.from_config(cfg)
+
+    assert batch.num_workers == 3
+    assert "batch" not in batch.pipeline_cfg
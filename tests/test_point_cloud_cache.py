@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+import open3d as o3d
+import pytest
+
+from src.open3d_pc.point_cloud_cache import PointCloudCache
+from src.open3d_pc.point_cloud_pipeline import PointCloudPipeline
+
+PARAMS = {"voxel_size": 0.05, "normal_radius": 0.1, "normal_max_nn": 30}
+
+
+@pytest.fixture
+def input_path(synthetic_clustered_pcd, tmp_path):
+    path = tmp_path / "input.ply"
+    o3d.io.write_point_cloud(str(path), synthetic_clustered_pcd)
+
+    return path
+
+
+def test_put_and_get(synthetic_pcd, input_path, tmp_path):
+    cache = PointCloudCache(tmp_path / "cache")
+    synthetic_pcd.estimate_normals()
+    key = cache.make_key(input_path, PARAMS)
+
+    assert cache.get(key) is None
+    cache.put(key, synthetic_pcd, metadata={"n_points": 500})
+    pcd, metadata = cache.get(key)
+
+    assert np.allclose(np.asarray(pcd.points), np.asarray(synthetic_pcd.points))
+    assert np.allclose(np.asarray(pcd.normals), np.asarray(synthetic_pcd.normals))
+    assert metadata == {"n_points": 500}
+
+
+def test_put_and_get_float32(synthetic_pcd, input_path, tmp_path):
+    cache = PointCloudCache(tmp_path / "cache")
+    synthetic_pcd.estimate_normals()
+    tensor_pcd = o3d.t.geometry.PointCloud.from_legacy(synthetic_pcd, o3d.core.float32)
+    key = cache.make_key(input_path, PARAMS)
+
+    cache.put(key, tensor_pcd)
+    pcd, _ = cache.get(key)
+
+    assert isinstance(pcd, o3d.t.geometry.PointCloud)
+    assert pcd.point.positions.dtype == o3d.core.float32
+    assert np.array_equal(pcd.point.normals.numpy(), tensor_pcd.point.normals.numpy())
+
+
+def test_key_depends_on_content_and_params(input_path, tmp_path):
+    cache = PointCloudCache(tmp_path / "cache")
+    key = cache.make_key(input_path, PARAMS)
+
+    assert cache.make_key(input_path, PARAMS) == key
+    assert cache.make_key(input_path, dict(PARAMS, voxel_size=0.02)) != key
+
+    input_path.write_bytes(input_path.read_bytes() + b"\n")
+    assert cache.make_key(input_path, PARAMS) != key
+
+
+def test_evicts_least_recently_used(synthetic_pcd, tmp_path):
+    cache = PointCloudCache(tmp_path / "cache")
+    for key in ("a", "b"):
+        cache.put(key, synthetic_pcd)
+    entry_size = (tmp_path / "cache" / "a.npz").stat().st_size
+    os.utime(tmp_path / "cache" / "a.npz", ns=(0, 0))
+
+    cache.max_bytes = 2 * entry_size
+    cache.put("c", synthetic_pcd)
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.get("c") is not None
+
+
+def test_invalidate(synthetic_pcd, input_path, tmp_path):
+    cache = PointCloudCache(tmp_path / "cache")
+    cache.put(cache.make_key(input_path, PARAMS), synthetic_pcd)
+    cache.put(cache.make_key(input_path, dict(PARAMS, voxel_size=0.02)), synthetic_pcd)
+    cache.put("other", synthetic_pcd)
+
+    assert cache.invalidate(path=input_path) == 2
+    assert cache.invalidate() == 1
+
+
+def test_pipeline_warm_run_skips_preprocessing(input_path, tmp_path, monkeypatch):
+    cfg = {
+        "loader": {"path": str(input_path)},
+        "preprocessor": {"voxel_size": 0.005},
+        "clusterer": {"min_points": 5},
+        "cluster_output": {"visualize": False},
+        "cache": {"enabled": True, "dir": str(tmp_path / "cache")},
+    }
+    cold_pcd, cold_labels = PointCloudPipeline.from_config(cfg).run()
+
+    warm_pipeline = PointCloudPipeline.from_config(cfg)
+    monkeypatch.setattr(
+        warm_pipeline.loader,
+        "load",
+        lambda: pytest.fail("loader should not run on a warm cache"),
+    )
+    warm_pcd, warm_labels = warm_pipeline.run()
+
+    assert np.allclose(np.asarray(warm_pcd.points), np.asarray(cold_pcd.points))
+    assert np.array_equal(warm_labels, cold_labels)
+    assert warm_pipeline.loader.n_points == 150
+
+
+def test_pipeline_caches_streamed_input_apart(input_path, tmp_path):
+    cfg = {
+        "loader": {"path": str(input_path)},
+        "preprocessor": {"voxel_size": 0.005},
+        "clusterer": {"min_points": 5},
+        "cluster_output": {"visualize": False},
+        "cache": {"enabled": True, "dir": str(tmp_path / "cache")},
+    }
+    streamed_cfg = {**cfg, "loader": {**cfg["loader"], "chunk_size": 50}}
+    PointCloudPipeline.from_config(streamed_cfg).run()
+
+    _, _, report = PointCloudPipeline.from_config(cfg).run(return_report=True)
+
+    assert "load" in [stage["name"] for stage in report["stages"]]
+    assert len(list((tmp_path / "cache").glob("*.npz"))) == 2
+
+
+def test_pipeline_caches_normals_methods_apart(input_path, tmp_path):
+    cfg = {
+        "loader": {"path": str(input_path)},
+        "preprocessor": {"voxel_size": 0.005},
+        "clusterer": {"min_points": 5},
+        "cluster_output": {"visualize": False},
+        "cache": {"enabled": True, "dir": str(tmp_path / "cache")},
+    }
+    PointCloudPipeline.from_config(cfg).run()
+
+    _, _, report = PointCloudPipeline.from_config(
+        {**cfg, "pipeline": {"share_neighbor_graph": False}}
+    ).run(return_report=True)
+
+    assert "load" in [stage["name"] for stage in report["stages"]]
+    assert len(list((tmp_path / "cache").glob("*.npz"))) == 2
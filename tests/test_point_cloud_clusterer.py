@@ -1,7 +1,11 @@
 import numpy as np
 import open3d as o3d
+import pytest
 
+from src.open3d_pc import neighbor_graph, point_cloud_clusterer
+from src.open3d_pc.neighbor_graph import NeighborGraph
 from src.open3d_pc.point_cloud_clusterer import PointCloudClusterer
+from src.open3d_pc.spatial import radius_search
 
 
 def test_cluster_multiple_clusters(synthetic_clustered_pcd):
@@ -32,6 +36,22 @@ def test_colorize_clusters(synthetic_clustered_pcd):
     assert len(unique_colors) == labels.max() + 1
 
 
+def test_cluster_tensor_pointcloud_matches_legacy(synthetic_clustered_pcd):
+    clusterer = PointCloudClusterer(min_points=5)
+    pcd = o3d.t.geometry.PointCloud.from_legacy(
+        synthetic_clustered_pcd, o3d.core.float32
+    )
+
+    expected, _ = clusterer.cluster(synthetic_clustered_pcd)
+    labels, clustered_pcd = clusterer.cluster(pcd)
+    clusterer._colorize_clusters(clustered_pcd, labels, labels.max() + 1)
+
+    assert np.array_equal(labels, expected)
+    assert clustered_pcd is pcd
+    assert pcd.point.colors.dtype == o3d.core.float32
+    assert len(np.unique(pcd.point.colors.numpy()[labels >= 0], axis=0)) == 3
+
+
 def test_save_clusters(synthetic_clustered_pcd, tmp_path):
     clusterer = PointCloudClusterer()
     output_dir = tmp_path / "clusters"
@@ -47,3 +67,216 @@ def test_save_clusters(synthetic_clustered_pcd, tmp_path):
     for file in output_files:
         assert file.is_file()
         assert file.stat().st_size > 0
+
+
+def test_cluster_tiled_matches_global(synthetic_clustered_pcd):
+    global_labels, _ = PointCloudClusterer().cluster(synthetic_clustered_pcd)
+    tiled_labels, _ = PointCloudClusterer(tile_size=0.3, n_jobs=2).cluster(
+        synthetic_clustered_pcd
+    )
+
+    assert len(tiled_labels) == len(global_labels)
+    assert np.array_equal(tiled_labels < 0, global_labels < 0)
+    # Same partition up to a permutation of the cluster ids
+    pairs = set(zip(tiled_labels, global_labels, strict=True))
+    assert len(pairs) == len(np.unique(global_labels))
+
+
+def test_cluster_tiled_merges_across_tiles():
+    # A dense line crossing many tiles must stay a single cluster
+    points = np.zeros((400, 3))
+    points[:, 0] = np.linspace(0, 2, 400)
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+
+    labels, _ = PointCloudClusterer(eps=0.05, min_points=3, tile_size=0.1).cluster(pcd)
+
+    assert (labels == 0).all()
+
+
+def test_cluster_tiled_all_noise(synthetic_pcd):
+    labels, _ = PointCloudClusterer(eps=0.001, tile_size=0.3).cluster(synthetic_pcd)
+
+    assert (labels == -1).all()
+
+
+def test_cluster_coarse_to_fine_matches_global(synthetic_clustered_pcd):
+    global_labels, _ = PointCloudClusterer(min_points=5).cluster(
+        synthetic_clustered_pcd
+    )
+    labels, _ = PointCloudClusterer(min_points=5, coarse_to_fine=True).cluster(
+        synthetic_clustered_pcd
+    )
+
+    assert np.array_equal(labels < 0, global_labels < 0)
+    pairs = set(zip(labels, global_labels, strict=True))
+    assert len(pairs) == len(np.unique(global_labels))
+
+
+def test_cluster_coarse_to_fine_refines_only_ambiguous_cells(monkeypatch):
+    # Dense patches, two of them touching, in sparse background noise
+    rng = np.random.default_rng(0)
+    patches = [
+        np.column_stack([rng.uniform(x, x + 1, 20_000), rng.uniform(0, 1, 20_000)])
+        for x in (0, 1.01, 3)
+    ]
+    points = np.vstack(
+        [np.column_stack([*patch.T, np.zeros(len(patch))]) for patch in patches]
+        + [rng.uniform(-1, 5, size=(300, 3))]
+    )
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+    n_queries = []
+
+    def counting_radius_search(points, queries, radius, sort=False):
+        n_queries.append(len(queries))
+        return radius_search(points, queries, radius, sort)
+
+    monkeypatch.setattr(point_cloud_clusterer, "radius_search", counting_radius_search)
+    clusterer = PointCloudClusterer(eps=0.05, min_points=10, coarse_to_fine=True)
+
+    labels, _ = clusterer.cluster(pcd)
+    global_labels, _ = PointCloudClusterer(eps=0.05, min_points=10).cluster(pcd)
+
+    offsets, _, _ = radius_search(points, points, 0.05)
+    core = np.diff(offsets) >= 10
+    pairs = set(zip(labels[core], global_labels[core], strict=True))
+    assert len(pairs) == len(np.unique(global_labels[core])) == 2
+    assert np.array_equal(labels < 0, global_labels < 0)
+    assert sum(n_queries) < len(points) / 2
+
+
+def test_cluster_coarse_to_fine_separates_distant_objects():
+    # Two dense slabs three coarse cells apart, closer than eps to nothing else
+    rng = np.random.default_rng(0)
+    points = np.vstack(
+        [rng.uniform([x, 0, 0], [x + 1, 1, 0.02], size=(20_000, 3)) for x in (0, 1.6)]
+    )
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+
+    labels, _ = PointCloudClusterer(
+        eps=0.05, min_points=10, coarse_to_fine=True, coarse_cell_size=0.2
+    ).cluster(pcd)
+
+    assert labels.max() == 1
+    assert len(np.unique(labels[:20_000])) == len(np.unique(labels[20_000:])) == 1
+    assert labels[0] != labels[-1]
+
+
+def test_cluster_coarse_to_fine_rejects_small_cells(synthetic_clustered_pcd):
+    clusterer = PointCloudClusterer(eps=0.1, coarse_to_fine=True, coarse_cell_size=0.05)
+
+    with pytest.raises(ValueError, match="coarse_cell_size"):
+        clusterer.cluster(synthetic_clustered_pcd)
+
+
+def test_cluster_coarse_to_fine_tensor_pointcloud(synthetic_clustered_pcd):
+    clusterer = PointCloudClusterer(min_points=5, coarse_to_fine=True)
+    pcd = o3d.t.geometry.PointCloud.from_legacy(
+        synthetic_clustered_pcd, o3d.core.float32
+    )
+
+    expected, _ = clusterer.cluster(synthetic_clustered_pcd)
+    labels, _ = clusterer.cluster(pcd)
+
+    assert np.array_equal(labels, expected)
+
+
+def test_cluster_coarse_to_fine_all_noise(synthetic_pcd):
+    labels, _ = PointCloudClusterer(eps=0.001, coarse_to_fine=True).cluster(
+        synthetic_pcd
+    )
+
+    assert (labels == -1).all()
+
+
+@pytest.mark.parametrize("backend", ["grid", "voxel"])
+def test_cluster_backend(backend, synthetic_clustered_pcd):
+    clusterer = PointCloudClusterer(eps=0.1, min_points=5, backend=backend)
+    graph = NeighborGraph.from_pointcloud(synthetic_clustered_pcd, radius=0.1)
+
+    labels, _ = clusterer.cluster(synthetic_clustered_pcd, neighbor_graph=graph)
+
+    assert labels.max() + 1 == 3
+
+
+def test_cluster_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown clustering backend"):
+        PointCloudClusterer(backend="unknown")
+
+
+def test_cluster_neighbor_graph_matches_global(synthetic_clustered_pcd):
+    clusterer = PointCloudClusterer()
+    graph = NeighborGraph.from_pointcloud(synthetic_clustered_pcd, radius=0.2)
+
+    global_labels, _ = clusterer.cluster(synthetic_clustered_pcd)
+    graph_labels, _ = clusterer.cluster(synthetic_clustered_pcd, neighbor_graph=graph)
+
+    assert np.array_equal(graph_labels < 0, global_labels < 0)
+    pairs = set(zip(graph_labels, global_labels, strict=True))
+    assert len(pairs) == len(np.unique(global_labels))
+
+
+def test_cluster_neighbor_graph_core_points_match_global():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 1, size=(2000, 3))
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+    clusterer = PointCloudClusterer(eps=0.08, min_points=8)
+    graph = NeighborGraph.from_pointcloud(pcd, radius=0.08)
+
+    global_labels, _ = clusterer.cluster(pcd)
+    graph_labels, _ = clusterer.cluster(pcd, neighbor_graph=graph)
+
+    core = graph.counts() >= 8
+    pairs = set(zip(graph_labels[core], global_labels[core], strict=True))
+    assert len(pairs) == len(np.unique(global_labels[core]))
+    assert np.array_equal(graph_labels < 0, global_labels < 0)
+
+
+def test_cluster_neighbor_graph_mismatch(synthetic_pcd, synthetic_clustered_pcd):
+    graph = NeighborGraph.from_pointcloud(synthetic_clustered_pcd, radius=0.2)
+
+    with pytest.raises(ValueError, match="Neighbour graph has 150 points"):
+        PointCloudClusterer().cluster(synthetic_pcd, neighbor_graph=graph)
+
+
+def test_sweep_matches_individual_runs(monkeypatch):
+    rng = np.random.default_rng(0)
+    pcd = o3d.geometry.PointCloud(
+        o3d.utility.Vector3dVector(rng.uniform(0, 1, size=(1000, 3)))
+    )
+    params = [(0.1, 10), (0.05, 3), (0.1, 5), (0.08, 10)]
+    searches = []
+    radius_search = neighbor_graph.radius_search
+    monkeypatch.setattr(
+        neighbor_graph,
+        "radius_search",
+        lambda *args, **kwargs: searches.append(args[2])
+        or radius_search(*args, **kwargs),
+    )
+
+    results = PointCloudClusterer().sweep(pcd, params)
+
+    assert searches == [0.1]
+    assert [(r.eps, r.min_points) for r in results] == params
+    graph = NeighborGraph.from_pointcloud(pcd, radius=0.1)
+    for result, (eps, min_points) in zip(results, params, strict=True):
+        clusterer = PointCloudClusterer(eps=eps, min_points=min_points)
+        expected, _ = clusterer.cluster(pcd, neighbor_graph=graph)
+        assert np.array_equal(result.labels, expected)
+        assert result.n_clusters == expected.max() + 1
+        assert result.noise_fraction == (expected < 0).mean()
+
+
+def test_sweep_without_labels(synthetic_clustered_pcd):
+    (result,) = PointCloudClusterer().sweep(
+        synthetic_clustered_pcd, [(0.108, 20)], keep_labels=False
+    )
+
+    assert result.labels is None
+    assert result.n_clusters == 3
+
+
+def test_sweep_invalid_params(synthetic_pcd):
+    with pytest.raises(ValueError, match="at least one"):
+        PointCloudClusterer().sweep(synthetic_pcd, [])
+    with pytest.raises(ValueError, match="Invalid DBSCAN setting"):
+        PointCloudClusterer().sweep(synthetic_pcd, [(0.0, 5)])
@@ -0,0 +1,119 @@
+import json
+
+import numpy as np
+import open3d as o3d
+import pytest
+
+from src.open3d_pc.point_cloud_columns import PointCloudColumnStore
+
+
+@pytest.fixture
+def labelled_arrays():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-5, 5, (1000, 3)) + [1000.0, 2000.0, 0.0]
+    normals = rng.normal(size=(1000, 3))
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+    colors = rng.uniform(0, 1, (1000, 3))
+    labels = np.repeat(np.arange(-1, 9), 100)
+
+    return points, normals, colors, labels
+
+
+def test_append_and_read_round_trip(labelled_arrays, tmp_path):
+    points, normals, colors, labels = labelled_arrays
+    store = PointCloudColumnStore(tmp_path / "store", chunk_size=300)
+
+    store.append(points, normals=normals, colors=colors, labels=labels)
+
+    arrays = store.read()
+    assert store.n_points == 1000
+    assert len(store.chunks) == 4
+    assert np.allclose(arrays["points"], points, atol=1e-3)
+    assert np.allclose(arrays["normals"], normals, atol=1e-3)
+    assert np.allclose(arrays["colors"] / 255, colors, atol=1 / 255)
+    assert np.array_equal(arrays["labels"], labels)
+    assert arrays["normals"].dtype == np.float16
+    assert arrays["colors"].dtype == np.uint8
+    assert arrays["labels"].dtype == np.int32
+
+
+def test_append_reopened_store(labelled_arrays, tmp_path):
+    points, normals, _, labels = labelled_arrays
+    PointCloudColumnStore(tmp_path).append(points[:600], labels=labels[:600])
+
+    store = PointCloudColumnStore(tmp_path)
+    store.append(points[600:], labels=labels[600:])
+
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert manifest["n_points"] == 1000
+    assert np.array_equal(PointCloudColumnStore(tmp_path).read()["labels"], labels)
+    with pytest.raises(ValueError, match="Cannot append columns"):
+        store.append(points, normals=normals, labels=labels)
+
+
+def test_read_selected_columns(labelled_arrays, tmp_path):
+    points, normals, colors, labels = labelled_arrays
+    store = PointCloudColumnStore(tmp_path)
+    store.append(points, normals=normals, colors=colors, labels=labels)
+
+    arrays = store.read(columns=["labels"])
+
+    assert list(arrays) == ["labels"]
+    with pytest.raises(ValueError, match="not stored"):
+        store.read(columns=["intensity"])
+
+
+def test_read_label_range_skips_chunks(labelled_arrays, tmp_path):
+    points, _, _, labels = labelled_arrays
+    store = PointCloudColumnStore(tmp_path, chunk_size=250)
+    store.append(points, labels=labels)
+    (tmp_path / store.chunks[0]["file"]).unlink()
+
+    arrays = store.read(label_range=(3, 4))
+
+    expected = (labels >= 3) & (labels <= 4)
+    assert np.array_equal(arrays["labels"], labels[expected])
+    assert np.allclose(arrays["points"], points[expected], atol=1e-3)
+    assert len(store.read(label_range=(20, 30))["points"]) == 0
+
+
+def test_large_labels_use_int32(tmp_path):
+    store = PointCloudColumnStore(tmp_path, chunk_size=2)
+    store.append(np.zeros((4, 3)), labels=np.array([0, 1, 40000, 40001]))
+
+    with np.load(tmp_path / store.chunks[0]["file"]) as chunk:
+        assert chunk["labels"].dtype == np.int16
+    with np.load(tmp_path / store.chunks[1]["file"]) as chunk:
+        assert chunk["labels"].dtype == np.int32
+    assert np.array_equal(store.read()["labels"], [0, 1, 40000, 40001])
+
+
+def test_overwrite_replaces_store(labelled_arrays, tmp_path):
+    points, _, _, labels = labelled_arrays
+    PointCloudColumnStore(tmp_path, chunk_size=300).append(points, labels=labels)
+    (tmp_path / "notes.txt").write_text("kept")
+
+    store = PointCloudColumnStore(tmp_path, mode="w")
+    store.append(points[:10])
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "chunk_000000.npz",
+        "manifest.json",
+        "notes.txt",
+    ]
+    assert store.columns == ["points"]
+
+
+def test_to_pointcloud(synthetic_pcd, tmp_path):
+    synthetic_pcd.estimate_normals()
+    store = PointCloudColumnStore(tmp_path)
+    store.append_pointcloud(synthetic_pcd, labels=np.zeros(500, dtype=int))
+
+    pcd, labels = store.to_pointcloud(float32=True)
+
+    assert isinstance(pcd, o3d.t.geometry.PointCloud)
+    assert np.allclose(
+        pcd.point.positions.numpy(), np.asarray(synthetic_pcd.points), atol=1e-6
+    )
+    assert "normals" in pcd.point
+    assert len(labels) == 500
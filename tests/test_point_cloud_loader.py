@@ -1,5 +1,6 @@
 import os
 
+import numpy as np
 import open3d as o3d
 import pytest
 
@@ -39,3 +40,166 @@ def test_load_unsupported_format(monkeypatch):
 
     with pytest.raises(ValueError):
         loader.load()
+
+
+def test_load_points_memory_maps_binary_ply(synthetic_pcd, tmp_path):
+    path = str(tmp_path / "sample.ply")
+    synthetic_pcd.estimate_normals()
+    o3d.io.write_point_cloud(path, synthetic_pcd)
+
+    loader = PointCloudLoader(path=path, mmap=True)
+    points = loader.load_points()
+
+    assert points.shape == (500, 3)
+    assert not points.flags.owndata
+    assert np.allclose(points, np.asarray(synthetic_pcd.points))
+
+    pcd = loader.load()
+    assert np.allclose(np.asarray(pcd.normals), np.asarray(synthetic_pcd.normals))
+
+
+def test_load_ascii_ply_falls_back_to_open3d(synthetic_pcd, tmp_path):
+    path = str(tmp_path / "sample.ply")
+    o3d.io.write_point_cloud(path, synthetic_pcd, write_ascii=True)
+
+    loader = PointCloudLoader(path=path, mmap=True)
+    pcd = loader.load()
+
+    assert len(pcd.points) == 500
+    with pytest.raises(ValueError, match="Cannot load points as an array"):
+        loader.load_points()
+
+
+def test_load_npy(synthetic_pcd, tmp_path):
+    path = str(tmp_path / "sample.npy")
+    np.save(path, np.asarray(synthetic_pcd.points))
+
+    loader = PointCloudLoader(path=path, mmap=True)
+    pcd = loader.load()
+
+    assert isinstance(loader.points.base, np.memmap)
+    assert np.allclose(np.asarray(pcd.points), np.asarray(synthetic_pcd.points))
+
+
+def test_load_npz_memory_maps_uncompressed_members(synthetic_pcd, tmp_path):
+    path = str(tmp_path / "sample.npz")
+    colors = np.random.rand(500, 3)
+    np.savez(path, points=np.asarray(synthetic_pcd.points), colors=colors)
+
+    loader = PointCloudLoader(path=path, mmap=True)
+    points = loader.load_points()
+    pcd = loader.to_pointcloud()
+
+    assert isinstance(points.base, np.memmap)
+    assert np.allclose(points, np.asarray(synthetic_pcd.points))
+    assert np.allclose(np.asarray(pcd.colors), colors)
+
+
+def test_load_float32_memory_maps_into_tensor_pointcloud(synthetic_pcd, tmp_path):
+    path = str(tmp_path / "sample.npz")
+    colors = np.random.randint(0, 256, (500, 3), dtype=np.uint8)
+    np.savez(path, points=np.asarray(synthetic_pcd.points), colors=colors)
+
+    pcd = PointCloudLoader(path=path, mmap=True, float32=True).load()
+
+    assert isinstance(pcd, o3d.t.geometry.PointCloud)
+    assert pcd.point.positions.dtype == o3d.core.float32
+    assert np.allclose(pcd.point.positions.numpy(), np.asarray(synthetic_pcd.points))
+    assert np.allclose(pcd.point.colors.numpy(), colors / 255)
+
+
+def test_load_float32_with_open3d_reader(synthetic_pcd, tmp_path):
+    path = str(tmp_path / "sample.ply")
+    synthetic_pcd.estimate_normals()
+    synthetic_pcd.colors = o3d.utility.Vector3dVector(np.random.rand(500, 3))
+    o3d.io.write_point_cloud(path, synthetic_pcd)
+
+    loader = PointCloudLoader(path=path, float32=True)
+    pcd = loader.load()
+
+    assert loader.n_points == 500
+    for name in ("positions", "normals", "colors"):
+        assert pcd.point[name].dtype == o3d.core.float32
+    assert np.allclose(pcd.point.normals.numpy(), np.asarray(synthetic_pcd.normals))
+    assert np.allclose(
+        pcd.point.colors.numpy(), np.asarray(synthetic_pcd.colors), atol=1 / 255
+    )
+
+
+def test_load_npz_without_points(tmp_path):
+    path = str(tmp_path / "sample.npz")
+    np.savez(path, other=np.zeros((3, 3)))
+
+    with pytest.raises(ValueError, match="No 'points' array"):
+        PointCloudLoader(path=path).load()
+
+
+def test_iter_chunks_xyz(synthetic_pcd, tmp_path):
+    path = tmp_path / "sample.xyz"
+    np.savetxt(path, np.asarray(synthetic_pcd.points))
+
+    loader = PointCloudLoader(path=str(path), chunk_size=128)
+    chunks = list(loader.iter_chunks())
+
+    assert [len(chunk) for chunk in chunks] == [128, 128, 128, 116]
+    assert np.allclose(np.vstack(chunks), np.asarray(synthetic_pcd.points))
+    assert loader.n_points == 500
+
+
+def test_iter_chunks_pts_with_count_line(tmp_path):
+    path = tmp_path / "sample.pts"
+    path.write_text("3\n0 0 0 10 255 0 0\n1 1 1 20 0 255 0\n2 2 2 30 0 0 255\n")
+
+    loader = PointCloudLoader(path=str(path))
+    chunks = list(loader.iter_chunks(chunk_size=2))
+
+    assert np.array_equal(np.vstack(chunks), [[0, 0, 0], [1, 1, 1], [2, 2, 2]])
+    min_bound, max_bound = loader.scan_bounds(chunk_size=2)
+    assert np.array_equal(min_bound, [0, 0, 0])
+    assert np.array_equal(max_bound, [2, 2, 2])
+
+
+def test_iter_chunks_invalid_chunk_size(monkeypatch):
+    monkeypatch.setattr(os.path, "exists", lambda path: True)
+    loader = PointCloudLoader(path="/path/sample.xyz")
+
+    with pytest.raises(ValueError, match="chunk_size must be positive"):
+        next(loader.iter_chunks())
+
+
+@pytest.mark.parametrize(
+    "suffix, write_ascii", [(".ply", False), (".ply", True), (".pcd", False)]
+)
+def test_inspect_reads_header(synthetic_pcd, tmp_path, suffix, write_ascii):
+    path = str(tmp_path / f"sample{suffix}")
+    synthetic_pcd.estimate_normals()
+    o3d.io.write_point_cloud(path, synthetic_pcd, write_ascii=write_ascii)
+
+    loader = PointCloudLoader(path=path)
+
+    assert loader.inspect() == (500, ["points", "normals"])
+    assert loader.pcd is None
+
+
+def test_inspect_arrays(synthetic_pcd, tmp_path):
+    points = np.asarray(synthetic_pcd.points)
+    np.save(tmp_path / "sample.npy", points)
+    np.savez_compressed(
+        tmp_path / "sample.npz", points=points, colors=np.random.rand(500, 3)
+    )
+
+    npy = PointCloudLoader(path=str(tmp_path / "sample.npy")).inspect()
+    npz = PointCloudLoader(path=str(tmp_path / "sample.npz")).inspect()
+
+    assert npy == (500, ["points"])
+    assert npz == (500, ["points", "colors"])
+
+
+def test_inspect_estimates_text_points(tmp_path):
+    path = tmp_path / "sample.xyz"
+    np.savetxt(path, np.random.rand(20_000, 3))
+
+    n_points, attributes = PointCloudLoader(path=str(path)).inspect()
+
+    assert n_points == pytest.approx(20_000, rel=0.05)
+    assert attributes == ["points"]
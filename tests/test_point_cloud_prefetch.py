@@ -0,0 +1,155 @@
+import time
+
+import open3d as o3d
+import pytest
+
+from src.open3d_pc.point_cloud_prefetch import PointCloudPrefetchExecutor
+
+PIPELINE_CFG = {
+    "loader": {},
+    "preprocessor": {"voxel_size": 0.005},
+    "clusterer": {"eps": 0.108, "min_points": 5},
+    "cluster_output": {"visualize": True, "save_clusters": False},
+}
+
+
+@pytest.fixture
+def scan_paths(synthetic_clustered_pcd, tmp_path):
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"scan_{i}.ply"
+        o3d.io.write_point_cloud(str(path), synthetic_clustered_pcd)
+        paths.append(str(path))
+
+    return paths
+
+
+def test_run_yields_results_in_order(scan_paths, tmp_path):
+    cfg = dict(PIPELINE_CFG)
+    cfg["cluster_output"] = {
+        "save_clusters": True,
+        "output_dir": str(tmp_path / "clusters"),
+    }
+    executor = PointCloudPrefetchExecutor(cfg)
+
+    results = list(executor.run(scan_paths))
+
+    assert [result.path for result in results] == scan_paths
+    for result in results:
+        assert result.ok
+        assert result.n_clusters == 3
+        assert len(result.labels) == result.n_processed_points
+    for i in range(4):
+        files = sorted((tmp_path / "clusters" / f"scan_{i}").glob("*.ply"))
+        assert [f.name for f in files] == [f"cluster_{c}.ply" for c in range(3)]
+    assert executor.summary.n_files == 4
+    assert executor.summary.n_failed == 0
+
+
+def test_run_saves_same_named_files_apart(synthetic_clustered_pcd, tmp_path):
+    paths = [str(tmp_path / "scan.ply"), str(tmp_path / "scan.xyz")]
+    for path in paths:
+        o3d.io.write_point_cloud(path, synthetic_clustered_pcd)
+    cfg = dict(PIPELINE_CFG)
+    cfg["cluster_output"] = {
+        "save_clusters": True,
+        "output_dir": str(tmp_path / "clusters"),
+    }
+
+    results = list(PointCloudPrefetchExecutor(cfg).run(paths))
+
+    assert all(result.ok for result in results)
+    for name in ("scan_ply", "scan_xyz"):
+        assert len(list((tmp_path / "clusters" / name).glob("*.ply"))) == 3
+
+
+def test_run_isolates_failures(scan_paths, tmp_path):
+    paths = scan_paths[:1] + [str(tmp_path / "missing.ply")] + scan_paths[1:]
+    executor = PointCloudPrefetchExecutor(PIPELINE_CFG)
+
+    results = list(executor.run(paths))
+
+    assert [result.path for result in results] == paths
+    assert not results[1].ok
+    assert "FileNotFoundError" in results[1].error
+    assert all(result.ok for result in results[:1] + results[2:])
+    assert executor.summary.failed == [paths[1]]
+
+
+@pytest.mark.parametrize("queue_depth", [1, 2])
+def test_run_loads_ahead_with_bounded_depth(scan_paths, queue_depth):
+    executor = PointCloudPrefetchExecutor(PIPELINE_CFG, queue_depth=queue_depth)
+    fetch, run = executor.pipeline.fetch, executor.pipeline.run
+    fetched = []
+    fetched_at_run = []
+
+    def recording_fetch(path, **kwargs):
+        loaded = fetch(path, **kwargs)
+        fetched.append(path)
+        return loaded
+
+    def recording_run(**kwargs):
+        result = run(**kwargs)
+        # Give the loader time to run ahead while the file is "processed".
+        deadline = time.monotonic() + 5
+        while len(fetched) < min(len(fetched_at_run) + 2, len(scan_paths)):
+            if time.monotonic() > deadline:
+                break
+            time.sleep(0.001)
+        fetched_at_run.append(len(fetched))
+        return result
+
+    executor.pipeline.fetch = recording_fetch
+    executor.pipeline.run = recording_run
+    list(executor.run(scan_paths))
+
+    assert fetched == scan_paths
+    for i, n_fetched in enumerate(fetched_at_run):
+        assert i + 1 < n_fetched or n_fetched == len(scan_paths)
+        assert n_fetched <= i + 1 + queue_depth
+
+
+def test_run_keeps_to_configured_loader_settings(scan_paths):
+    expected = list(PointCloudPrefetchExecutor(PIPELINE_CFG).run(scan_paths))
+    executor = PointCloudPrefetchExecutor(PIPELINE_CFG)
+    fetch, run = executor.pipeline.fetch, executor.pipeline.run
+    streamed = []
+
+    def recording_fetch(path, **kwargs):
+        loaded = fetch(path, **kwargs)
+        streamed.append(loaded.pcd is None)
+        return loaded
+
+    def overriding_run(**kwargs):
+        # As a memory plan streaming the file would, change the shared loader.
+        executor.pipeline.loader.chunk_size = 10
+        try:
+            return run(**kwargs)
+        finally:
+            executor.pipeline.loader.n_points = -1
+
+    executor.pipeline.fetch = recording_fetch
+    executor.pipeline.run = overriding_run
+    results = list(executor.run(scan_paths))
+
+    assert not any(streamed)
+    assert [result.n_points for result in results] == [
+        result.n_points for result in expected
+    ]
+    assert all(result.n_points > 0 for result in results)
+
+
+def test_invalid_queue_depth():
+    with pytest.raises(ValueError, match="queue_depth must be at least 1"):
+        PointCloudPrefetchExecutor(PIPELINE_CFG, queue_depth=0)
+
+
+def test_from_config(tmp_path):
+    cfg = dict(PIPELINE_CFG)
+    cfg["batch"] = {"input": str(tmp_path), "prefetch": True, "queue_depth": 3}
+    executor = PointCloudPrefetchExecutor.from_config(cfg)
+
+    assert executor.queue_depth == 3
+    assert executor.writer is None
+    assert executor.pipeline.cluster_output_cfg["visualize"] is False
+    assert PIPELINE_CFG["cluster_output"]["visualize"] is True
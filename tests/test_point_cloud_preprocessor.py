@@ -2,7 +2,14 @@ import numpy as np
 import open3d as o3d
 import pytest
 
-from src.open3d_pc.point_cloud_preprocessor import PointCloudPreprocessor
+from src.open3d_pc.geometry import get_array, point_count
+from src.open3d_pc.neighbor_graph import NeighborGraph
+from src.open3d_pc.pipeline_profiler import PipelineProfiler
+from src.open3d_pc.point_cloud_preprocessor import (
+    PointCloudPreprocessor,
+    _smallest_eigenvectors,
+)
+from src.open3d_pc.spatial import knn_search
 
 
 def test_downsample_reduces_points(synthetic_pcd):
@@ -30,6 +37,7 @@ def test_estimate_normals_add_normals(synthetic_pcd):
     normals = np.asarray(pcd_with_normals.normals)
     assert normals.shape == (len(pcd_with_normals.points), 3)
 
+
 def test_preprocess(synthetic_pcd):
     preprocesser = PointCloudPreprocessor()
     preprocessed_pcd = preprocesser.preprocess(synthetic_pcd)
@@ -37,3 +45,266 @@ def test_preprocess(synthetic_pcd):
     assert isinstance(preprocessed_pcd, o3d.geometry.PointCloud)
     assert len(preprocessed_pcd.points) < len(synthetic_pcd.points)
     assert preprocessed_pcd.has_normals()
+
+
+def test_downsample_chunks_matches_downsample(synthetic_pcd):
+    preprocesser = PointCloudPreprocessor()
+    points = np.asarray(synthetic_pcd.points)
+    chunks = (points[start : start + 100] for start in range(0, len(points), 100))
+
+    streamed_pcd = preprocesser.downsample_chunks(chunks, points.min(axis=0))
+    expected_pcd = preprocesser.downsample(synthetic_pcd)
+
+    streamed = np.asarray(streamed_pcd.points)
+    expected = np.asarray(expected_pcd.points)
+    assert streamed.shape == expected.shape
+    assert np.allclose(
+        streamed[np.lexsort(streamed.T[::-1])], expected[np.lexsort(expected.T[::-1])]
+    )
+
+
+def test_estimate_normals_from_neighbor_graph():
+    # Noisy samples of the plane z = 0.5x, whose normal is (-0.5, 0, 1) normalised
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 1, size=(1000, 3))
+    points[:, 2] = 0.5 * points[:, 0] + rng.normal(0, 0.001, size=1000)
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+    preprocessor = PointCloudPreprocessor(normal_radius=0.1, normal_max_nn=30)
+    graph = NeighborGraph.from_pointcloud(pcd, radius=0.15)
+
+    normals = np.asarray(
+        preprocessor.estimate_normals(pcd, neighbor_graph=graph).normals
+    ).copy()
+    expected = np.asarray(preprocessor.estimate_normals(pcd).normals)
+
+    # Normals are only defined up to sign
+    assert np.allclose(np.abs((normals * expected).sum(axis=1)), 1, atol=1e-6)
+    plane_normal = np.array([-0.5, 0, 1]) / np.linalg.norm([-0.5, 0, 1])
+    assert np.allclose(np.abs(normals @ plane_normal), 1, atol=1e-2)
+
+
+def test_estimate_normals_neighbor_graph_too_small(synthetic_pcd):
+    preprocessor = PointCloudPreprocessor(normal_radius=0.1)
+    graph = NeighborGraph.from_pointcloud(synthetic_pcd, radius=0.05)
+
+    with pytest.raises(ValueError, match="smaller than the required radius"):
+        preprocessor.estimate_normals(synthetic_pcd, neighbor_graph=graph)
+
+
+def test_preprocess_builds_neighbor_graph(synthetic_pcd):
+    preprocessor = PointCloudPreprocessor(voxel_size=0.01)
+
+    pcd = preprocessor.preprocess(synthetic_pcd, neighbor_radius=0.2)
+
+    assert pcd.has_normals()
+    assert preprocessor.neighbor_graph.n_points == len(pcd.points)
+    assert preprocessor.neighbor_graph.radius == 0.2
+
+
+def test_smallest_eigenvectors_match_eigh():
+    rng = np.random.default_rng(0)
+    samples = rng.normal(size=(200, 10, 3)) * np.array([1, 0.3, 0.01])
+    matrices = np.einsum("nki,nkj->nij", samples, samples)
+    # Degenerate matrices fall back to eigh
+    matrices[:2] = [np.eye(3), np.zeros((3, 3))]
+
+    vectors = _smallest_eigenvectors(matrices)
+
+    expected = np.linalg.eigh(matrices)[1][:, :, 0]
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1)
+    assert np.allclose(np.abs((vectors[2:] * expected[2:]).sum(axis=1)), 1)
+
+
+def test_graph_normals_match_open3d_orientation():
+    rng = np.random.default_rng(0)
+    points = np.c_[rng.uniform(0, 1, (5000, 2)), rng.normal(0, 0.01, 5000)]
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+    expected = o3d.geometry.PointCloud(pcd)
+    expected.estimate_normals(o3d.geometry.KDTreeSearchParamHybrid(0.05, 30))
+    preprocessor = PointCloudPreprocessor(normal_radius=0.05, normal_max_nn=30)
+
+    preprocessor.estimate_normals(pcd, neighbor_graph=NeighborGraph.build(points, 0.05))
+
+    dots = (np.asarray(pcd.normals) * np.asarray(expected.normals)).sum(axis=1)
+    assert np.allclose(dots, 1, atol=1e-6)
+
+
+def test_downsample_to_target_points(synthetic_pcd):
+    preprocessor = PointCloudPreprocessor(target_points=100)
+
+    down_pcd = preprocessor.downsample(synthetic_pcd)
+
+    assert abs(len(down_pcd.points) / 100 - 1) <= 0.05
+    assert preprocessor.selected_voxel_size > 0
+    assert preprocessor.get_params()["target_points"] == 100
+
+
+def test_downsample_to_memory_budget(synthetic_pcd):
+    # Coordinates and normals take 48 bytes per point.
+    preprocessor = PointCloudPreprocessor(memory_budget=48 * 100)
+
+    pcd = preprocessor.preprocess(synthetic_pcd)
+
+    assert len(pcd.points) <= 105
+    assert preprocessor.select_voxel_size(synthetic_pcd) == pytest.approx(
+        PointCloudPreprocessor(target_points=100).select_voxel_size(synthetic_pcd)
+    )
+
+
+def test_select_voxel_size_without_target(synthetic_pcd):
+    with pytest.raises(ValueError, match="target_points or memory_budget"):
+        PointCloudPreprocessor().select_voxel_size(synthetic_pcd)
+
+
+def test_downsample_chunks_with_target(synthetic_pcd):
+    preprocessor = PointCloudPreprocessor(target_points=100)
+    points = np.asarray(synthetic_pcd.points)
+
+    with pytest.raises(ValueError, match="not supported when streaming"):
+        preprocessor.downsample_chunks([points], points.min(axis=0))
+
+
+def test_estimate_normals_at_matches_estimate_normals(synthetic_pcd):
+    preprocesser = PointCloudPreprocessor(normal_radius=0.2)
+    points = np.asarray(synthetic_pcd.points)
+    graph = NeighborGraph.build(points, 0.2)
+    expected = np.asarray(
+        preprocesser.estimate_normals(synthetic_pcd, neighbor_graph=graph).normals
+    )
+    indices = np.arange(0, len(points), 7)
+    normals = preprocesser.estimate_normals_at(points, indices)
+
+    assert normals.shape == (len(indices), 3)
+    dots = np.abs(np.einsum("ij,ij->i", normals, expected[indices]))
+    assert np.allclose(dots, 1.0)
+
+
+def make_noisy_pcd():
+    rng = np.random.default_rng(0)
+    plane = rng.random((2000, 3)) * [1.0, 1.0, 0.02]
+    noise = rng.random((50, 3)) * 2.0 + [0.0, 0.0, 0.5]
+    return o3d.geometry.PointCloud(
+        o3d.utility.Vector3dVector(np.vstack([plane, noise]))
+    )
+
+
+@pytest.mark.parametrize("method", ["statistical", "radius"])
+def test_outlier_mask_from_neighbor_graph_matches_open3d(method):
+    pcd = make_noisy_pcd()
+    preprocesser = PointCloudPreprocessor(
+        outlier_removal=method, outlier_nb_neighbors=10, outlier_radius=0.05
+    )
+    graph = NeighborGraph.from_pointcloud(pcd, 0.05)
+
+    expected = preprocesser.outlier_mask(pcd)
+    keep = preprocesser.outlier_mask(pcd, neighbor_graph=graph)
+
+    assert np.array_equal(keep, expected)
+    assert not keep[2000:].any()
+
+
+@pytest.mark.parametrize("method", ["statistical", "radius"])
+def test_preprocess_removes_outliers(method):
+    pcd = make_noisy_pcd()
+    preprocesser = PointCloudPreprocessor(voxel_size=0.01, outlier_removal=method)
+    profiler = PipelineProfiler()
+
+    result = preprocesser.preprocess(pcd, profiler=profiler, neighbor_radius=0.1)
+
+    stage = next(s for s in profiler.stages if s.name == "remove_outliers")
+    assert preprocesser.n_outliers >= 50
+    assert stage.points_in - stage.points_out == preprocesser.n_outliers
+    assert len(result.points) == stage.points_out
+    assert preprocesser.neighbor_graph.n_points == len(result.points)
+    assert result.has_normals()
+
+
+def test_invalid_outlier_removal():
+    with pytest.raises(ValueError, match="Unknown outlier removal"):
+        PointCloudPreprocessor(outlier_removal="median")
+
+
+@pytest.mark.parametrize("outlier_removal", [None, "statistical", "radius"])
+@pytest.mark.parametrize("neighbor_radius", [None, 0.05])
+def test_preprocess_float32_matches_float64(outlier_removal, neighbor_radius):
+    pcd = make_noisy_pcd()
+    params = {
+        "voxel_size": 0.01,
+        "normal_radius": 0.05,
+        "outlier_removal": outlier_removal,
+    }
+
+    expected = PointCloudPreprocessor(**params).preprocess(
+        pcd, neighbor_radius=neighbor_radius
+    )
+    result = PointCloudPreprocessor(**params, float32=True).preprocess(
+        pcd, neighbor_radius=neighbor_radius
+    )
+
+    assert isinstance(result, o3d.t.geometry.PointCloud)
+    assert result.point.positions.dtype == o3d.core.float32
+    assert result.point.normals.dtype == o3d.core.float32
+    assert point_count(result) == point_count(expected)
+    # Downsampling orders the points differently, so match them by position.
+    indices, sq_distances = knn_search(
+        get_array(expected), get_array(result).astype(np.float64), 1
+    )
+    assert np.sqrt(sq_distances.max()) < 1e-5
+    normals = get_array(expected, "normals")[indices[:, 0]]
+    dots = np.abs(np.einsum("ij,ij->i", normals, get_array(result, "normals")))
+    assert np.allclose(dots, 1.0, atol=1e-3)
+
+
+def test_preprocess_keeps_tensor_pointclouds(synthetic_pcd):
+    pcd = o3d.t.geometry.PointCloud.from_legacy(synthetic_pcd, o3d.core.float32)
+
+    result = PointCloudPreprocessor(voxel_size=0.1).preprocess(pcd)
+
+    assert isinstance(result, o3d.t.geometry.PointCloud)
+    assert point_count(result) == len(synthetic_pcd.voxel_down_sample(0.1).points)
+    assert "normals" in result.point
+
+
+def test_memory_budget_accounts_for_float32(synthetic_pcd):
+    budget = 500 * 8 * 3 * 2 // 4
+
+    voxel_size = PointCloudPreprocessor(memory_budget=budget).select_voxel_size(
+        synthetic_pcd
+    )
+    float32_voxel_size = PointCloudPreprocessor(
+        memory_budget=budget, float32=True
+    ).select_voxel_size(synthetic_pcd)
+
+    assert float32_voxel_size < voxel_size
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_estimate_normals_tiled_matches_global(n_jobs):
+    pcd = make_noisy_pcd()
+    expected = PointCloudPreprocessor(normal_radius=0.05).estimate_normals(
+        o3d.geometry.PointCloud(pcd)
+    )
+    preprocesser = PointCloudPreprocessor(
+        normal_radius=0.05, normal_tile_size=0.3, n_jobs=n_jobs
+    )
+
+    result = preprocesser.estimate_normals(o3d.geometry.PointCloud(pcd))
+
+    assert np.array_equal(np.asarray(result.normals), np.asarray(expected.normals))
+
+
+def test_estimate_normals_tiled_keeps_orientation():
+    pcd = make_noisy_pcd()
+    pcd.normals = o3d.utility.Vector3dVector(np.tile([0.0, 0.0, -1.0], (2050, 1)))
+    expected = PointCloudPreprocessor(normal_radius=0.05).estimate_normals(
+        o3d.geometry.PointCloud(pcd)
+    )
+    preprocesser = PointCloudPreprocessor(
+        normal_radius=0.05, normal_tile_size=0.3, n_jobs=1
+    )
+
+    result = preprocesser.estimate_normals(pcd)
+
+    normals = np.asarray(result.normals)
+    assert np.array_equal(normals, np.asarray(expected.normals))
+    assert (normals[:2000, 2] < 0).all()
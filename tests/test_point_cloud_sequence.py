@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+from src.open3d_pc.neighbor_graph import NeighborGraph
+from src.open3d_pc.point_cloud_clusterer import PointCloudClusterer
+from src.open3d_pc.point_cloud_preprocessor import PointCloudPreprocessor
+from src.open3d_pc.point_cloud_sequence import PointCloudSequenceProcessor
+
+CENTERS = np.array([[0.0, 0, 0], [2, 0, 0], [0, 2, 0], [2, 2, 0]])
+
+
+def make_blob(center, n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.random((n, 3)) * [0.4, 0.4, 0.1] + center
+
+
+@pytest.fixture
+def static_scene():
+    return np.vstack([make_blob(c, seed=i) for i, c in enumerate(CENTERS)])
+
+
+def make_sequence():
+    return PointCloudSequenceProcessor(
+        PointCloudPreprocessor(voxel_size=0.05, normal_radius=0.1),
+        PointCloudClusterer(eps=0.08, min_points=5),
+    )
+
+
+def labels_at(pcd, labels, center):
+    points = np.asarray(pcd.points)
+    inside = np.all(np.abs(points - center - [0.2, 0.2, 0.05]) <= 0.25, axis=1)
+    return np.unique(labels[inside])
+
+
+def test_unchanged_frame_reuses_everything(static_scene):
+    sequence = make_sequence()
+    pcd, labels = sequence.process(static_scene)
+    assert sequence.stats.n_changed == len(pcd.points)
+
+    pcd2, labels2 = sequence.process(static_scene)
+
+    assert sequence.stats.n_changed == 0
+    assert sequence.stats.n_removed == 0
+    assert sequence.stats.n_normals == 0
+    assert sequence.stats.n_reclustered == 0
+    assert np.array_equal(labels2, labels)
+    assert np.array_equal(np.asarray(pcd2.normals), np.asarray(pcd.normals))
+
+
+def test_moving_object_keeps_static_cluster_ids(static_scene):
+    sequence = make_sequence()
+    frames = [
+        np.vstack([static_scene, make_blob([4 + 0.3 * t, 1, 0], seed=9)])
+        for t in range(3)
+    ]
+    results = list(sequence.run(frames))
+
+    for center in CENTERS:
+        ids = [labels_at(pcd, labels, center) for pcd, labels in results]
+        assert all(len(frame_ids) == 1 for frame_ids in ids)
+        assert all(np.array_equal(frame_ids, ids[0]) for frame_ids in ids)
+    assert 0 < sequence.stats.n_reclustered < len(results[-1][0].points)
+    # The moving blob overlaps its previous position, so it keeps its ID too.
+    moving = [
+        labels_at(pcd, labels, [4 + 0.3 * t, 1, 0])
+        for t, (pcd, labels) in enumerate(results)
+    ]
+    assert np.array_equal(moving[0], moving[2])
+
+
+def test_sequence_matches_full_recomputation(static_scene):
+    sequence = make_sequence()
+    sequence.process(np.vstack([static_scene, make_blob([0.6, 0, 0], seed=9)]))
+    pcd, labels = sequence.process(static_scene)
+
+    points = np.asarray(pcd.points)
+    graph = NeighborGraph.build(points, 0.1)
+    expected = sequence.preprocessor.estimate_normals(pcd, neighbor_graph=graph)
+    dots = np.einsum("ij,ij->i", np.asarray(pcd.normals), np.asarray(expected.normals))
+    assert np.allclose(np.abs(dots), 1.0)
+
+    graph = graph.restrict(0.08)
+    expected_labels = sequence.clusterer._cluster_graph(graph)
+    core = graph.counts() >= 5
+    pairs = np.unique(np.stack([labels[core], expected_labels[core]], axis=1), axis=0)
+    assert len(pairs) == len(np.unique(labels[core]))
+    assert len(pairs) == len(np.unique(expected_labels[core]))
+    assert np.array_equal(labels < 0, expected_labels < 0)
+
+
+def test_new_cluster_gets_fresh_id(static_scene):
+    sequence = make_sequence()
+    _, labels = sequence.process(static_scene)
+    pcd, labels2 = sequence.process(
+        np.vstack([static_scene, make_blob([4, 4, 0], seed=9)])
+    )
+
+    new_ids = labels_at(pcd, labels2, [4, 4, 0])
+    assert len(new_ids) == 1
+    assert new_ids[0] > labels.max()
+
+
+def test_rebuild_when_most_voxels_change(static_scene):
+    sequence = make_sequence()
+    sequence.process(static_scene)
+    pcd, _ = sequence.process(static_scene + [0.02, 0, 0])
+
+    assert sequence.stats.n_normals == len(pcd.points)
+    assert sequence.stats.n_reclustered == len(pcd.points)
+
+
+def test_reset(static_scene):
+    sequence = make_sequence()
+    sequence.process(static_scene)
+    sequence.reset()
+    pcd, _ = sequence.process(static_scene)
+
+    assert sequence.stats.n_changed == len(pcd.points)
+
+
+def test_frame_outside_grid():
+    sequence = make_sequence()
+
+    with pytest.raises(ValueError, match="beyond the voxel grid"):
+        sequence.process(np.array([[1e6, 0.0, 0.0]]))
+
+
+def test_from_config():
+    cfg = {
+        "preprocessor": {"voxel_size": 0.1},
+        "clusterer": {"eps": 0.2, "min_points": 3, "tile_size": 5.0},
+        "sequence": {"change_tolerance": None, "rebuild_fraction": 0.25},
+    }
+    sequence = PointCloudSequenceProcessor.from_config(cfg)
+
+    assert sequence.preprocessor.voxel_size == 0.1
+    assert sequence.clusterer.eps == 0.2
+    assert sequence.change_tolerance == pytest.approx(0.025)
+    assert sequence.rebuild_fraction == 0.25
@@ -0,0 +1,217 @@
+import http.client
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import open3d as o3d
+import pytest
+
+from src.open3d_pc.point_cloud_pipeline import PointCloudPipeline
+from src.open3d_pc.point_cloud_service import PointCloudService, ServiceMetrics
+
+PIPELINE_CFG = {
+    "loader": {},
+    "preprocessor": {"voxel_size": 0.005},
+    "clusterer": {"eps": 0.108, "min_points": 5},
+    "cluster_output": {"visualize": True, "save_clusters": True},
+}
+
+
+@pytest.fixture(scope="module")
+def service():
+    service = PointCloudService(PIPELINE_CFG, port=0, num_workers=1, max_queue=4)
+    service.start()
+    thread = threading.Thread(target=service.serve_forever)
+    thread.start()
+    yield service
+    service.shutdown()
+    thread.join()
+
+
+def request(service, method, path, body=None, content_type="application/json"):
+    connection = http.client.HTTPConnection(service.host, service.port, timeout=60)
+    headers = {"Content-Type": content_type}
+    if isinstance(body, dict):
+        body = json.dumps(body).encode()
+    connection.request(method, path, body=body, headers=headers)
+    response = connection.getresponse()
+    payload = json.loads(response.read())
+    connection.close()
+
+    return response.status, payload
+
+
+def test_process_path(service, synthetic_clustered_pcd, tmp_path):
+    path = tmp_path / "scan.ply"
+    o3d.io.write_point_cloud(str(path), synthetic_clustered_pcd)
+
+    status, result = request(service, "POST", "/process", {"path": str(path)})
+
+    assert status == 200
+    assert result["ok"]
+    assert result["n_points"] == 150
+    assert result["n_clusters"] == 3
+    assert len(result["labels"]) == result["n_processed_points"]
+    assert sum(result["cluster_sizes"]) + result["n_noise"] == len(result["labels"])
+    assert not list(tmp_path.glob("clusters*"))
+
+
+def test_process_points_matches_path(service, synthetic_clustered_pcd, tmp_path):
+    path = tmp_path / "scan.ply"
+    o3d.io.write_point_cloud(str(path), synthetic_clustered_pcd)
+    points = np.asarray(synthetic_clustered_pcd.points)
+
+    _, from_path = request(service, "POST", "/process", {"path": str(path)})
+    _, from_json = request(service, "POST", "/process", {"points": points.tolist()})
+    _, from_buffer = request(
+        service,
+        "POST",
+        "/process?dtype=float64",
+        points.astype("<f8").tobytes(),
+        content_type="application/octet-stream",
+    )
+
+    assert from_json["labels"] == from_path["labels"]
+    assert from_buffer["labels"] == from_path["labels"]
+
+
+def test_process_batch_isolates_failures(service, synthetic_clustered_pcd, tmp_path):
+    points = np.asarray(synthetic_clustered_pcd.points).tolist()
+    items = [{"points": points}, {"path": str(tmp_path / "missing.ply")}]
+
+    status, response = request(service, "POST", "/process", {"items": items})
+
+    assert status == 200
+    first, second = response["results"]
+    assert first["ok"]
+    assert first["n_clusters"] == 3
+    assert not second["ok"]
+    assert "FileNotFoundError" in second["error"]
+
+
+@pytest.mark.parametrize(
+    "body, content_type, match",
+    [
+        (b"{", "application/json", "Invalid JSON"),
+        ({"points": [[0.0, 0.0]]}, "application/json", "shape"),
+        ({"items": []}, "application/json", "between 1 and 64"),
+        (b"\x00" * 10, "application/octet-stream", "multiple of 3"),
+    ],
+)
+def test_process_bad_request(service, body, content_type, match):
+    status, response = request(service, "POST", "/process", body, content_type)
+
+    assert status == 400
+    assert match in response["error"]
+
+
+def test_process_rejects_when_queue_full(service, synthetic_clustered_pcd):
+    points = np.asarray(synthetic_clustered_pcd.points).tolist()
+    rejected = service.metrics.n_rejected
+    service.metrics.in_flight = service.max_queue
+    try:
+        status, response = request(service, "POST", "/process", {"points": points})
+    finally:
+        service.metrics.in_flight = 0
+
+    assert status == 503
+    assert "Queue is full" in response["error"]
+    assert service.metrics.n_rejected == rejected + 1
+
+
+def test_metrics_and_health(service, synthetic_clustered_pcd):
+    points = np.asarray(synthetic_clustered_pcd.points).tolist()
+    request(service, "POST", "/process", {"points": points})
+
+    status, metrics = request(service, "GET", "/metrics")
+    _, health = request(service, "GET", "/health")
+
+    assert status == 200
+    assert metrics["requests"] >= 1
+    assert metrics["queue_depth"] == 0
+    assert metrics["latency_ms"]["window"] >= 1
+    assert metrics["latency_ms"]["p50"] <= metrics["latency_ms"]["max"]
+    assert health == {"status": "ok", "workers": 1}
+
+
+def test_process_survives_worker_crash(synthetic_clustered_pcd, tmp_path, monkeypatch):
+    run = PointCloudPipeline.run
+
+    def crashing_run(self, path=None, *args, **kwargs):
+        name = os.path.basename(str(path))
+        if name == "crash.ply":
+            os._exit(1)
+        if name == "slow.ply":
+            time.sleep(1)
+        return run(self, path, *args, **kwargs)
+
+    # Forked workers inherit the patched pipeline.
+    monkeypatch.setattr(PointCloudPipeline, "run", crashing_run)
+    paths = {}
+    for name in ("crash", "slow", "scan"):
+        paths[name] = str(tmp_path / f"{name}.ply")
+        o3d.io.write_point_cloud(paths[name], synthetic_clustered_pcd)
+    service = PointCloudService(
+        PIPELINE_CFG, port=0, num_workers=2, start_method="fork"
+    )
+    service.start()
+    thread = threading.Thread(target=service.serve_forever)
+    thread.start()
+    try:
+        slow = {}
+        slow_thread = threading.Thread(
+            target=lambda: slow.update(
+                response=request(service, "POST", "/process", {"path": paths["slow"]})
+            )
+        )
+        slow_thread.start()
+        time.sleep(0.3)
+
+        crash_status, crash_result = request(
+            service, "POST", "/process", {"path": paths["crash"]}
+        )
+        slow_thread.join()
+        status, result = request(service, "POST", "/process", {"path": paths["scan"]})
+    finally:
+        service.shutdown()
+        thread.join()
+
+    assert crash_status == 500
+    assert "BrokenProcessPool" in crash_result["error"]
+    # The request in flight when the worker died was retried on a new pool.
+    assert slow["response"][0] == 200
+    assert slow["response"][1]["n_clusters"] == 3
+    assert status == 200
+    assert result["n_clusters"] == 3
+
+
+def test_service_metrics_window():
+    metrics = ServiceMetrics()
+    assert metrics.try_acquire(2, 3)
+    assert not metrics.try_acquire(2, 3)
+
+    metrics.release([], 2, 0.5)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["queue_depth"] == 0
+    assert snapshot["max_queue_depth"] == 2
+    assert snapshot["failed"] == 2
+    assert snapshot["rejected"] == 1
+    assert snapshot["latency_ms"]["p50"] == pytest.approx(500.0)
+
+
+def test_from_config():
+    cfg = dict(PIPELINE_CFG)
+    cfg["batch"] = {"input": "scans"}
+    cfg["service"] = {"port": 9000, "num_workers": 2, "max_batch_size": 8}
+
+    service = PointCloudService.from_config(cfg)
+
+    assert service.port == 9000
+    assert service.max_queue == 8
+    assert service.max_batch_size == 8
+    assert "batch" not in service.pipeline_cfg
+    assert service.pipeline_cfg["cluster_output"]["save_clusters"] is False
+    assert PIPELINE_CFG["cluster_output"]["save_clusters"] is True
@@ -0,0 +1,81 @@
+import numpy as np
+import open3d as o3d
+import pytest
+
+from src.open3d_pc.point_cloud_columns import PointCloudColumnStore
+from src.open3d_pc.point_cloud_loader import PointCloudLoader
+from src.open3d_pc.point_cloud_writer import PointCloudWriter
+
+
+@pytest.fixture
+def labelled_pcd(synthetic_pcd):
+    rng = np.random.default_rng(0)
+    synthetic_pcd.estimate_normals()
+    synthetic_pcd.colors = o3d.utility.Vector3dVector(rng.uniform(0, 1, (500, 3)))
+    labels = rng.integers(-1, 20, size=500)
+
+    return synthetic_pcd, labels
+
+
+def test_write_clusters(labelled_pcd, tmp_path):
+    pcd, labels = labelled_pcd
+
+    paths = PointCloudWriter(io_threads=4).write(pcd, labels, tmp_path)
+
+    assert paths == [tmp_path / f"cluster_{i}.ply" for i in range(20)]
+    for cluster_id, path in enumerate(paths):
+        cluster = o3d.io.read_point_cloud(str(path))
+        indices = np.flatnonzero(labels == cluster_id)
+        assert np.array_equal(
+            np.asarray(cluster.points), np.asarray(pcd.points)[indices]
+        )
+        assert np.allclose(
+            np.asarray(cluster.normals), np.asarray(pcd.normals)[indices]
+        )
+        assert np.allclose(
+            np.asarray(cluster.colors), np.asarray(pcd.colors)[indices], atol=1 / 255
+        )
+
+
+def test_write_labelled(labelled_pcd, tmp_path):
+    pcd, labels = labelled_pcd
+
+    (path,) = PointCloudWriter(export_mode="labelled").write(pcd, labels, tmp_path)
+
+    loader = PointCloudLoader(str(path), mmap=True)
+    points = loader.load_points()
+    assert path.name == "labelled.ply"
+    assert np.array_equal(points, np.asarray(pcd.points))
+    assert np.array_equal(loader.labels, labels)
+    assert len(o3d.io.read_point_cloud(str(path)).points) == 500
+
+
+def test_write_float32_pointcloud(labelled_pcd, tmp_path):
+    pcd, labels = labelled_pcd
+    tensor_pcd = o3d.t.geometry.PointCloud.from_legacy(pcd, o3d.core.float32)
+
+    paths = PointCloudWriter().write(tensor_pcd, labels, tmp_path)
+
+    with open(paths[0], "rb") as f:
+        assert b"property float x" in f.read(200)
+    cluster = o3d.io.read_point_cloud(str(paths[0]))
+    indices = np.flatnonzero(labels == 0)
+    assert np.allclose(np.asarray(cluster.points), np.asarray(pcd.points)[indices])
+    assert np.allclose(np.asarray(cluster.normals), np.asarray(pcd.normals)[indices])
+
+
+def test_invalid_export_mode():
+    with pytest.raises(ValueError, match="Unknown export mode"):
+        PointCloudWriter(export_mode="zip")
+
+
+def test_write_columnar(labelled_pcd, tmp_path):
+    pcd, labels = labelled_pcd
+
+    (path,) = PointCloudWriter(export_mode="columnar").write(pcd, labels, tmp_path)
+
+    pcd_out, labels_out = PointCloudColumnStore(path).to_pointcloud()
+    order = np.argsort(labels, kind="stable")
+    assert path.name == "labelled_columns"
+    assert np.array_equal(labels_out, labels[order])
+    assert np.allclose(np.asarray(pcd_out.points), np.asarray(pcd.points)[order])
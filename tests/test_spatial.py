@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from src.open3d_pc.spatial import (
+    MORTON_BITS,
+    connected_components,
+    count_voxels,
+    iter_tiles,
+    knn_search,
+    occupied_voxel_counts,
+    radius_search,
+    relabel_consecutive,
+    voxel_size_for_target,
+    within_radius,
+)
+
+
+def test_radius_search_includes_self():
+    points = np.array([[0.0, 0, 0], [0.05, 0, 0], [1.0, 0, 0]])
+    offsets, indices, _ = radius_search(points, points, 0.1)
+
+    assert np.diff(offsets).tolist() == [2, 2, 1]
+    assert indices[offsets[2] : offsets[3]].tolist() == [2]
+
+
+def test_connected_components():
+    roots = connected_components(6, np.array([0, 3, 4]), np.array([1, 4, 5]))
+
+    assert roots.tolist() == [0, 0, 2, 3, 3, 3]
+
+
+def test_relabel_consecutive():
+    labels = relabel_consecutive(np.array([7, -1, 3, 7, 3, 5]))
+
+    assert labels.tolist() == [0, -1, 1, 0, 1, 2]
+
+
+def test_iter_tiles_covers_every_point_once(synthetic_pcd):
+    points = np.asarray(synthetic_pcd.points)
+    owned_counts = np.zeros(len(points), dtype=int)
+
+    for owned, extended in iter_tiles(points, tile_size=0.25, halo=0.05):
+        owned_counts[owned] += 1
+        assert np.isin(owned, extended).all()
+
+    assert (owned_counts == 1).all()
+
+
+def test_iter_tiles_invalid_tile_size(synthetic_pcd):
+    with pytest.raises(ValueError, match="tile_size must be positive"):
+        list(iter_tiles(np.asarray(synthetic_pcd.points), tile_size=0.0, halo=0.1))
+
+
+def test_occupied_voxel_counts_match_grid(synthetic_pcd):
+    points = np.asarray(synthetic_pcd.points)
+    sizes, counts = occupied_voxel_counts(points)
+
+    min_bound = points.min(axis=0)
+    cells = np.floor((points - min_bound) / sizes[-1]).astype(np.int64)
+    cells = np.minimum(cells, 2**MORTON_BITS - 1)
+    for level in range(MORTON_BITS + 1):
+        coarse = cells >> (MORTON_BITS - level)
+        assert counts[level] == len(np.unique(coarse, axis=0))
+
+
+def test_count_voxels_matches_open3d(synthetic_pcd):
+    for voxel_size in (0.05, 0.2):
+        expected = len(synthetic_pcd.voxel_down_sample(voxel_size).points)
+
+        assert count_voxels(np.asarray(synthetic_pcd.points), voxel_size) == expected
+
+
+def test_voxel_size_for_target():
+    points = np.random.default_rng(0).random((20000, 3)) * [4.0, 2.0, 1.0]
+
+    voxel_size = voxel_size_for_target(points, 2000)
+
+    assert abs(count_voxels(points, voxel_size) / 2000 - 1) <= 0.05
+
+
+def test_voxel_size_for_target_keeps_all_points(synthetic_pcd):
+    points = np.asarray(synthetic_pcd.points)
+
+    voxel_size = voxel_size_for_target(points, 10 * len(points))
+
+    assert count_voxels(points, voxel_size) == len(points)
+
+
+def test_voxel_size_for_target_invalid(synthetic_pcd):
+    with pytest.raises(ValueError, match="target_points must be positive"):
+        voxel_size_for_target(np.asarray(synthetic_pcd.points), 0)
+
+
+def test_within_radius_matches_brute_force():
+    rng = np.random.default_rng(0)
+    points = rng.random((2000, 3))
+    targets = rng.random((20, 3))
+    mask = within_radius(points, targets, 0.1)
+
+    distances = np.linalg.norm(points[:, None] - targets[None], axis=2)
+    assert np.array_equal(mask, (distances <= 0.1).any(axis=1))
+    assert not within_radius(points, targets[:0], 0.1).any()
+
+
+def test_knn_search_matches_brute_force():
+    rng = np.random.default_rng(0)
+    points = rng.random((200, 3))
+    indices, sq_distances = knn_search(points, points[:10], 4)
+
+    expected = ((points[:10, None] - points[None]) ** 2).sum(axis=-1)
+    assert indices.shape == (10, 4)
+    assert np.array_equal(indices[:, 0], np.arange(10))
+    assert np.allclose(sq_distances, np.sort(expected, axis=1)[:, :4])
+    assert knn_search(points[:3], points[:2], 5)[0].shape == (2, 3)
@@ -0,0 +1,47 @@
+import numpy as np
+import open3d as o3d
+import pytest
+
+from src.open3d_pc.voxel_accumulator import VoxelAccumulator
+
+
+def test_accumulate_matches_voxel_down_sample(synthetic_pcd):
+    points = np.asarray(synthetic_pcd.points)
+    colors = np.random.rand(len(points), 3)
+    synthetic_pcd.colors = o3d.utility.Vector3dVector(colors)
+    expected = synthetic_pcd.voxel_down_sample(0.1)
+
+    accumulator = VoxelAccumulator(0.1, points.min(axis=0))
+    for start in range(0, len(points), 64):
+        accumulator.add(points[start : start + 64], colors=colors[start : start + 64])
+    down_pcd = accumulator.to_pointcloud()
+
+    assert accumulator.n_points == len(points)
+    assert len(accumulator) == len(expected.points)
+    order = np.lexsort(np.asarray(down_pcd.points).T[::-1])
+    expected_order = np.lexsort(np.asarray(expected.points).T[::-1])
+    assert np.allclose(
+        np.asarray(down_pcd.points)[order], np.asarray(expected.points)[expected_order]
+    )
+    assert np.allclose(
+        np.asarray(down_pcd.colors)[order], np.asarray(expected.colors)[expected_order]
+    )
+
+
+def test_accumulate_empty():
+    accumulator = VoxelAccumulator(0.1, np.zeros(3))
+    accumulator.add(np.zeros((0, 3)))
+
+    assert len(accumulator.to_pointcloud().points) == 0
+
+
+def test_accumulate_point_below_min_bound():
+    accumulator = VoxelAccumulator(0.1, np.zeros(3))
+
+    with pytest.raises(ValueError, match="outside the voxel grid"):
+        accumulator.add(np.array([[-1.0, 0.0, 0.0]]))
+
+
+def test_invalid_voxel_size():
+    with pytest.raises(ValueError, match="voxel_size must be positive"):
+        VoxelAccumulator(0.0, np.zeros(3))